@@ -61,6 +61,7 @@ import { TextComponent } from "./components/text";
 import { TextInputComponent } from "./components/textInput";
 import { ThemeContextSwitcherComponent } from "./components/themeContextSwitcher";
 import { TooltipComponent } from "./components/tooltip";
+import { VirtualListViewportComponent } from "./components/virtualListView";
 import { WebviewComponent } from "./components/webview";
 import { GraphEditorComponent } from "./components/graphEditor/graphEditor";
 
@@ -126,6 +127,7 @@ const COMPONENT_CLASSES = {
     "TextInput-builtin": TextInputComponent,
     "ThemeContextSwitcher-builtin": ThemeContextSwitcherComponent,
     "Tooltip-builtin": TooltipComponent,
+    "VirtualListViewport-builtin": VirtualListViewportComponent,
     "Webview-builtin": WebviewComponent,
 };
 
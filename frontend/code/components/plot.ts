@@ -10,14 +10,17 @@ type PlotlyPlot = {
     json: string;
 };
 
+// Matplotlib plots are either sent as SVG, or hosted as raster image
 type MatplotlibPlot = {
     type: "matplotlib";
-    svg: string;
+    svg?: string;
+    imageUrl?: string;
 };
 
 type PlotState = ComponentState & {
     _type_: "Plot-builtin";
-    plot: PlotlyPlot | MatplotlibPlot;
+    // `null` while the figure is still being rendered on the server
+    plot: PlotlyPlot | MatplotlibPlot | null;
     background: AnyFill | null;
     corner_radius?: [number, number, number, number];
 };
@@ -49,13 +52,17 @@ export class PlotComponent extends ComponentBase {
                 this.plotManager.destroy();
             }
 
-            if (deltaState.plot.type === "plotly") {
-                this.plotManager = new PlotlyManager(deltaState.plot);
+            if (deltaState.plot === null) {
+                this.plotManager = null;
             } else {
-                this.plotManager = new MatplotlibManager(deltaState.plot);
-            }
+                if (deltaState.plot.type === "plotly") {
+                    this.plotManager = new PlotlyManager(deltaState.plot);
+                } else {
+                    this.plotManager = new MatplotlibManager(deltaState.plot);
+                }
 
-            this.element.appendChild(this.plotManager.element);
+                this.element.appendChild(this.plotManager.element);
+            }
         }
 
         if (deltaState.background === null) {
@@ -92,7 +99,18 @@ class MatplotlibManager implements PlotManager {
 
     constructor(plot: MatplotlibPlot) {
         this.element = document.createElement("div");
-        this.element.innerHTML = plot.svg;
+
+        if (plot.imageUrl !== undefined) {
+            let imgElement = document.createElement("img");
+            imgElement.src = plot.imageUrl;
+            imgElement.style.width = "100%";
+            imgElement.style.height = "100%";
+            imgElement.style.objectFit = "contain";
+            this.element.appendChild(imgElement);
+            return;
+        }
+
+        this.element.innerHTML = plot.svg!;
 
         let svgElement = this.element.querySelector("svg") as SVGElement;
 
@@ -18,8 +18,26 @@ type TableState = ComponentState & {
     headers?: string[] | null;
     columns?: TableValue[][];
     styling?: TableStyle[];
+
+    // Lazy tables only send a chunk of rows at a time. In that case `columns`
+    // only contains the rows starting at `chunkStart`.
+    lazy?: boolean;
+    rowCount?: number;
+    chunkStart?: number;
+    viewVersion?: number;
+    sortColumn?: string | null;
+    sortDescending?: boolean;
+    filterText?: string;
 };
 
+// How long to wait after the user has stopped typing before filtering
+const FILTER_DELAY_MS = 300;
+
+const CORNER_RADIUS_CSS = "var(--rio-global-corner-radius-medium)";
+
+/// How an update has changed the rows of a lazy table
+type LazyRowsChange = "unchanged" | "appended" | "replaced";
+
 export class TableComponent extends ComponentBase {
     declare state: Required<TableState>;
 
@@ -37,16 +55,60 @@ export class TableComponent extends ComponentBase {
     // False if the component has never been updated before
     private isInitialized: boolean = false;
 
+    /// The grid containing all cells. Lazy tables additionally display a
+    /// filter input above it.
+    private gridElement: HTMLElement;
+    private filterElement: HTMLInputElement;
+    private filterTimeout: number | null = null;
+
+    /// Lazy tables only: Rows which have been received, but can't be displayed
+    /// yet because a row before them is still missing. Rows are moved to
+    /// `rows` as soon as the gap has been filled.
+    private pendingLazyRows: Map<number, TableValue[]> = new Map();
+    private lazyViewVersion: number = -1;
+    private lazyRequestedChunkStart: number = -1;
+    private loadMoreObserver: IntersectionObserver | null = null;
+
     createElement(): HTMLElement {
         let element = document.createElement("div");
-        element.classList.add("rio-table");
+        element.classList.add("rio-table-wrapper");
+
+        this.filterElement = document.createElement("input");
+        this.filterElement.classList.add("rio-table-filter");
+        this.filterElement.placeholder = "Filter";
+        this.filterElement.addEventListener(
+            "input",
+            this.onFilterInput.bind(this)
+        );
+        element.appendChild(this.filterElement);
+
+        this.gridElement = document.createElement("div");
+        this.gridElement.classList.add("rio-table");
+        element.appendChild(this.gridElement);
+
         return element;
     }
 
+    onDestruction(): void {
+        super.onDestruction();
+
+        if (this.loadMoreObserver !== null) {
+            this.loadMoreObserver.disconnect();
+        }
+
+        if (this.filterTimeout !== null) {
+            clearTimeout(this.filterTimeout);
+        }
+    }
+
     /// Transposes the given columns into rows
     columnsToRows(columns: TableValue[][]): TableValue[][] {
         let rows: TableValue[][] = [];
 
+        if (columns.length === 0) {
+            return rows;
+        }
+
         for (let xx = 0; xx < columns[0].length; xx++) {
             let row: TableValue[] = [];
 
@@ -87,14 +149,41 @@ export class TableComponent extends ComponentBase {
             this.state.headers = deltaState.headers;
 
             // Expose whether there's a header to CSS
-            this.element.classList.toggle(
+            this.gridElement.classList.toggle(
                 "rio-table-with-headers",
                 deltaState.headers !== null
             );
         }
 
         // Columns / Data / Rows
-        if (deltaState.columns !== undefined) {
+        let lazy = (deltaState.lazy ?? this.state.lazy) === true;
+        this.filterElement.style.display = lazy ? "" : "none";
+
+        // Lazy tables receive their rows in chunks. As long as a chunk only
+        // adds rows to the end of the table, the existing cells are kept and
+        // only the new ones are created.
+        let rowsNeedAppending = false;
+
+        if (lazy) {
+            let change = this.updateLazyRows(deltaState);
+
+            // Anything else affecting the existing cells requires them to be
+            // recreated
+            let existingCellsHaveChanged =
+                this.dataHeight === 0 ||
+                deltaState.headers !== undefined ||
+                deltaState.show_row_numbers !== undefined ||
+                deltaState.styling !== undefined;
+
+            if (
+                change === "replaced" ||
+                (change === "appended" && existingCellsHaveChanged)
+            ) {
+                contentNeedsRepopulation = true;
+            } else if (change === "appended") {
+                rowsNeedAppending = true;
+            }
+        } else if (deltaState.columns !== undefined) {
             // Store the data in the preferred row-major format
             this.rows = this.columnsToRows(deltaState.columns);
 
@@ -104,7 +193,7 @@ export class TableComponent extends ComponentBase {
 
         // Show row numbers?
         if (deltaState.show_row_numbers !== undefined) {
-            this.element.classList.toggle(
+            this.gridElement.classList.toggle(
                 "rio-table-with-row-numbers",
                 deltaState.show_row_numbers
             );
@@ -112,11 +201,44 @@ export class TableComponent extends ComponentBase {
 
         // Repopulate the HTML
         if (contentNeedsRepopulation) {
+            // Called functions reference `this.state`
+            this.state.lazy = lazy;
+
+            if (deltaState.sortColumn !== undefined) {
+                this.state.sortColumn = deltaState.sortColumn;
+            }
+
+            if (deltaState.sortDescending !== undefined) {
+                this.state.sortDescending = deltaState.sortDescending;
+            }
+
+            if (deltaState.rowCount !== undefined) {
+                this.state.rowCount = deltaState.rowCount;
+            }
+
+            if (deltaState.styling !== undefined) {
+                this.state.styling = deltaState.styling;
+            }
+
             this.updateContent();
+            this.observeLastRow(lazy);
 
             // Since this is completely fresh HTML there is no need to clear
             // any styling
             styleNeedsClearing = false;
+        } else if (rowsNeedAppending) {
+            if (deltaState.rowCount !== undefined) {
+                this.state.rowCount = deltaState.rowCount;
+            }
+
+            let firstNewRow = this.totalHeight;
+            this.appendRows();
+            this.observeLastRow(lazy);
+
+            // The existing cells are already styled, so only the new ones
+            // need styling
+            this.updateStyling(firstNewRow);
+            styleNeedsClearing = false;
         }
 
         // Do previously applied styles need clearing?
@@ -137,6 +259,147 @@ export class TableComponent extends ComponentBase {
         this.isInitialized = true;
     }
 
+    /// Lazy tables only: Stores any newly received rows and returns how the
+    /// displayed rows have changed.
+    private updateLazyRows(deltaState: TableState): LazyRowsChange {
+        let viewVersion = deltaState.viewVersion ?? this.state.viewVersion;
+        let chunkStart = deltaState.chunkStart ?? this.state.chunkStart;
+        let columns = deltaState.columns ?? this.state.columns;
+        let change: LazyRowsChange = "unchanged";
+
+        // If the data, sorting or filter has changed, all previously received
+        // rows are stale. The current chunk is still valid though, even if it
+        // wasn't part of this update.
+        if (viewVersion !== this.lazyViewVersion) {
+            this.lazyViewVersion = viewVersion;
+            this.rows = [];
+            this.pendingLazyRows.clear();
+            this.lazyRequestedChunkStart = -1;
+            change = "replaced";
+        }
+
+        if (
+            change === "replaced" ||
+            deltaState.columns !== undefined ||
+            deltaState.chunkStart !== undefined
+        ) {
+            let chunkRows = this.columnsToRows(columns);
+
+            for (let ii = 0; ii < chunkRows.length; ii++) {
+                let rowIndex = chunkStart + ii;
+
+                // Rows which are already displayed can only be received again
+                // if the entire state has been re-sent. Replace them, just in
+                // case.
+                if (rowIndex < this.rows.length) {
+                    this.rows[rowIndex] = chunkRows[ii];
+                    change = "replaced";
+                } else {
+                    this.pendingLazyRows.set(rowIndex, chunkRows[ii]);
+                }
+            }
+
+            // Display all rows up to the first one that's missing
+            let pendingRow = this.pendingLazyRows.get(this.rows.length);
+
+            while (pendingRow !== undefined) {
+                this.pendingLazyRows.delete(this.rows.length);
+                this.rows.push(pendingRow);
+
+                if (change === "unchanged") {
+                    change = "appended";
+                }
+
+                pendingRow = this.pendingLazyRows.get(this.rows.length);
+            }
+        }
+
+        if (deltaState.filterText !== undefined) {
+            // Don't overwrite what the user is currently typing
+            if (document.activeElement !== this.filterElement) {
+                this.filterElement.value = deltaState.filterText;
+            }
+        }
+
+        return change;
+    }
+
+    /// Lazy tables only: Requests more rows from the server once the last
+    /// displayed row scrolls into view.
+    private observeLastRow(lazy: boolean): void {
+        if (this.loadMoreObserver !== null) {
+            this.loadMoreObserver.disconnect();
+            this.loadMoreObserver = null;
+        }
+
+        let lastCell = this.gridElement.lastElementChild;
+
+        if (
+            !lazy ||
+            lastCell === null ||
+            this.rows.length >= this.state.rowCount
+        ) {
+            return;
+        }
+
+        this.loadMoreObserver = new IntersectionObserver((entries) => {
+            if (entries.some((entry) => entry.isIntersecting)) {
+                this.requestRows(this.rows.length);
+            }
+        });
+        this.loadMoreObserver.observe(lastCell);
+    }
+
+    private requestRows(start: number): void {
+        // Don't request the same rows twice while waiting for them
+        if (start === this.lazyRequestedChunkStart) {
+            return;
+        }
+
+        this.lazyRequestedChunkStart = start;
+        this.sendMessageToBackend({
+            type: "requestRows",
+            start: start,
+        });
+    }
+
+    private onHeaderClick(columnName: string): void {
+        // Cycle through ascending, descending and unsorted
+        let column: string | null = columnName;
+        let descending = false;
+
+        if (this.state.sortColumn === columnName) {
+            if (this.state.sortDescending) {
+                column = null;
+            } else {
+                descending = true;
+            }
+        }
+
+        this.sendMessageToBackend({
+            type: "sort",
+            column: column,
+            descending: descending,
+        });
+    }
+
+    private onFilterInput(): void {
+        // Wait until the user has stopped typing, to avoid filtering the
+        // entire table on every single keystroke
+        if (this.filterTimeout !== null) {
+            clearTimeout(this.filterTimeout);
+        }
+
+        this.filterTimeout = window.setTimeout(() => {
+            this.filterTimeout = null;
+
+            this.sendMessageToBackend({
+                type: "filter",
+                text: this.filterElement.value,
+            });
+        }, FILTER_DELAY_MS);
+    }
+
     private onEnterCell(element: HTMLElement, xx: number, yy: number): void {
         // Don't colorize the header
         if (yy === 0 && this.state.headers !== null) {
@@ -162,16 +425,13 @@ export class TableComponent extends ComponentBase {
     /// numbers.
     private updateContent(): void {
         // Remove any old HTML
-        this.element.innerHTML = "";
+        this.gridElement.innerHTML = "";
 
         // Update the data dimensions. These will be used throughout the
         // function.
-        let headersOffset = this.state.headers === null ? 0 : 1;
         let rowNumbersOffset = this.state.show_row_numbers ? 1 : 0;
 
-        this.dataHeight = this.rows.length;
-
-        if (this.dataHeight === 0) {
+        if (this.rows.length === 0) {
             if (this.state.headers === null) {
                 this.dataWidth = 0;
             } else {
@@ -181,40 +441,16 @@ export class TableComponent extends ComponentBase {
             this.dataWidth = this.rows[0].length;
         }
 
+        this.dataHeight = 0;
         this.totalWidth = this.dataWidth + rowNumbersOffset;
-        this.totalHeight = this.dataHeight + headersOffset;
-
-        // Update the table's CSS to match the number of rows & columns
-        this.element.style.gridTemplateColumns = `repeat(${this.totalWidth}, auto)`;
-        this.element.style.gridTemplateRows = `repeat(${this.totalHeight}, auto)`;
-
-        // Helper function for adding elements
-        //
-        // All coordinates are 0-based. The top-left cell is (0, 0). This
-        // doesn't account for the header or row number cells.
-        let addElement = (
-            element: HTMLElement,
-            cssClasses: string[],
-            left: number,
-            top: number
-        ) => {
-            const width = 1;
-            const height = 1;
-
-            let area = `${top + 1} / ${left + 1} / ${top + height} / ${
-                left + width
-            }`;
-            element.style.gridArea = area;
-            element.classList.add(...cssClasses);
-            this.element.appendChild(element);
-        };
+        this.totalHeight = this.state.headers === null ? 0 : 1;
 
         // Add the headers
         if (this.state.headers !== null) {
             if (this.state.show_row_numbers) {
                 let itemElement = document.createElement("div");
                 itemElement.textContent = "";
-                addElement(
+                this.addCell(
                     itemElement,
                     ["rio-table-header", "rio-table-row-number"],
                     0,
@@ -224,8 +460,25 @@ export class TableComponent extends ComponentBase {
 
             for (let ii = 0; ii < this.dataWidth; ii++) {
                 let itemElement = document.createElement("div");
-                itemElement.textContent = this.state.headers[ii];
-                addElement(
+                let headerText = this.state.headers[ii];
+                itemElement.textContent = headerText;
+
+                // Lazy tables are sorted by the server, when a header is
+                // clicked
+                if (this.state.lazy) {
+                    itemElement.classList.add("rio-table-sortable");
+                    itemElement.addEventListener("click", () => {
+                        this.onHeaderClick(headerText);
+                    });
+
+                    if (this.state.sortColumn === headerText) {
+                        itemElement.textContent += this.state.sortDescending
+                            ? " ▼"
+                            : " ▲";
+                    }
+                }
+
+                this.addCell(
                     itemElement,
                     ["rio-table-header"],
                     ii + rowNumbersOffset,
@@ -235,13 +488,46 @@ export class TableComponent extends ComponentBase {
         }
 
         // Add the cells
-        for (let data_yy = 0; data_yy < this.dataHeight; data_yy++) {
+        this.appendRows();
+
+        // Round the top corners of the table
+        if (this.totalWidth !== 0 && this.totalHeight !== 0) {
+            let topLeft = this.getCellElement(0, 0);
+            let topRight = this.getCellElement(this.totalWidth - 1, 0);
+
+            topLeft.style.borderTopLeftRadius = CORNER_RADIUS_CSS;
+            topRight.style.borderTopRightRadius = CORNER_RADIUS_CSS;
+        }
+    }
+
+    /// Adds cells for all rows in `this.rows` which aren't displayed yet. This
+    /// allows lazy tables to display newly received rows without recreating
+    /// the cells of all rows they already display.
+    private appendRows(): void {
+        let headersOffset = this.state.headers === null ? 0 : 1;
+        let rowNumbersOffset = this.state.show_row_numbers ? 1 : 0;
+
+        let firstNewRow = this.dataHeight;
+        let firstNewCell = this.gridElement.children.length;
+
+        // The corners of the previously last row are no longer at the bottom
+        // of the table
+        this.setBottomCornersRadius(null);
+
+        this.dataHeight = this.rows.length;
+        this.totalHeight = this.dataHeight + headersOffset;
+
+        // Update the table's CSS to match the number of rows & columns
+        this.gridElement.style.gridTemplateColumns = `repeat(${this.totalWidth}, auto)`;
+        this.gridElement.style.gridTemplateRows = `repeat(${this.totalHeight}, auto)`;
+
+        for (let data_yy = firstNewRow; data_yy < this.dataHeight; data_yy++) {
             // Row number
             if (this.state.show_row_numbers) {
                 let itemElement = document.createElement("div");
                 itemElement.textContent = (data_yy + 1).toString();
 
-                addElement(
+                this.addCell(
                     itemElement,
                     ["rio-table-row-number"],
                     0,
@@ -256,7 +542,7 @@ export class TableComponent extends ComponentBase {
                 itemElement.textContent =
                     this.rows[data_yy][data_xx].toString();
 
-                addElement(
+                this.addCell(
                     itemElement,
                     ["rio-table-cell"],
                     data_xx + rowNumbersOffset,
@@ -265,28 +551,18 @@ export class TableComponent extends ComponentBase {
             }
         }
 
-        // Round the corners of the table
-        if (this.totalWidth !== 0 && this.totalHeight !== 0) {
-            let topLeft = this.getCellElement(0, 0);
-            let topRight = this.getCellElement(this.totalWidth - 1, 0);
-            let bottomLeft = this.getCellElement(0, this.totalHeight - 1);
-            let bottomRight = this.getCellElement(
-                this.totalWidth - 1,
-                this.totalHeight - 1
-            );
-
-            let radiusCss = "var(--rio-global-corner-radius-medium)";
-            topLeft.style.borderTopLeftRadius = radiusCss;
-            topRight.style.borderTopRightRadius = radiusCss;
-            bottomLeft.style.borderBottomLeftRadius = radiusCss;
-            bottomRight.style.borderBottomRightRadius = radiusCss;
-        }
+        // Round the bottom corners of the table
+        this.setBottomCornersRadius(CORNER_RADIUS_CSS);
 
         // Subscribe to events
-        for (let ii = 0; ii < this.element.children.length; ii++) {
+        for (
+            let ii = firstNewCell;
+            ii < this.gridElement.children.length;
+            ii++
+        ) {
             let xx = ii % this.totalWidth;
             let yy = Math.floor(ii / this.totalWidth);
-            let cellElement = this.element.children[ii] as HTMLElement;
+            let cellElement = this.gridElement.children[ii] as HTMLElement;
 
             cellElement.addEventListener("pointerenter", () => {
                 this.onEnterCell(cellElement, xx, yy);
@@ -298,30 +574,72 @@ export class TableComponent extends ComponentBase {
         }
     }
 
+    /// Adds a cell to the grid. All coordinates are 0-based. The top-left cell
+    /// is (0, 0). This doesn't account for the header or row number cells.
+    private addCell(
+        element: HTMLElement,
+        cssClasses: string[],
+        left: number,
+        top: number
+    ): void {
+        const width = 1;
+        const height = 1;
+
+        let area = `${top + 1} / ${left + 1} / ${top + height} / ${
+            left + width
+        }`;
+        element.style.gridArea = area;
+        element.classList.add(...cssClasses);
+        this.gridElement.appendChild(element);
+    }
+
+    /// Rounds the bottom corners of the table, or removes the rounding if
+    /// `radiusCss` is `null`.
+    private setBottomCornersRadius(radiusCss: string | null): void {
+        if (this.totalWidth === 0 || this.totalHeight === 0) {
+            return;
+        }
+
+        let bottomLeft = this.getCellElement(0, this.totalHeight - 1);
+        let bottomRight = this.getCellElement(
+            this.totalWidth - 1,
+            this.totalHeight - 1
+        );
+
+        if (radiusCss === null) {
+            bottomLeft.style.removeProperty("border-bottom-left-radius");
+            bottomRight.style.removeProperty("border-bottom-right-radius");
+        } else {
+            bottomLeft.style.borderBottomLeftRadius = radiusCss;
+            bottomRight.style.borderBottomRightRadius = radiusCss;
+        }
+    }
+
     /// Gets the HTML element that corresponds to the given cell. Indexing
     /// includes the header and row number cells, and so is offset by one from
     /// the data index.
     private getCellElement(xx: number, yy: number): HTMLElement {
         let index = yy * this.totalWidth + xx;
-        return this.element.children[index] as HTMLElement;
+        return this.gridElement.children[index] as HTMLElement;
     }
 
     /// Removes any styling from the table
     private clearStyling(): void {
-        for (let rawCell of this.element.children) {
+        for (let rawCell of this.gridElement.children) {
             let cell = rawCell as HTMLElement;
             cell.style.cssText = "";
         }
     }
 
-    /// Updates the styling of the already populated table.
-    private updateStyling(): void {
+    /// Updates the styling of the already populated table. Rows above
+    /// `firstRow` are assumed to be styled already and are left alone.
+    private updateStyling(firstRow: number = 0): void {
         for (let style of this.state.styling) {
-            this.applySingleStyle(style);
+            this.applySingleStyle(style, firstRow);
         }
     }
 
-    private applySingleStyle(style: TableStyle): void {
+    private applySingleStyle(style: TableStyle, firstRow: number): void {
         // Come up with the CSS to apply to the targeted cells
         let css = {};
 
@@ -338,8 +656,11 @@ export class TableComponent extends ComponentBase {
         let styleTop = style.top === "header" ? 0 : style.top + headersOffset;
         let styleHeight = style.height;
 
-        // Apply the CSS to all selected cells
-        for (let yy = styleTop; yy < styleTop + styleHeight; yy++) {
+        // Apply the CSS to all selected cells. Lazy tables may not have
+        // received all rows yet, so skip any which don't exist.
+        let styleBottom = Math.min(styleTop + styleHeight, this.totalHeight);
+
+        for (let yy = Math.max(styleTop, firstRow); yy < styleBottom; yy++) {
             for (let xx = styleLeft; xx < styleLeft + styleWidth; xx++) {
                 let cell = this.getCellElement(xx, yy);
                 Object.assign(cell.style, css);
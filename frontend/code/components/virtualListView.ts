@@ -0,0 +1,147 @@
+import { pixelsPerRem } from "../app";
+import { ComponentId } from "../dataModels";
+import { ComponentBase, ComponentState } from "./componentBase";
+
+export type VirtualListViewportState = ComponentState & {
+    _type_: "VirtualListViewport-builtin";
+    children?: ComponentId[];
+    first_index?: number;
+    item_count?: number;
+    item_height?: number;
+    overscan?: number;
+};
+
+/// The fundamental part of a `VirtualListView`. Only a window of the list's
+/// items exist as children. This component positions them within a scrollable
+/// area as tall as the entire list, and reports back to Python whenever the
+/// user scrolls close to the edge of the items that have been built.
+export class VirtualListViewportComponent extends ComponentBase {
+    declare state: Required<VirtualListViewportState>;
+
+    private contentElement: HTMLElement;
+    private resizeObserver: ResizeObserver;
+
+    private updateIsScheduled: boolean = false;
+    private lastReportedRange: [number, number] = [-1, -1];
+
+    createElement(): HTMLElement {
+        let element = document.createElement("div");
+        element.classList.add("rio-virtual-list-view");
+
+        // This element is as tall as all items combined, so the scroll bar
+        // reflects the size of the whole list
+        this.contentElement = document.createElement("div");
+        element.appendChild(this.contentElement);
+
+        element.addEventListener(
+            "scroll",
+            this.scheduleVisibleRangeUpdate.bind(this),
+            { passive: true }
+        );
+
+        this.resizeObserver = new ResizeObserver(
+            this.scheduleVisibleRangeUpdate.bind(this)
+        );
+        this.resizeObserver.observe(element);
+
+        return element;
+    }
+
+    onDestruction(): void {
+        super.onDestruction();
+
+        this.resizeObserver.disconnect();
+    }
+
+    updateElement(
+        deltaState: VirtualListViewportState,
+        latentComponents: Set<ComponentBase>
+    ): void {
+        super.updateElement(deltaState, latentComponents);
+
+        this.replaceChildren(
+            latentComponents,
+            deltaState.children,
+            this.contentElement,
+            true
+        );
+
+        let itemCount = deltaState.item_count ?? this.state.item_count;
+        let itemHeight = deltaState.item_height ?? this.state.item_height;
+        let firstIndex = deltaState.first_index ?? this.state.first_index;
+
+        this.contentElement.style.height = `${itemCount * itemHeight}rem`;
+
+        // Position the items. They're absolutely positioned, since the items
+        // before the first one don't actually exist.
+        for (let [offset, wrapper] of Array.from(
+            this.contentElement.children
+        ).entries()) {
+            let castWrapper = wrapper as HTMLElement;
+            castWrapper.style.top = `${(firstIndex + offset) * itemHeight}rem`;
+            castWrapper.style.height = `${itemHeight}rem`;
+        }
+
+        // The list may have shrunk or grown, possibly revealing items which
+        // haven't been built yet
+        this.scheduleVisibleRangeUpdate();
+    }
+
+    private scheduleVisibleRangeUpdate(): void {
+        // Scroll events fire very frequently. Only check once per frame.
+        if (this.updateIsScheduled) {
+            return;
+        }
+
+        this.updateIsScheduled = true;
+
+        requestAnimationFrame(() => {
+            this.updateIsScheduled = false;
+            this.updateVisibleRange();
+        });
+    }
+
+    private updateVisibleRange(): void {
+        let itemHeightPx = this.state.item_height * pixelsPerRem;
+
+        if (itemHeightPx <= 0) {
+            return;
+        }
+
+        let itemCount = this.state.item_count;
+        let scrollTop = this.element.scrollTop;
+
+        let start = Math.max(Math.floor(scrollTop / itemHeightPx), 0);
+        let end = Math.min(
+            Math.ceil((scrollTop + this.element.clientHeight) / itemHeightPx),
+            itemCount
+        );
+
+        // Only bother Python once the visible items approach the edge of the
+        // ones that have been built
+        let builtStart = this.state.first_index;
+        let builtEnd = builtStart + this.state.children.length;
+        let margin = Math.floor(this.state.overscan / 2);
+
+        let needsItemsAbove = builtStart > 0 && start - margin < builtStart;
+        let needsItemsBelow = builtEnd < itemCount && end + margin > builtEnd;
+
+        if (!needsItemsAbove && !needsItemsBelow) {
+            return;
+        }
+
+        // Don't send the same request twice while waiting for the response
+        if (
+            start === this.lastReportedRange[0] &&
+            end === this.lastReportedRange[1]
+        ) {
+            return;
+        }
+
+        this.lastReportedRange = [start, end];
+        this.sendMessageToBackend({
+            start: start,
+            end: end,
+        });
+    }
+}
@@ -270,6 +270,14 @@ function createLinearGradient(
 const iconSvgCache = new Map<string, string>();
 const RESOLVED_PROMISE = new Promise<void>((resolve) => resolve(undefined));
 
+/// Stores icons sent by the server ahead of time, so components using them can
+/// display them right away instead of fetching each one separately.
+export function seedIconSvgCache(icons: { [iconName: string]: string }): void {
+    for (let [iconName, svgSource] of Object.entries(icons)) {
+        iconSvgCache.set(iconName, svgSource);
+    }
+}
+
 export async function loadIconSvg(iconName: string): Promise<string> {
     let svgSource = iconSvgCache.get(iconName);
 
@@ -3,6 +3,7 @@ import { componentsById, updateComponentStates } from "./componentManagement";
 import {
     requestFileUpload,
     registerFont,
+    registerIcons,
     closeSession,
     setTitle,
     getUnittestClientLayoutInfo,
@@ -20,7 +21,16 @@ import { AsyncQueue } from "./utils";
 
 let websocket: WebSocket | null = null;
 let pingPongHandlerId: number;
-export let incomingMessageQueue: AsyncQueue<JsonRpcMessage> = new AsyncQueue();
+
+// If the app is served by multiple processes, a reconnecting websocket may end
+// up in a process other than the one running this session. That process closes
+// the connection right away. Count how often that has happened in a row, so the
+// client doesn't hammer the server forever.
+const MAX_IMMEDIATE_RECONNECTS = 20;
+let immediateReconnects = 0;
+export let incomingMessageQueue: AsyncQueue<
+    JsonRpcMessage | Promise<JsonRpcMessage>
+> = new AsyncQueue();
 
 export type JsonRpcMessage = {
     jsonrpc: "2.0";
@@ -80,6 +90,9 @@ globalThis.setConnectionLostPopupVisible =
 //
 // To work around this problem, all incoming messages are simply pushed into a
 // queue and then processed in order by this async worker here.
+//
+// Compressed messages can only be decoded asynchronously. They are pushed into
+// the queue as Promises, so they still keep their place in line.
 async function processMessages(): Promise<void> {
     while (true) {
         let message = await incomingMessageQueue.get();
@@ -107,6 +120,7 @@ function createWebsocket(): void {
     url.protocol = url.protocol.replace("http", "ws");
     console.log(`Connecting websocket to ${url.href}`);
     websocket = new WebSocket(url.href);
+    websocket.binaryType = "arraybuffer";
 
     websocket.addEventListener("open", onOpen);
     websocket.addEventListener("message", onMessage);
@@ -197,6 +211,13 @@ function sendInitialMessage(): void {
 
     let windowRect = document.documentElement.getBoundingClientRect();
 
+    // Which encodings the server may use for messages. Compressed messages
+    // require the `DecompressionStream` API.
+    let wireProtocols = ["json"];
+    if (typeof DecompressionStream !== "undefined") {
+        wireProtocols.push("json+deflate");
+    }
+
     sendMessageOverWebsocket({
         url: document.location.href,
         // User information
@@ -221,6 +242,8 @@ function sendInitialMessage(): void {
         primaryPointerType: window.matchMedia("(pointer: coarse)").matches
             ? "touch"
             : "mouse",
+        // Transport
+        wireProtocols: wireProtocols,
     });
 }
 
@@ -241,7 +264,16 @@ function onOpen(): void {
     }, globalThis.PING_PONG_INTERVAL_SECONDS * 1000);
 }
 
-function onMessage(event: MessageEvent<string>) {
+function onMessage(event: MessageEvent<string | ArrayBuffer>) {
+    // Only the correct process sends messages
+    immediateReconnects = 0;
+
+    // Binary messages contain compressed JSON
+    if (event.data instanceof ArrayBuffer) {
+        incomingMessageQueue.push(decompressMessage(event.data));
+        return;
+    }
+
     // Parse the message JSON
     let message = JSON.parse(event.data);
 
@@ -254,6 +286,17 @@ function onMessage(event: MessageEvent<string>) {
     incomingMessageQueue.push(message);
 }
 
+async function decompressMessage(data: ArrayBuffer): Promise<JsonRpcMessage> {
+    let stream = new Blob([data])
+        .stream()
+        .pipeThrough(new DecompressionStream("deflate"));
+    let text = await new Response(stream).text();
+
+    console.debug("Received compressed message: ", JSON.parse(text));
+
+    return JSON.parse(text);
+}
+
 function onError(event: Event) {
     console.warn(`Websocket error`);
 }
@@ -271,6 +314,15 @@ function onClose(event: CloseEvent) {
         return;
     }
 
+    // The session is running in a different process. Every connection may be
+    // routed to a different process, so try again right away, rather than
+    // waiting for the usual delay.
+    if (event.code === 3001 && immediateReconnects < MAX_IMMEDIATE_RECONNECTS) {
+        immediateReconnects++;
+        createWebsocket();
+        return;
+    }
+
     // Show the user that the connection was lost
     setConnectionLostPopupVisibleUnlessGoingAway(true);
 
@@ -439,6 +491,12 @@ export async function processMessageReturnResponse(
             response = null;
             break;
 
+        case "registerIcons":
+            // Remember icons the server sent ahead of time
+            registerIcons(message.params.icons);
+            response = null;
+            break;
+
         case "applyTheme":
             // Set the CSS variables
             for (let key in message.params.cssVariables) {
@@ -11,7 +11,7 @@ import {
     UnittestClientLayoutInfo,
     UnittestComponentLayout,
 } from "./dataModels";
-import { applyIcon } from "./designApplication";
+import { applyIcon, seedIconSvgCache } from "./designApplication";
 import { markEventAsHandled, stopPropagation } from "./eventHandling";
 import {
     buildUploadFormData,
@@ -77,6 +77,10 @@ export async function registerFont(
     }
 }
 
+export function registerIcons(icons: { [iconName: string]: string }): void {
+    seedIconSvgCache(icons);
+}
+
 export function requestFileUpload(message: any): void {
     // Some browsers refuse to let us open a file upload dialog
     // programmatically. And since there's no reliable way to detect whether
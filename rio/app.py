@@ -17,19 +17,33 @@ import webbrowser
 from datetime import timedelta
 from pathlib import Path
 
-import fastapi
 import imy.docstrings
 import introspection
-import uvicorn
 from PIL import Image
 
 import __main__
 import rio.global_state
 
-from . import assets, global_state, maybes, routing, utils
-from .app_server import fastapi_server
+from . import (
+    assets,
+    caching,
+    global_state,
+    json_backends,
+    maybes,
+    routing,
+    utils,
+)
+from .session_registry import InMemorySessionRegistry, SessionRegistry
 from .utils import ImageLike
 
+# `fastapi` and `uvicorn` take a long time to import, and aren't needed until
+# the app is actually served. They're imported as late as possible.
+if t.TYPE_CHECKING:
+    import fastapi
+    import uvicorn
+
+    from .app_server import fastapi_server
+
 __all__ = [
     "App",
 ]
@@ -39,7 +53,15 @@ R = t.TypeVar("R")
 T = t.TypeVar("T")
 
 
-def make_default_connection_lost_component() -> rio.Component:
+# How many pages rendered for crawlers are kept in memory at most
+CRAWLER_CACHE_SIZE = 256
+
+
+@functools.cache
+def _get_default_connection_lost_component_class() -> type[rio.Component]:
+    # The class is created lazily, because components aren't available yet
+    # while this module is being imported. It's only created once though, since
+    # creating component classes is expensive, and this runs for every session.
     class DefaultConnectionLostComponent(rio.Component):
         def build(self) -> rio.Component:
             return rio.Rectangle(
@@ -72,7 +94,11 @@ def make_default_connection_lost_component() -> rio.Component:
                 align_y=0.0,
             )
 
-    return DefaultConnectionLostComponent()
+    return DefaultConnectionLostComponent
+
+
+def make_default_connection_lost_component() -> rio.Component:
+    return _get_default_connection_lost_component_class()()
 
 
 def guard_against_rio_run(func: t.Callable[P, R]) -> t.Callable[P, R]:
@@ -187,6 +213,24 @@ class App:
             [], rio.Component
         ] = make_default_connection_lost_component,
         meta_tags: dict[str, str] = {},
+        json_backend: json_backends.JsonBackendName = "auto",
+        wire_protocol: t.Literal["json", "json+deflate"] = "json",
+        session_registry: SessionRegistry | None = None,
+        crawler_cache_duration: int | float | timedelta | None = None,
+        max_concurrent_session_creations: int | None = 32,
+        refresh_interval: int | float | timedelta = timedelta(0),
+        event_handler_thread_count: int = 8,
+        max_queued_message_bytes: int | None = 32 * 1024 * 1024,
+        disconnected_session_lifetime: int | float | timedelta = timedelta(
+            hours=1
+        ),
+        hibernate_disconnected_sessions_after: int
+        | float
+        | timedelta
+        | None = None,
+        session_sweep_interval: int | float | timedelta = timedelta(minutes=15),
+        enable_profiler: bool = False,
+        expose_metrics: bool = False,
     ) -> None:
         """
         ## Parameters
@@ -282,6 +326,90 @@ class App:
             HTML header of the app. These are used by search engines and social
             media sites to display information about your page, such as the
             title and a short description.
+
+        `json_backend`: Which library to use for encoding and decoding the
+            messages exchanged with the client. `"auto"` picks the fastest
+            installed one, preferring `orjson` over `msgspec` and falling back
+            to Python's builtin `json` module. Large pages and tables benefit
+            considerably from a fast backend.
+
+        `wire_protocol`: How messages sent to the client are encoded. With
+            `"json+deflate"`, large messages are sent as compressed binary
+            websocket frames. This can dramatically reduce the bandwidth
+            needed by the first page load, at the cost of some CPU time on the
+            server. Clients which can't decode compressed messages always
+            receive plain JSON.
+
+        `session_registry`: Where session tokens and hosted assets are stored.
+            By default they are kept in memory, which only works if the app is
+            served by a single process. To run multiple worker processes, pass
+            a `rio.session_registry.SqliteSessionRegistry` pointing to a file
+            shared by all workers.
+
+        `crawler_cache_duration`: Search engine crawlers receive pre-rendered
+            HTML, which requires building the entire page. If set, the result
+            is cached for this long, rather than rendered anew for every single
+            request. Use `App.clear_crawler_cache` if your pages' content
+            changes. Cached pages are looked up by URL alone, and anybody can
+            claim to be a crawler. Only enable this if none of your public pages
+            depend on who is requesting them, e.g. via headers. Requests
+            carrying cookies or credentials are never cached.
+
+        `max_concurrent_session_creations`: How many sessions may be set up at
+            the same time. Further clients wait in line until it's their turn.
+            When many clients connect at once, e.g. after a server restart,
+            this ensures the first ones are served quickly instead of all of
+            them being slow. Only building the initial page counts towards
+            the limit, so a slow `on_session_start` doesn't hold up other
+            clients. Pass `None` to disable the limit.
+
+        `refresh_interval`: The minimum time between two updates sent to the
+            same client. Changes made in the meantime, e.g. by a burst of
+            events, are merged into a single update. By default, changes are
+            sent as soon as the current event loop iteration is done. Values
+            like 16 milliseconds (one frame at 60 FPS) reduce the load
+            caused by rapidly firing events, at the cost of some latency.
+
+        `event_handler_thread_count`: The maximum number of threads used to run
+            event handlers decorated with `rio.event.run_in_thread`. If more
+            handlers are running at the same time, the rest wait in line.
+
+        `max_queued_message_bytes`: How much data may be waiting to be sent to
+            a single client. Messages for slow clients queue up, with
+            consecutive component updates being merged into one. Clients which
+            fall behind by more than this are disconnected. They reconnect
+            automatically and receive the current state of the page in one
+            go. Pass `None` to never disconnect clients.
+
+        `disconnected_session_lifetime`: How long to keep a session alive after
+            its client has disconnected, in case it reconnects. Once this time
+            has passed, the session is closed and the client will have to
+            reload the page.
+
+        `hibernate_disconnected_sessions_after`: Sessions hold on to all of
+            their components, even if their client is gone. If this is set,
+            sessions which have been disconnected for this long release their
+            components to save memory. If the client comes back, the page is
+            built anew. Anything stored in the session itself, like
+            attachments and the current URL, is kept, but state stored in
+            components is lost. By default sessions never hibernate.
+
+        `session_sweep_interval`: How often to check for sessions which should
+            be closed or hibernated. Sessions may thus be kept around this much
+            longer than requested.
+
+        `enable_profiler`: Whether to record how long components take to
+            build, reconcile and serialize, right from the start. The profiler
+            can also be started and stopped later on from the dev tools.
+            Profiling slows down refreshes slightly, so don't enable it in
+            production unless you need to.
+
+        `expose_metrics`: Whether to serve metrics about the app at
+            `/rio/metrics`, in the text format used by Prometheus. They include
+            how long refreshes and event handlers take, how much data is sent
+            to clients, and how many sessions and components exist. The
+            metrics are public, so make sure the route can't be reached from
+            outside your network, e.g. by blocking it in your reverse proxy.
         """
         # A common mistake is to pass types instead of instances to
         # `default_attachments`. Catch that, scream and die.
@@ -334,12 +462,92 @@ class App:
         self._theme = theme
         self._build_connection_lost_message = build_connection_lost_message
         self._custom_meta_tags = meta_tags
+        self._json_backend = json_backends.get_json_backend(json_backend)
+        self._wire_protocol = wire_protocol
+
+        if (
+            max_concurrent_session_creations is not None
+            and max_concurrent_session_creations < 1
+        ):
+            raise ValueError(
+                f"`max_concurrent_session_creations` must be at least 1, not {max_concurrent_session_creations!r}"
+            )
+
+        self._max_concurrent_session_creations = (
+            max_concurrent_session_creations
+        )
+
+        if event_handler_thread_count < 1:
+            raise ValueError(
+                f"`event_handler_thread_count` must be at least 1, not {event_handler_thread_count!r}"
+            )
+
+        self._event_handler_thread_count = event_handler_thread_count
+        self._max_queued_message_bytes = max_queued_message_bytes
+        self._enable_profiler = enable_profiler
+        self._expose_metrics = expose_metrics
+
+        if session_registry is None:
+            self._session_registry = InMemorySessionRegistry()
+        else:
+            self._session_registry = session_registry
 
         if isinstance(ping_pong_interval, timedelta):
             self._ping_pong_interval = ping_pong_interval
         else:
             self._ping_pong_interval = timedelta(seconds=ping_pong_interval)
 
+        if isinstance(refresh_interval, timedelta):
+            self._refresh_interval = refresh_interval
+        else:
+            self._refresh_interval = timedelta(seconds=refresh_interval)
+
+        if isinstance(disconnected_session_lifetime, timedelta):
+            self._disconnected_session_lifetime = disconnected_session_lifetime
+        else:
+            self._disconnected_session_lifetime = timedelta(
+                seconds=disconnected_session_lifetime
+            )
+
+        if hibernate_disconnected_sessions_after is None or isinstance(
+            hibernate_disconnected_sessions_after, timedelta
+        ):
+            self._hibernate_disconnected_sessions_after = (
+                hibernate_disconnected_sessions_after
+            )
+        else:
+            self._hibernate_disconnected_sessions_after = timedelta(
+                seconds=hibernate_disconnected_sessions_after
+            )
+
+        if isinstance(session_sweep_interval, timedelta):
+            self._session_sweep_interval = session_sweep_interval
+        else:
+            self._session_sweep_interval = timedelta(
+                seconds=session_sweep_interval
+            )
+
+        if self._session_sweep_interval <= timedelta(0):
+            raise ValueError(
+                f"`session_sweep_interval` must be positive, not {session_sweep_interval!r}"
+            )
+
+        # Pages rendered for crawlers, by URL
+        self._crawler_cache: (
+            caching.TtlLruCache[str, fastapi_server.CrawlerRender] | None
+        ) = None
+
+        if crawler_cache_duration is not None:
+            if not isinstance(crawler_cache_duration, timedelta):
+                crawler_cache_duration = timedelta(
+                    seconds=crawler_cache_duration
+                )
+
+            self._crawler_cache = caching.TtlLruCache(
+                max_size=CRAWLER_CACHE_SIZE,
+                time_to_live=crawler_cache_duration,
+            )
+
         # Initialized lazily, when the icon is first requested
         #
         # This starts out as `None`, then either becomes a `bytes` object if
@@ -521,10 +729,14 @@ class App:
             except AttributeError:
                 main_file = Path(sys.argv[0])
 
-        # Find out if we're being executed by uvicorn
+        # Find out if we're being executed by uvicorn. If so, it has already
+        # been imported.
+        uvicorn_module = sys.modules.get("uvicorn")
+
         if (
             main_file.name != "__main__.py"
-            or main_file.parent != Path(uvicorn.__file__).parent
+            or uvicorn_module is None
+            or main_file.parent != Path(uvicorn_module.__file__).parent  # type: ignore
         ):
             return main_file
 
@@ -678,6 +890,8 @@ class App:
         """
         Internal equivalent of `as_fastapi` that takes additional arguments.
         """
+        from .app_server import fastapi_server
+
         # Make sure all globals are initialized. This should be done as late as
         # possible, because it depends on which modules have been imported into
         # `sys.modules`.
@@ -768,6 +982,8 @@ class App:
         Internal equivalent of `run_as_web_server` that takes additional
         arguments.
         """
+        import uvicorn
+
         port = utils.ensure_valid_port(host, port)
 
         # Suppress stdout messages if requested
@@ -1047,6 +1263,8 @@ pixels_per_rem;
             )
 
         finally:
+            import uvicorn
+
             assert isinstance(server, uvicorn.Server)
 
             server.should_exit = True
@@ -1151,6 +1369,33 @@ pixels_per_rem;
 
         self.default_attachments.append(attachment)
 
+    def clear_crawler_cache(self, url: str | rio.URL | None = None) -> None:
+        """
+        Discards pages pre-rendered for crawlers.
+
+        When a search engine crawler visits your app, Rio renders the requested
+        page to HTML and caches the result for some time (see the
+        `crawler_cache_duration` parameter). If the content of your pages
+        changes, call this function so crawlers receive the new content right
+        away.
+
+        ## Parameters
+
+        `url`: The full URL of the page to discard, as requested by the
+            crawler. If `None`, all pages are discarded.
+        """
+        if self._crawler_cache is None:
+            return
+
+        from .app_server import fastapi_server
+
+        if url is None:
+            self._crawler_cache.clear()
+        else:
+            self._crawler_cache.invalidate(
+                fastapi_server.get_crawler_cache_key(url)
+            )
+
     def __getitem__(self, key: t.Type[T], /) -> T:
         """
         Retrieves a default attachment by its type.
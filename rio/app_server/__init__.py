@@ -1,3 +1,23 @@
+import importlib
+import typing as t
+
 from .abstract_app_server import *
-from .fastapi_server import *
 from .testing_server import *
+
+if t.TYPE_CHECKING:
+    from . import fastapi_server as fastapi_server
+    from .fastapi_server import *
+
+
+# `fastapi_server` imports `fastapi` and `uvicorn`, which take a long time to
+# load. It's only imported once it's actually needed.
+def __getattr__(name: str) -> object:
+    if name == "fastapi_server":
+        return importlib.import_module(".fastapi_server", __name__)
+
+    if name == "FastapiServer":
+        return importlib.import_module(
+            ".fastapi_server", __name__
+        ).FastapiServer
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
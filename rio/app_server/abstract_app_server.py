@@ -2,6 +2,8 @@ from __future__ import annotations
 
 import abc
 import asyncio
+import contextlib
+import functools
 import inspect
 import json
 import logging
@@ -9,10 +11,9 @@ import time
 import traceback
 import warnings
 import weakref
-from datetime import date
+from datetime import date, timedelta, tzinfo
 from pathlib import Path
 
-import langcodes
 import pytz
 import starlette.datastructures
 
@@ -21,8 +22,13 @@ import rio.assets
 
 from .. import (
     assets,
+    caching,
     data_models,
+    handler_thread_pool,
     language_info,
+    memory_usage,
+    metrics,
+    profiler,
     routing,
     session,
     user_settings_module,
@@ -37,6 +43,53 @@ from ..transports import (
 __all__ = ["AbstractAppServer"]
 
 
+# Clients send their locale information with every new session, but there are
+# only so many different locales. Cache the results of processing them. The
+# values come from the client, so the caches must be bounded.
+LOCALE_CACHE_SIZE = 1024
+
+
+@functools.lru_cache(maxsize=LOCALE_CACHE_SIZE)
+def _standardize_language_tag(language: str) -> str | None:
+    """
+    Returns the standardized version of the given language tag, or `None` if
+    it isn't a valid tag.
+    """
+    # `langcodes` takes a while to import, so only do so once it's needed
+    import langcodes
+
+    try:
+        return langcodes.standardize_tag(language)
+    except ValueError:
+        return None
+
+
+@functools.lru_cache(maxsize=LOCALE_CACHE_SIZE)
+def _is_valid_date_format_string(date_format_string: str) -> bool:
+    try:
+        formatted_date = date(3333, 11, 22).strftime(date_format_string)
+    except ValueError:
+        return False
+
+    return (
+        "33" in formatted_date
+        and "11" in formatted_date
+        and "22" in formatted_date
+    )
+
+
+@functools.lru_cache(maxsize=LOCALE_CACHE_SIZE)
+def _get_timezone(timezone_name: str) -> tzinfo | None:
+    """
+    Returns the timezone with the given name, or `None` if there is no such
+    timezone.
+    """
+    try:
+        return pytz.timezone(timezone_name)
+    except pytz.UnknownTimeZoneError:
+        return None
+
+
 class AbstractAppServer(abc.ABC):
     def __init__(
         self,
@@ -73,6 +126,40 @@ class AbstractAppServer(abc.ABC):
         self._session_serve_tasks = dict[rio.Session, asyncio.Task[object]]()
         self._disconnected_sessions = dict[rio.Session, float]()
 
+        # Limits how many sessions are created at the same time. Creating a
+        # session is expensive, and if many clients connect at once (e.g. all
+        # reconnecting after a deploy), interleaving all of them would make
+        # every single one slow. Queueing them finishes the first ones quickly.
+        self._session_creation_semaphore: (
+            asyncio.Semaphore | contextlib.nullcontext[None]
+        )
+
+        if app._max_concurrent_session_creations is None:
+            self._session_creation_semaphore = contextlib.nullcontext()
+        else:
+            self._session_creation_semaphore = asyncio.Semaphore(
+                app._max_concurrent_session_creations
+            )
+
+        # Nearly all sessions use one of the app's themes. Computing the CSS for
+        # a theme isn't free, so it's shared between sessions. Maps the id of
+        # each theme to the theme itself and its CSS variables.
+        self._theme_css_cache: caching.TtlLruCache[
+            int, tuple[rio.Theme, dict[str, str]]
+        ] = caching.TtlLruCache(max_size=16)
+
+        # Synchronous event handlers which must not block the event loop are
+        # run in here
+        self.handler_thread_pool = handler_thread_pool.HandlerThreadPool(
+            max_workers=app._event_handler_thread_count
+        )
+
+        # Build, reconciliation and serialization timings of all sessions
+        self.profiler = profiler.Profiler(enabled=app._enable_profiler)
+
+        # Refresh, message and session statistics for production monitoring
+        self.metrics = metrics.Metrics()
+
     @property
     def sessions(self) -> list[rio.Session]:
         return list(self._session_serve_tasks)
@@ -88,7 +175,10 @@ class AbstractAppServer(abc.ABC):
         # If running as a server, periodically clean up expired sessions
         if not self.running_in_window:
             asyncio.create_task(
-                _periodically_clean_up_expired_sessions(weakref.ref(self)),
+                _periodically_clean_up_expired_sessions(
+                    weakref.ref(self),
+                    self.app._session_sweep_interval,
+                ),
                 name="Periodic session cleanup",
             )
 
@@ -118,6 +208,84 @@ class AbstractAppServer(abc.ABC):
 
         await self._call_on_app_close()
 
+        self.handler_thread_pool.shutdown()
+
+    def _clean_up_disconnected_sessions(self) -> None:
+        """
+        Closes sessions whose client hasn't reconnected in a long time, and
+        hibernates ones which have been disconnected for a while, if the app
+        is configured to do so.
+        """
+        now = time.monotonic()
+        lifetime = self.app._disconnected_session_lifetime
+        hibernation_delay = self.app._hibernate_disconnected_sessions_after
+
+        disconnected_sessions = list(self._disconnected_sessions.items())
+        for sess, disconnect_time in disconnected_sessions:
+            disconnected_for = now - disconnect_time
+
+            if disconnected_for > lifetime.total_seconds():
+                sess.close()
+                self.metrics.sessions_expired.increment()
+            elif (
+                hibernation_delay is not None
+                and disconnected_for > hibernation_delay.total_seconds()
+                and not sess._is_hibernating
+            ):
+                sess._hibernate()
+                self.metrics.sessions_hibernated.increment()
+
+    def get_session_memory_usage(
+        self,
+    ) -> dict[rio.Session, memory_usage.SessionMemoryUsage]:
+        """
+        Estimates how much memory each session occupies. This walks the
+        component trees of all sessions, so it isn't cheap.
+        """
+        return {sess: sess._get_memory_usage() for sess in self.sessions}
+
+    def render_metrics(self) -> str:
+        """
+        Returns the server's metrics in Prometheus' text exposition format.
+        """
+        sessions = self.sessions
+        thread_pool_stats = self.handler_thread_pool.stats()
+
+        gauges = [
+            (
+                "rio_sessions",
+                "Number of sessions, connected or not.",
+                len(sessions),
+            ),
+            (
+                "rio_disconnected_sessions",
+                "Number of sessions waiting for their client to reconnect.",
+                len(self._disconnected_sessions),
+            ),
+            (
+                "rio_live_components",
+                "Number of components in all sessions.",
+                sum(len(sess._weak_components_by_id) for sess in sessions),
+            ),
+            (
+                "rio_queued_message_bytes",
+                "Size of the messages waiting to be sent to clients.",
+                sum(sess._outgoing_message_bytes for sess in sessions),
+            ),
+            (
+                "rio_event_handler_threads_busy",
+                "Number of event handlers running in threads.",
+                thread_pool_stats.running,
+            ),
+            (
+                "rio_event_handler_threads_queued",
+                "Number of event handlers waiting for a free thread.",
+                thread_pool_stats.queued,
+            ),
+        ]
+
+        return self.metrics.render_prometheus_text(gauges)
+
     async def _call_on_app_starts(self) -> None:
         rio._logger.debug("Calling `on_app_start`")
 
@@ -227,6 +395,10 @@ class AbstractAppServer(abc.ABC):
         task = self._session_serve_tasks.pop(session)
         task.cancel("Session has closed")
 
+        # Closing the session has also dropped its transport, which marks it as
+        # disconnected. It won't reconnect anymore, so don't keep it around.
+        self._disconnected_sessions.pop(session, None)
+
     async def create_session(
         self,
         initial_message: data_models.InitialClientMessage,
@@ -239,17 +411,42 @@ class AbstractAppServer(abc.ABC):
         """
         Creates a new session.
 
+        If the app limits how many sessions may be created concurrently, this
+        waits until it's this session's turn to build its initial page.
+        `on_session_start` handlers run before that and don't count towards the
+        limit.
+
         ## Raises
 
         `NavigationFailed`: If a page guard crashes
         """
+        sess = await self._create_session(
+            initial_message,
+            transport=transport,
+            client_ip=client_ip,
+            client_port=client_port,
+            http_headers=http_headers,
+        )
+
+        self.metrics.sessions_created.increment()
+        return sess
+
+    async def _create_session(
+        self,
+        initial_message: data_models.InitialClientMessage,
+        *,
+        transport: AbstractTransport,
+        client_ip: str,
+        client_port: int,
+        http_headers: starlette.datastructures.Headers,
+    ) -> rio.Session:
         # Normalize and deduplicate the languages
         preferred_languages: list[str] = []
 
         for language in initial_message.preferred_languages:
-            try:
-                language = langcodes.standardize_tag(language)
-            except ValueError:
+            language = _standardize_language_tag(language)
+
+            if language is None:
                 continue
 
             if language not in preferred_languages:
@@ -278,34 +475,28 @@ class AbstractAppServer(abc.ABC):
         )
 
         # Make sure the date format string is valid
-        try:
-            formatted_date = date(3333, 11, 22).strftime(
-                initial_message.date_format_string
-            )
-        except ValueError:
-            date_format_string_is_valid = False
-        else:
-            date_format_string_is_valid = (
-                "33" in formatted_date
-                and "11" in formatted_date
-                and "22" in formatted_date
-            )
-
-        if not date_format_string_is_valid:
+        if not _is_valid_date_format_string(initial_message.date_format_string):
             logging.warning(
                 f'Client sent invalid date format string "{initial_message.date_format_string}". Using "%Y-%m-%d" instead.'
             )
             initial_message.date_format_string = "%Y-%m-%d"
 
         # Parse the timezone
-        try:
-            timezone = pytz.timezone(initial_message.timezone)
-        except pytz.UnknownTimeZoneError:
+        timezone = _get_timezone(initial_message.timezone)
+
+        if timezone is None:
             logging.warning(
                 f'Client sent unknown timezone "{initial_message.timezone}". Using UTC instead.'
             )
             timezone = pytz.UTC
 
+        # Pick the wire protocol. The app may prefer compressed messages, but
+        # only if the client knows how to decode them.
+        if self.app._wire_protocol in initial_message.wire_protocols:
+            wire_protocol = self.app._wire_protocol
+        else:
+            wire_protocol = "json"
+
         # Set the theme according to the user's preferences
         theme = self.app._theme
         if isinstance(theme, tuple):
@@ -355,6 +546,7 @@ class AbstractAppServer(abc.ABC):
             scroll_bar_size=initial_message.scroll_bar_size,
             primary_pointer_type=initial_message.primary_pointer_type,
             theme_=theme,
+            wire_protocol=wire_protocol,
         )
 
         # Deserialize the user settings
@@ -467,8 +659,12 @@ class AbstractAppServer(abc.ABC):
         # Apply the CSS for the chosen theme
         await sess._apply_theme(theme)
 
-        # Send the first `updateComponentStates` message
-        await sess._refresh()
+        # Send the first `updateComponentStates` message. Building the initial
+        # page is the expensive part of creating a session, so this is what's
+        # limited. `on_session_start` may wait for I/O for a long time, so it
+        # mustn't hold up other clients.
+        async with self._session_creation_semaphore:
+            await sess._refresh()
 
         return sess
 
@@ -485,24 +681,16 @@ class AbstractAppServer(abc.ABC):
 
 async def _periodically_clean_up_expired_sessions(
     app_server_ref: weakref.ReferenceType[AbstractAppServer],
+    interval: timedelta,
 ) -> None:
-    LOOP_INTERVAL = 60 * 15
-    SESSION_LIFETIME = 60 * 60
-
     while True:
-        await asyncio.sleep(LOOP_INTERVAL)
+        await asyncio.sleep(interval.total_seconds())
 
         app_server = app_server_ref()
         if app_server is None:
             return
 
-        now = time.monotonic()
-        cutoff = now - SESSION_LIFETIME
-
-        disconnected_sessions = list(app_server._disconnected_sessions.items())
-        for sess, disconnect_time in disconnected_sessions:
-            if disconnect_time < cutoff:
-                sess.close()
+        app_server._clean_up_disconnected_sessions()
 
         # Drop the reference to the app server
         app_server = None
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import dataclasses
 import functools
 import html
 import json
@@ -9,13 +10,13 @@ import logging
 import secrets
 import tempfile
 import typing as t
-import weakref
 from datetime import timedelta
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
 import crawlerdetect
 import fastapi
+import starlette.datastructures
 import streaming_form_data.targets
 import timer_dict
 from uniserde import Jsonable, JsonDoc
@@ -31,6 +32,7 @@ from .. import (
     icon_registry,
     inspection,
     routing,
+    session_registry,
     utils,
 )
 from ..errors import AssetError
@@ -179,6 +181,33 @@ class SpooledTempfilesTarget(streaming_form_data.targets.BaseTarget):
         self._current_file_size = 0
 
 
+@dataclasses.dataclass(frozen=True)
+class CrawlerRender:
+    """
+    The result of rendering a page for a crawler. Either `redirect_url` is set,
+    or the remaining fields describe the page.
+    """
+
+    redirect_url: str | None
+    initial_messages: list[JsonDoc]
+    title: str
+
+
+# Crawler requests with any of these headers are rendered, but not cached
+UNCACHEABLE_HEADERS = ("cookie", "authorization", "proxy-authorization")
+
+
+def get_crawler_cache_key(url: str | rio.URL) -> str:
+    """
+    Returns the key under which the page rendered for the given URL is cached.
+    """
+    # The fragment is never sent to the server, so it can't affect the page.
+    # Anything else can be inspected by page guards and components, so it must
+    # be kept. In particular, stripping trailing slashes or similar would risk
+    # caching a redirect under the URL it redirects to.
+    return str(rio.URL(str(url)).with_fragment(None))
+
+
 class FastapiServer(fastapi.FastAPI, AbstractAppServer):
     def __init__(
         self,
@@ -239,30 +268,26 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
         self._can_create_new_sessions = asyncio.Event()
         self._can_create_new_sessions.set()
 
-        # The session tokens and Request object for all clients that have made a
-        # HTTP request, but haven't yet established a websocket connection. Once
-        # the websocket connection is created, these will be turned into
-        # Sessions.
-        self._latent_session_tokens: dict[str, fastapi.Request] = {}
+        # Stores the session tokens for all clients that have made a HTTP
+        # request, but haven't yet established a websocket connection. Once the
+        # websocket connection is created, these will be turned into Sessions.
+        #
+        # It also stores all assets that have been registered with this server.
+        # These are hosted under `/asset/temp-{asset_id}`. In addition the
+        # server also permanently hosts other "well known" assets (such as
+        # javascript dependencies) which are available under public URLS at
+        # `/asset/{some-name}`.
+        #
+        # Depending on the app's configuration this information may be shared
+        # with other processes serving the same app.
+        self._session_registry = app_._session_registry
 
-        # The session tokens for all active sessions. These allow clients to
-        # identify themselves, for example to reconnect in case of a lost
-        # connection.
+        # The session tokens for all active sessions in this process. These
+        # allow clients to identify themselves, for example to reconnect in
+        # case of a lost connection.
         self._active_session_tokens: dict[str, rio.Session] = {}
         self._active_tokens_by_session: dict[rio.Session, str] = {}
 
-        # All assets that have been registered with this session. They are held
-        # weakly, meaning the session will host assets for as long as their
-        # corresponding Python objects are alive.
-        #
-        # Assets registered here are hosted under `/asset/temp-{asset_id}`. In
-        # addition the server also permanently hosts other "well known" assets
-        # (such as javascript dependencies) which are available under public
-        # URLS at `/asset/{some-name}`.
-        self._assets: weakref.WeakValueDictionary[str, assets.Asset] = (
-            weakref.WeakValueDictionary()
-        )
-
         # All pending file uploads. These are stored in memory for a limited
         # time. When a file is uploaded the corresponding future is set.
         self._pending_file_uploads: timer_dict.TimerDict[
@@ -314,6 +339,12 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
         )
         self.add_api_websocket_route("/rio/ws", self._serve_websocket)
 
+        # Metrics for monitoring systems, if the app wants them to be public
+        if app_._expose_metrics:
+            self.add_api_route(
+                "/rio/metrics", self._serve_metrics, methods=["GET"]
+            )
+
         # This route is only used in `debug_mode`. When the websocket connection
         # is interrupted, the frontend polls this route and then either
         # reconnects or reloads depending on whether its session token is still
@@ -359,6 +390,7 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
             yield
         finally:
             await self._on_close()
+            await self._session_registry.close()
 
     def external_url_for_user_asset(self, relative_asset_path: Path) -> rio.URL:
         base_url = rio.URL("/") if self.base_url is None else self.base_url
@@ -377,7 +409,7 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
         The URL is absolute if the server had a base URL set, or otherwise
         relative (i.e. starting with `/`).
         """
-        self._assets[asset.secret_id] = asset
+        self._session_registry.host_asset(asset)
         base_url = rio.URL("/") if self.base_url is None else self.base_url
         return base_url / f"rio/assets/temp/{asset.secret_id}"
 
@@ -443,49 +475,30 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
             request.headers.get("User-Agent")
         )
         if is_crawler:
-            # If it's a crawler, immediately create a Session for it. Instead of
-            # a websocket connection, outgoing messages are simply appended to a
-            # list which will be included in the HTML.
-            transport = MessageRecorderTransport()
-            initial_messages = transport.sent_messages
-
-            assert request.client is not None, "How can this happen?!"
-
-            requested_url = rio.URL(str(request.url))
-            try:
-                session = await self.create_session(
-                    initial_message=data_models.InitialClientMessage.from_defaults(
-                        url=str(requested_url),
-                    ),
-                    transport=transport,
-                    client_ip=request.client.host,
-                    client_port=request.client.port,
-                    http_headers=request.headers,
-                )
-            except routing.NavigationFailed:
-                raise fastapi.HTTPException(
-                    status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Navigation to initial page `{request.url}` has failed.",
-                ) from None
-
-            session.close()
+            rendered = await self._get_crawler_render(request)
 
             # If a page guard caused a redirect, tell that to the crawler in a
             # language it understands
-            if session.active_page_url != requested_url:
-                return fastapi.responses.RedirectResponse(
-                    str(session.active_page_url)
-                )
+            if rendered.redirect_url is not None:
+                return fastapi.responses.RedirectResponse(rendered.redirect_url)
 
+            initial_messages = rendered.initial_messages
             session_token = "<crawler>"
-
-            title = " - ".join(
-                page.name for page in session.active_page_instances
-            )
+            title = rendered.title
         else:
             # Create a session token that uniquely identifies this client
+            assert request.client is not None, "How can this happen?!"
+
             session_token = secrets.token_urlsafe()
-            self._latent_session_tokens[session_token] = request
+            await self._session_registry.add_latent_session(
+                session_token,
+                session_registry.LatentSession(
+                    url=str(request.url),
+                    client_ip=request.client.host,
+                    client_port=request.client.port,
+                    http_headers=tuple(request.headers.items()),
+                ),
+            )
 
             title = self.app.name
 
@@ -572,6 +585,82 @@ class FastapiServer(fastapi.FastAPI, AbstractAppServer):
         # Respond
         return fastapi.responses.HTMLResponse(html_)
 
+    async def _get_crawler_render(
+        self,
+        request: fastapi.Request,
+    ) -> CrawlerRender:
+        """
+        Returns the requested page rendered for a crawler. Rendering requires
+        building an entire session, and crawlers tend to request the same pages
+        over and over, so the result is cached.
+        """
+        cache = self.app._crawler_cache
+
+        # The cache is keyed by URL only. Pages requested with cookies or
+        # credentials may contain private information, and must never be
+        # served to somebody else.
+        if cache is None or any(
+            header in request.headers for header in UNCACHEABLE_HEADERS
+        ):
+            return await self._render_for_crawler(request)
+
+        cache_key = get_crawler_cache_key(str(request.url))
+        rendered = cache.get(cache_key)
+
+        if rendered is None:
+            rendered = await self._render_for_crawler(request)
+            cache.put(cache_key, rendered)
+
+        return rendered
+
+    async def _render_for_crawler(
+        self,
+        request: fastapi.Request,
+    ) -> CrawlerRender:
+        """
+        Creates a session for a crawler, and returns everything needed to
+        display the requested page without a websocket connection.
+        """
+        # Instead of a websocket connection, outgoing messages are simply
+        # appended to a list which will be included in the HTML.
+        transport = MessageRecorderTransport()
+
+        assert request.client is not None, "How can this happen?!"
+
+        requested_url = rio.URL(str(request.url))
+        try:
+            session = await self.create_session(
+                initial_message=data_models.InitialClientMessage.from_defaults(
+                    url=str(requested_url),
+                ),
+                transport=transport,
+                client_ip=request.client.host,
+                client_port=request.client.port,
+                http_headers=request.headers,
+            )
+        except routing.NavigationFailed:
+            raise fastapi.HTTPException(
+                status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Navigation to initial page `{request.url}` has failed.",
+            ) from None
+
+        session.close()
+
+        if session.active_page_url != requested_url:
+            return CrawlerRender(
+                redirect_url=str(session.active_page_url),
+                initial_messages=[],
+                title="",
+            )
+
+        return CrawlerRender(
+            redirect_url=None,
+            initial_messages=transport.sent_messages,
+            title=" - ".join(
+                page.name for page in session.active_page_instances
+            ),
+        )
+
     async def _serve_robots(
         self, request: fastapi.Request
     ) -> fastapi.responses.Response:
@@ -597,6 +686,15 @@ Sitemap: {base_url / "rio/sitemap"}
             media_type="text/plain",
         )
 
+    async def _serve_metrics(self) -> fastapi.responses.Response:
+        """
+        Handler for serving the app's metrics in Prometheus' text format.
+        """
+        return fastapi.responses.Response(
+            content=self.render_metrics(),
+            media_type="text/plain; version=0.0.4",
+        )
+
     async def _serve_sitemap(
         self, request: fastapi.Request
     ) -> fastapi.responses.Response:
@@ -635,19 +733,19 @@ Sitemap: {base_url / "rio/sitemap"}
             media_type="image/png",
         )
 
+    @add_cache_headers
     async def _serve_frontend_asset(
         self,
         request: fastapi.Request,
         asset_id: str,
     ) -> fastapi.responses.Response:
-        response = await self._serve_file_from_directory(
+        # The frontend's files are only shipped in compressed form. They're
+        # picked up as precompressed variants of the requested file.
+        return await self._serve_file_from_directory(
             request,
             utils.FRONTEND_ASSETS_DIR,
-            asset_id + ".gz",
+            asset_id,
         )
-        response.headers["content-encoding"] = "gzip"
-
-        return response
 
     @add_cache_headers
     async def _serve_special_asset(
@@ -669,6 +767,7 @@ Sitemap: {base_url / "rio/sitemap"}
 
         return fastapi.responses.Response(status_code=404)
 
+    @add_cache_headers
     async def _serve_hosted_asset(
         self,
         request: fastapi.Request,
@@ -685,12 +784,19 @@ Sitemap: {base_url / "rio/sitemap"}
         request: fastapi.Request,
         asset_id: str,
     ) -> fastapi.responses.Response:
-        return await self._serve_file_from_directory(
+        response = await self._serve_file_from_directory(
             request,
             self.app.assets_dir,
             asset_id,
         )
 
+        # The user can change their assets at any time, and unlike other
+        # assets their URLs don't change along with their content. Make sure
+        # browsers check for new versions. Thanks to ETags this is cheap.
+        response.headers["Cache-Control"] = "no-cache"
+
+        return response
+
     @add_cache_headers
     async def _serve_temp_asset(
         self,
@@ -699,16 +805,27 @@ Sitemap: {base_url / "rio/sitemap"}
     ) -> fastapi.responses.Response:
         # Get the asset's Python instance. The asset's id acts as a secret, so
         # no further authentication is required.
-        try:
-            asset = self._assets[asset_id]
-        except KeyError:
+        asset = await self._session_registry.get_asset(asset_id)
+
+        if asset is None:
             return fastapi.responses.Response(status_code=404)
 
         # Fetch the asset's content and respond
         if isinstance(asset, assets.BytesAsset):
+            # The asset's id is derived from its content, so it makes for a
+            # perfect ETag
+            etag = f'"{asset_id}"'
+
+            if byte_serving.is_not_modified(request, etag):
+                return fastapi.responses.Response(
+                    status_code=fastapi.status.HTTP_304_NOT_MODIFIED,
+                    headers={"etag": etag},
+                )
+
             return fastapi.responses.Response(
                 content=asset.data,
                 media_type=asset.media_type,
+                headers={"etag": etag},
             )
         elif isinstance(asset, assets.PathAsset):
             return byte_serving.range_requests_response(
@@ -719,7 +836,6 @@ Sitemap: {base_url / "rio/sitemap"}
         else:
             assert False, f"Unable to serve asset of unknown type: {asset}"
 
-    @add_cache_headers
     async def _serve_file_from_directory(
         self,
         request: fastapi.Request,
@@ -883,7 +999,7 @@ Sitemap: {base_url / "rio/sitemap"}
         self, request: fastapi.Request, session_token: str
     ) -> fastapi.Response:
         return fastapi.responses.JSONResponse(
-            session_token in self._active_session_tokens
+            await self._session_registry.is_active_session(session_token)
         )
 
     @contextlib.contextmanager
@@ -924,13 +1040,28 @@ Sitemap: {base_url / "rio/sitemap"}
         # Look up the session token. If it is valid the session's duration is
         # refreshed so it doesn't expire. If the token is not valid, don't
         # accept the websocket.
-        try:
-            request = self._latent_session_tokens.pop(session_token)
-        except KeyError:
+        latent_session = await self._session_registry.pop_latent_session(
+            session_token
+        )
+
+        if latent_session is None:
             # Check if this is a reconnect
             try:
                 sess = self._active_session_tokens[session_token]
             except KeyError:
+                # The session may be alive in another process serving this app.
+                # Sessions can't be moved between processes, but the client
+                # will keep trying to reconnect and eventually reach the
+                # correct one.
+                if await self._session_registry.is_active_session(
+                    session_token
+                ):
+                    await websocket.close(
+                        3001,  # Custom error code
+                        "Session is running in another process.",
+                    )
+                    return
+
                 # Inform the client that this session token is invalid
                 await websocket.close(
                     3000,  # Custom error code
@@ -950,7 +1081,9 @@ Sitemap: {base_url / "rio/sitemap"}
                 return
 
             # Replace the session's websocket
-            sess._transport = transport = FastapiWebsocketTransport(websocket)
+            sess._transport = transport = FastapiWebsocketTransport(
+                websocket, self.app._json_backend
+            )
 
             # Make sure the client is in sync with the server by refreshing
             # every single component
@@ -966,11 +1099,13 @@ Sitemap: {base_url / "rio/sitemap"}
             )
 
         else:
-            transport = FastapiWebsocketTransport(websocket)
+            transport = FastapiWebsocketTransport(
+                websocket, self.app._json_backend
+            )
 
             try:
                 sess = await self._create_session_from_websocket(
-                    session_token, request, websocket, transport
+                    latent_session, websocket, transport
                 )
             except fastapi.WebSocketDisconnect:
                 # If the websocket disconnected while we were initializing the
@@ -979,6 +1114,7 @@ Sitemap: {base_url / "rio/sitemap"}
 
             self._active_session_tokens[session_token] = sess
             self._active_tokens_by_session[sess] = session_token
+            await self._session_registry.add_active_session(session_token)
 
             # Trigger a refresh. This will also send the initial state to
             # the frontend.
@@ -996,21 +1132,26 @@ Sitemap: {base_url / "rio/sitemap"}
 
     async def _create_session_from_websocket(
         self,
-        session_token: str,
-        request: fastapi.Request,
+        latent_session: session_registry.LatentSession,
         websocket: fastapi.WebSocket,
         transport: FastapiWebsocketTransport,
     ) -> rio.Session:
-        assert request.client is not None, "Why can this happen?"
-
         # Upon connecting, the client sends an initial message containing
         # information about it. Wait for that, but with a timeout - otherwise
         # evildoers could overload the server with connections that never send
         # anything.
-        initial_message_json: Jsonable = await asyncio.wait_for(
-            websocket.receive_json(),
+        initial_message_text = await asyncio.wait_for(
+            websocket.receive_text(),
             timeout=60,
         )
+        initial_message_json: Jsonable = self.app._json_backend.loads(
+            initial_message_text
+        )
+
+        # uniserde doesn't fill in default values, so take care of fields
+        # which older clients don't send
+        if isinstance(initial_message_json, dict):
+            initial_message_json.setdefault("wireProtocols", ["json"])
 
         initial_message = data_models.InitialClientMessage.from_json(
             initial_message_json  # type: ignore
@@ -1020,15 +1161,20 @@ Sitemap: {base_url / "rio/sitemap"}
             sess = await self.create_session(
                 initial_message,
                 transport=transport,
-                client_ip=request.client.host,
-                client_port=request.client.port,
-                http_headers=request.headers,
+                client_ip=latent_session.client_ip,
+                client_port=latent_session.client_port,
+                http_headers=starlette.datastructures.Headers(
+                    raw=[
+                        (name.encode("latin-1"), value.encode("latin-1"))
+                        for name, value in latent_session.http_headers
+                    ]
+                ),
             )
         except routing.NavigationFailed:
             # TODO: Notify the client? Show an error?
             raise fastapi.HTTPException(
                 status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Navigation to initial page `{request.url}` has failed.",
+                detail=f"Navigation to initial page `{latent_session.url}` has failed.",
             ) from None
 
         return sess
@@ -1044,3 +1190,4 @@ Sitemap: {base_url / "rio/sitemap"}
             return
 
         del self._active_session_tokens[session_token]
+        self._session_registry.remove_active_session(session_token)
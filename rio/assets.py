@@ -3,8 +3,12 @@ from __future__ import annotations
 import abc
 import hashlib
 import io
+import itertools
 import os
+import secrets
+import threading
 import typing as t
+import weakref
 from pathlib import Path
 
 import typing_extensions as te
@@ -32,6 +36,64 @@ def _securely_hash_bytes_changes_between_runs(data: bytes) -> bytes:
     return hasher.digest()
 
 
+# Payloads up to this size are always hashed in full. Larger ones are only
+# fingerprinted by hashing their size and a couple of evenly spaced samples.
+FULL_HASH_THRESHOLD = 256 * 1024
+FINGERPRINT_SAMPLE_SIZE = 16 * 1024
+FINGERPRINT_SAMPLE_COUNT = 8
+
+# Fingerprints only look at part of the data, so they're easy to collide on
+# purpose. Keying them with a per-process secret prevents that, and also means
+# that a fingerprint-based URL, which browsers may have cached, is never reused
+# for different content after a restart.
+_FINGERPRINT_KEY = secrets.token_bytes(32)
+
+# Maps each fingerprint to the asset which has claimed it. Other assets with
+# the same fingerprint share its id if their data is identical. Entries
+# disappear along with their assets.
+_FINGERPRINT_OWNERS: weakref.WeakValueDictionary[bytes, BytesAsset] = (
+    weakref.WeakValueDictionary()
+)
+
+# Once its owner is gone, it's impossible to tell whether new data with the
+# same fingerprint is the same content. Browsers may have cached the old id
+# though, so each claim of a fingerprint gets an id of its own.
+_FINGERPRINT_CLAIM_COUNTER = itertools.count()
+
+# Maps the `id()` of `bytes` objects to an asset created from them, so creating
+# assets from the same object over and over doesn't process the data each time.
+# `bytes` can't be weakly referenced, but the assets can. As long as an asset is
+# alive, so is its data, so the `id()` can't have been reused. Entries disappear
+# along with their assets, so no data is kept alive by this.
+_ASSETS_BY_DATA_ID: weakref.WeakValueDictionary[int, BytesAsset] = (
+    weakref.WeakValueDictionary()
+)
+
+# Secret ids are also computed in worker threads, e.g. when rendering plots
+_SECRET_ID_LOCK = threading.Lock()
+
+
+def _fingerprint_bytes(data: bytes | bytearray) -> bytes:
+    """
+    Returns a keyed hash of the data's size and a fixed number of samples from
+    it. This takes constant time regardless of the data's size, but different
+    data can have the same fingerprint.
+    """
+    hasher = hashlib.blake2b(key=_FINGERPRINT_KEY, digest_size=32)
+    hasher.update(len(data).to_bytes(8, "little"))
+
+    view = memoryview(data)
+    stride = (len(data) - FINGERPRINT_SAMPLE_SIZE) // (
+        FINGERPRINT_SAMPLE_COUNT - 1
+    )
+
+    for ii in range(FINGERPRINT_SAMPLE_COUNT):
+        start = ii * stride
+        hasher.update(view[start : start + FINGERPRINT_SAMPLE_SIZE])
+
+    return hasher.digest()
+
+
 _ASSETS: dict[tuple[bytes | Path | URL, str | None], Asset] = {}
 
 
@@ -212,10 +274,51 @@ class BytesAsset(HostedAsset):
         return self.data, self.media_type
 
     def _get_secret_id(self) -> str:
-        # TODO: Consider only hashing part of the data + media type + size
-        # rather than processing everything
+        data = self.data
+
+        # Mutable data could have changed since it was last seen, so only
+        # `bytes` can be looked up by identity
+        if type(data) is bytes:
+            with _SECRET_ID_LOCK:
+                known_asset = _ASSETS_BY_DATA_ID.get(id(data))
+
+            if known_asset is not None and known_asset.data is data:
+                return known_asset.secret_id
+
+        if len(data) <= FULL_HASH_THRESHOLD:
+            secret_id = self._get_full_hash_secret_id()
+        else:
+            secret_id = self._get_fingerprint_secret_id()
+
+        if type(data) is bytes:
+            with _SECRET_ID_LOCK:
+                _ASSETS_BY_DATA_ID[id(data)] = self
+
+        return secret_id
+
+    def _get_full_hash_secret_id(self) -> str:
         return "b-" + _securely_hash_bytes_changes_between_runs(self.data).hex()
 
+    def _get_fingerprint_secret_id(self) -> str:
+        fingerprint = _fingerprint_bytes(self.data)
+
+        with _SECRET_ID_LOCK:
+            owner = _FINGERPRINT_OWNERS.get(fingerprint)
+
+            if owner is None:
+                # Nobody is using this fingerprint right now. Claim it.
+                claim = next(_FINGERPRINT_CLAIM_COUNTER)
+                self._secret_id = f"s-{fingerprint.hex()}-{claim}"
+                _FINGERPRINT_OWNERS[fingerprint] = self
+                return self._secret_id
+
+        # The fingerprint is taken. It can only be shared if the data is
+        # actually identical. Comparing is still much cheaper than hashing.
+        if owner is self or owner.data is self.data or owner.data == self.data:
+            return owner.secret_id
+
+        return self._get_full_hash_secret_id()
+
 
 class PathAsset(HostedAsset):
     def __init__(
@@ -5,61 +5,329 @@ Based on a comment here:
 https://github.com/tiangolo/fastapi/issues/1240#issuecomment-1055396884
 """
 
+import email.utils
 import mimetypes
+import os
+import secrets
 import typing as t
 import warnings
 from pathlib import Path
 
+import anyio
 import fastapi
 from fastapi import HTTPException
 
 __all__ = [
     "range_requests_response",
+    "is_not_modified",
 ]
 
 
-def send_bytes_range_requests(
-    file_obj: t.BinaryIO,
-    start: int,
-    end: int,
-    chunk_size: int = 16 * 1024 * 1024,
-) -> t.Iterator[bytes]:
+# How many bytes are read from the disk at a time when streaming files. This is
+# also the maximum amount of memory held by each in-flight response.
+CHUNK_SIZE = 256 * 1024
+
+# Clients can request multiple ranges at once. Limit how many, to prevent abuse
+# like requesting every byte of a file as a separate range.
+MAX_RANGES_PER_REQUEST = 32
+
+
+# Precompressed variants of files which are served instead of the file itself,
+# if the client accepts them. In order of preference.
+PRECOMPRESSED_VARIANTS: tuple[tuple[str, str], ...] = (
+    ("br", ".br"),
+    ("gzip", ".gz"),
+)
+
+
+def get_etag(stat: os.stat_result, encoding: str | None = None) -> str:
     """
-    Send a file in chunks using Range Requests specification RFC7233. `start`
-    and `end` are inclusive as per the spec.
+    Returns a weak ETag for the file with the given stats. Different encodings
+    of the same file must have different ETags, so the encoding is included.
     """
-    with file_obj as f:
-        f.seek(start)
+    etag = f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    if encoding is not None:
+        etag += f"-{encoding}"
+
+    return f'W/"{etag}"'
 
-        remaining = end - start + 1
 
-        while remaining > 0:
-            read_size = min(chunk_size, remaining)
-            chunk = f.read(read_size)
+def _strip_weak_prefix(etag: str) -> str:
+    etag = etag.strip()
+
+    if etag.startswith("W/"):
+        return etag[2:]
+
+    return etag
+
+
+def is_not_modified(
+    request: fastapi.Request,
+    etag: str,
+    last_modified: float | None = None,
+) -> bool:
+    """
+    Returns whether the client's cached copy is still up to date, according to
+    the request's `If-None-Match` and `If-Modified-Since` headers. If so, the
+    client should receive a `304 Not Modified` response.
+    """
+    # If present, `If-None-Match` takes precedence. ETags are compared weakly,
+    # as required for `GET` requests.
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
 
-            yield chunk
+        etag = _strip_weak_prefix(etag)
+        return any(
+            _strip_weak_prefix(candidate) == etag
+            for candidate in if_none_match.split(",")
+        )
 
-            remaining -= len(chunk)
+    if_modified_since = request.headers.get("if-modified-since")
 
+    if if_modified_since is None or last_modified is None:
+        return False
 
-def parse_range_header(range_header: str, file_size: int) -> tuple[int, int]:
     try:
-        h = range_header.replace("bytes=", "").split("-")
-        start = int(h[0]) if h[0] != "" else 0
-        end = int(h[1]) if h[1] != "" else file_size - 1
-    except ValueError:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    # HTTP dates only have a resolution of one second
+    return int(last_modified) <= since.timestamp()
+
+
+def _get_accepted_encodings(request: fastapi.Request) -> set[str]:
+    result = set[str]()
+
+    for part in request.headers.get("accept-encoding", "").split(","):
+        encoding, _, params = part.partition(";")
+        encoding = encoding.strip().lower()
+
+        # Respect explicit rejections, like `gzip;q=0`
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+
+        if encoding:
+            result.add(encoding)
+
+    return result
+
+
+def _select_variant(
+    request: fastapi.Request,
+    file_path: Path,
+) -> tuple[Path, os.stat_result, str | None] | None:
+    """
+    Picks which file to serve: Either the file itself, or one of its
+    precompressed variants. Returns the path, its stats and its encoding, or
+    `None` if none of the files exist.
+    """
+    # Compressed variants can't be combined with range requests, since the
+    # ranges refer to the uncompressed content
+    accepted_encodings = (
+        set()
+        if "range" in request.headers
+        else _get_accepted_encodings(request)
+    )
+
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        if encoding not in accepted_encodings:
+            continue
+
+        variant_path = file_path.with_name(file_path.name + suffix)
+
+        try:
+            return variant_path, variant_path.stat(), encoding
+        except FileNotFoundError:
+            pass
+
+    try:
+        return file_path, file_path.stat(), None
+    except FileNotFoundError:
+        pass
+
+    # Some files (like the frontend's) only exist in compressed form. Serve
+    # those regardless of what the client claims to support.
+    for encoding, suffix in PRECOMPRESSED_VARIANTS:
+        variant_path = file_path.with_name(file_path.name + suffix)
+
+        try:
+            return variant_path, variant_path.stat(), encoding
+        except FileNotFoundError:
+            pass
+
+    return None
+
+
+async def send_bytes_range_requests(
+    file_path: Path,
+    ranges: t.Sequence[tuple[int, int]],
+    *,
+    part_headers: t.Sequence[bytes] = (),
+    trailer: bytes = b"",
+    chunk_size: int = CHUNK_SIZE,
+) -> t.AsyncIterator[bytes]:
+    """
+    Send the given ranges of a file in chunks using Range Requests
+    specification RFC7233. `start` and `end` of each range are inclusive as per
+    the spec.
+
+    For multipart responses, each range is preceded by the corresponding entry
+    in `part_headers`, and the `trailer` is sent last.
+
+    Reads run in worker threads, so waiting for the disk doesn't block the
+    event loop. At most `chunk_size` bytes are held in memory at a time.
+    """
+    async with await anyio.open_file(file_path, "rb") as f:
+        for index, (start, end) in enumerate(ranges):
+            if part_headers:
+                yield part_headers[index]
+
+            await f.seek(start)
+            remaining = end - start + 1
+
+            while remaining > 0:
+                chunk = await f.read(min(chunk_size, remaining))
+
+                # The file has been truncated in the meantime. There's nothing
+                # sensible left to send.
+                if not chunk:
+                    return
+
+                yield chunk
+                remaining -= len(chunk)
+
+        if trailer:
+            yield trailer
+
+
+def _range_not_satisfiable(range_header: str, file_size: int) -> HTTPException:
+    return HTTPException(
+        fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        detail=f"Requested range is not satisfiable: (Range: {range_header!r}) (File size: {file_size}B)",
+        headers={"content-range": f"bytes */{file_size}"},
+    )
+
+
+def parse_range_header(
+    range_header: str,
+    file_size: int,
+) -> list[tuple[int, int]]:
+    """
+    Parses a `Range` header into a list of inclusive `(start, end)` tuples.
+    Ranges extending beyond the end of the file are truncated, and suffix
+    ranges like `-500` (the last 500 bytes) are supported.
+
+    ## Raises
+
+    `HTTPException`: If the header is malformed or none of the ranges can be
+        satisfied.
+    """
+    unit, _, range_specs = range_header.partition("=")
+
+    if unit.strip() != "bytes":
         raise HTTPException(
             fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
             detail=f"Invalid request range header (Range: {range_header!r})",
         )
 
-    if start > end or start < 0 or end > file_size - 1:
-        raise HTTPException(
-            fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
-            detail=f"Requested range is out of bounds: (Range: [{start},{end}]) (File size: {file_size}B)",
+    result: list[tuple[int, int]] = []
+
+    for range_spec in range_specs.split(","):
+        try:
+            start_str, end_str = range_spec.strip().split("-")
+
+            # Suffix range, i.e. the last N bytes
+            if start_str == "":
+                start = max(file_size - int(end_str), 0)
+                end = file_size - 1
+            else:
+                start = int(start_str)
+                end = file_size - 1 if end_str == "" else int(end_str)
+        except ValueError:
+            raise HTTPException(
+                fastapi.status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail=f"Invalid request range header (Range: {range_header!r})",
+            )
+
+        if start < 0 or start > end:
+            raise _range_not_satisfiable(range_header, file_size)
+
+        # Ranges beginning beyond the end of the file are skipped, and those
+        # ending beyond it are truncated
+        if start >= file_size:
+            continue
+
+        result.append((start, min(end, file_size - 1)))
+
+    if not result or len(result) > MAX_RANGES_PER_REQUEST:
+        raise _range_not_satisfiable(range_header, file_size)
+
+    return result
+
+
+class _FileResponse(fastapi.responses.StreamingResponse):
+    """
+    Streams (parts of) a file. If the entire file is sent and the server
+    supports the ASGI `pathsend` extension, the server sends the file itself
+    instead, which allows it to use zero-copy mechanisms like `sendfile`.
+    """
+
+    def __init__(
+        self,
+        file_path: Path,
+        ranges: t.Sequence[tuple[int, int]],
+        *,
+        is_entire_file: bool,
+        part_headers: t.Sequence[bytes] = (),
+        trailer: bytes = b"",
+        headers: dict[str, str],
+        status_code: int,
+    ) -> None:
+        super().__init__(
+            send_bytes_range_requests(
+                file_path,
+                ranges,
+                part_headers=part_headers,
+                trailer=trailer,
+            ),
+            headers=headers,
+            status_code=status_code,
         )
 
-    return start, end
+        self._file_path = file_path
+        self._is_entire_file = is_entire_file
+
+    async def __call__(self, scope, receive, send) -> None:
+        if (
+            self._is_entire_file
+            and scope["type"] == "http"
+            and "http.response.pathsend" in scope.get("extensions", {})
+        ):
+            # The body won't be needed after all. Close the generator so the
+            # file is never opened.
+            await self.body_iterator.aclose()  # type: ignore
+
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": self.status_code,
+                    "headers": self.raw_headers,
+                }
+            )
+            await send(
+                {
+                    "type": "http.response.pathsend",
+                    "path": str(self._file_path),
+                }
+            )
+            return
+
+        await super().__call__(scope, receive, send)
 
 
 def range_requests_response(
@@ -72,24 +340,50 @@ def range_requests_response(
     Returns a fastapi response which serves the given file, supporting Range
     Requests as per RFC7233 ("HTTP byte serving").
 
+    If the client accepts it, a precompressed variant of the file (e.g.
+    `style.css.br` or `style.css.gz`) is served instead, if one exists.
+
+    The response includes `ETag` and `Last-Modified` headers. If the client
+    already has an up-to-date copy of the file, a `304 Not Modified` response
+    is returned instead.
+
     Returns a 404 if the file does not exist. In this case a warning is also
     shown in the console.
     """
 
-    # Get the file size. This also verifies the file exists.
-    try:
-        file_size_in_bytes = file_path.stat().st_size
-    except FileNotFoundError:
+    # Decide which file to serve. This also verifies the file exists.
+    variant = _select_variant(request, file_path)
+
+    if variant is None:
         warnings.warn(f"Cannot find file at {file_path.resolve()}")
         return fastapi.responses.Response(status_code=404)
 
+    served_path, stat, encoding = variant
+    file_size_in_bytes = stat.st_size
+
+    # Validators, allowing clients to cheaply check whether their cached copy
+    # is still up to date
+    etag = get_etag(stat, encoding)
+    validator_headers = {
+        "etag": etag,
+        "last-modified": email.utils.formatdate(stat.st_mtime, usegmt=True),
+        "vary": "accept-encoding",
+    }
+
+    if is_not_modified(request, etag, stat.st_mtime):
+        return fastapi.responses.Response(
+            status_code=fastapi.status.HTTP_304_NOT_MODIFIED,
+            headers=validator_headers,
+        )
+
     # Prepare response headers
     headers = {
+        **validator_headers,
         "accept-ranges": "bytes",
-        "content-encoding": "identity",
+        "content-encoding": "identity" if encoding is None else encoding,
         "content-length": str(file_size_in_bytes),
         "access-control-expose-headers": (
-            "content-type, accept-ranges, content-length, content-range, content-encoding"
+            "content-type, accept-ranges, content-length, content-range, content-encoding, etag, last-modified"
         ),
     }
 
@@ -110,22 +404,81 @@ def range_requests_response(
     if media_type is not None:
         headers["content-type"] = media_type
 
-    # Was a specific range requested?
+    # Was a specific range requested? If the client sent `If-Range` and its
+    # copy is outdated, it needs the whole file instead.
     range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+
+    if (
+        range_header is not None
+        and if_range is not None
+        and if_range.strip() != validator_headers["last-modified"]
+        and _strip_weak_prefix(if_range) != _strip_weak_prefix(etag)
+    ):
+        range_header = None
+
     if range_header is None:
-        start = 0
-        end = file_size_in_bytes - 1
-        status_code = fastapi.status.HTTP_200_OK
-    else:
-        start, end = parse_range_header(range_header, file_size_in_bytes)
-        size = end - start + 1
-        headers["content-length"] = str(size)
+        return _FileResponse(
+            served_path,
+            [(0, file_size_in_bytes - 1)],
+            is_entire_file=True,
+            headers=headers,
+            status_code=fastapi.status.HTTP_200_OK,
+        )
+
+    ranges = parse_range_header(range_header, file_size_in_bytes)
+
+    # Single range
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["content-length"] = str(end - start + 1)
         headers["content-range"] = f"bytes {start}-{end}/{file_size_in_bytes}"
-        status_code = fastapi.status.HTTP_206_PARTIAL_CONTENT
 
-    # Construct the response
-    return fastapi.responses.StreamingResponse(
-        send_bytes_range_requests(file_path.open("rb"), start, end),
+        return _FileResponse(
+            served_path,
+            ranges,
+            is_entire_file=False,
+            headers=headers,
+            status_code=fastapi.status.HTTP_206_PARTIAL_CONTENT,
+        )
+
+    # Multiple ranges. These are sent as `multipart/byteranges`, with each part
+    # having its own headers.
+    boundary = secrets.token_hex(16)
+    part_headers: list[bytes] = []
+
+    for index, (start, end) in enumerate(ranges):
+        part_header = f"--{boundary}\r\n"
+
+        if media_type is not None:
+            part_header += f"content-type: {media_type}\r\n"
+
+        part_header += (
+            f"content-range: bytes {start}-{end}/{file_size_in_bytes}\r\n\r\n"
+        )
+
+        # Each part except the first one is separated from the previous part's
+        # data by a line break
+        if index > 0:
+            part_header = "\r\n" + part_header
+
+        part_headers.append(part_header.encode("latin-1"))
+
+    trailer = f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+    headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+    headers["content-length"] = str(
+        sum(len(part_header) for part_header in part_headers)
+        + sum(end - start + 1 for start, end in ranges)
+        + len(trailer)
+    )
+
+    return _FileResponse(
+        served_path,
+        ranges,
+        is_entire_file=False,
+        part_headers=part_headers,
+        trailer=trailer,
         headers=headers,
-        status_code=status_code,
+        status_code=fastapi.status.HTTP_206_PARTIAL_CONTENT,
     )
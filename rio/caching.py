@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import collections
+import time
+import typing as t
+from datetime import timedelta
+
+__all__ = ["TtlLruCache"]
+
+
+K = t.TypeVar("K")
+V = t.TypeVar("V")
+
+
+class TtlLruCache(t.Generic[K, V]):
+    """
+    A size-limited cache. Once the cache is full, the least recently used
+    entries are evicted. Optionally, entries also expire after a fixed amount
+    of time.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        time_to_live: timedelta | None = None,
+    ) -> None:
+        assert max_size > 0, max_size
+
+        self.max_size = max_size
+        self.time_to_live = time_to_live
+
+        # Maps keys to their values and expiration timestamps. The least
+        # recently used entries come first.
+        self._entries: collections.OrderedDict[K, tuple[float, V]] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: K) -> V | None:
+        """
+        Returns the value for the given key, or `None` if there is no such
+        value or it has expired.
+        """
+        try:
+            expires_at, value = self._entries[key]
+        except KeyError:
+            return None
+
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        if self.time_to_live is None:
+            expires_at = float("inf")
+        else:
+            expires_at = time.monotonic() + self.time_to_live.total_seconds()
+
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        """
+        Removes the entry for the given key, if there is one.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None  # type: ignore
+
+    def __len__(self) -> int:
+        return len(self._entries)
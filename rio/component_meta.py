@@ -48,10 +48,21 @@ class ComponentMeta(RioDataclassMeta):
     # or from a library.
     _rio_builtin_: bool
 
+    # Whether instances of this class skip their build if none of their state
+    # has changed. Set by the `rio.memo` decorator, and inherited by subclasses.
+    _rio_memo_: bool
+
     def __init__(cls, *args, **kwargs):
         # Is this class built into Rio?
         cls._rio_builtin_ = cls.__module__.startswith("rio.")
 
+        # Inherit memoization from parents
+        cls._rio_memo_ = any(
+            base._rio_memo_
+            for base in cls.__bases__
+            if isinstance(base, ComponentMeta)
+        )
+
         # Run sanity checks
         if not cls._rio_builtin_:
             try:
@@ -60,6 +60,7 @@ from .text import *
 from .text_input import *
 from .theme_context_switcher import *
 from .tooltip import *
+from .virtual_list_view import *
 from .website import *
 from .webview import *
 
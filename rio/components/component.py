@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import abc
+import copy
 import io
 import typing as t
 from dataclasses import KW_ONLY
@@ -17,10 +18,11 @@ from ..data_models import BuildData
 from ..dataclass import internal_field
 from ..state_properties import AttributeBindingMaker
 
-__all__ = ["Component"]
+__all__ = ["Component", "memo"]
 
 
 T = t.TypeVar("T")
+C = t.TypeVar("C", bound="type[Component]")
 
 
 # Using `metaclass=ComponentMeta` makes this an abstract class, but since
@@ -255,6 +257,22 @@ class Component(abc.ABC, metaclass=ComponentMeta):
     # in its builder's COMPONENT DATA, the component is dead.
     _build_generation_: int = internal_field(default=-1, init=False)
 
+    # Whether this component is currently part of the session's component tree.
+    # Components inside of a `DialogContainer` are also considered mounted, as
+    # long as the dialog is open and its owning component is mounted.
+    #
+    # This is maintained incrementally by the session while refreshing, so that
+    # checking whether a component is alive doesn't require walking up the
+    # tree.
+    _is_mounted_: bool = internal_field(default=False, init=False)
+
+    # For components marked with `rio.memo`, the values of all state properties
+    # at the time of the most recent build. `None` if the component must be
+    # rebuilt regardless.
+    _memo_state_: dict[str, object] | None = internal_field(
+        default=None, init=False
+    )
+
     # Note: The BuildData used to be stored in a WeakKeyDictionary in the
     # Session, but because WeakKeyDictionaries hold *strong* references to their
     # values, this led to reference cycles that the garbage collector never
@@ -477,93 +495,86 @@ class Component(abc.ABC, metaclass=ComponentMeta):
         self, *, include_root: bool = True
     ) -> t.Iterable[Component]:
         """
-        Iterate over all components in the component tree, with this component as the root.
+        Iterate over all components in the component tree, with this component
+        as the root. Components are yielded in depth-first pre-order.
         """
         from . import fundamental_component  # Avoid circular import problem
 
-        if include_root:
-            yield self
+        def get_children(component: Component) -> list[Component]:
+            if isinstance(
+                component, fundamental_component.FundamentalComponent
+            ):
+                return list(component._iter_direct_children_())
+
+            return [component._build_data_.build_result]  # type: ignore
 
-        if isinstance(self, fundamental_component.FundamentalComponent):
-            for child in self._iter_direct_children_():
-                yield from child._iter_component_tree_()
+        # This is deliberately iterative. Recursive generators would have to
+        # pass each component through every level above it, which adds up
+        # quickly for deep trees. Children are pushed in reverse so they're
+        # popped in order.
+        if include_root:
+            to_do = [self]
         else:
-            build_result = self._build_data_.build_result  # type: ignore
-            yield from build_result._iter_component_tree_()
+            to_do = get_children(self)
+            to_do.reverse()
 
-    async def _on_message_(self, msg: Jsonable, /) -> None:
-        raise RuntimeError(
-            f"{type(self).__name__} received unexpected message `{msg}`"
-        )
+        while to_do:
+            component = to_do.pop()
+            yield component
 
-    def _is_in_component_tree_(
-        self,
-        cache: dict[rio.Component, bool],
-    ) -> bool:
+            children = get_children(component)
+            children.reverse()
+            to_do.extend(children)
+
+    def _get_memo_state_(self) -> dict[str, object]:
         """
-        Returns whether this component is directly or indirectly connected to
-        the component tree of a session. Components inside of a
-        `DialogContainer` are also considered to be part of the component tree,
-        even though they aren't technically child of any other in-tree
-        component.
-
-        This operation is fairly fast, but has to walk up the component tree to
-        make sure the component's parent is also connected. Thus, when checking
-        multiple components it can easily happen that the same components are
-        checked over and over, resulting on `O(n log n)` runtime. To avoid this,
-        pass a cache dictionary to this function, which will be used to memoize
-        the result.
-
-        Be careful not to reuse the cache if the component hierarchy might have
-        changed (for example after an async yield).
+        Returns the current values of all state properties, for use by
+        `rio.memo`. Lists, dicts and sets are copied, so that modifying them in
+        place counts as a change.
         """
+        result: dict[str, object] = {}
 
-        # Already cached?
-        try:
-            return cache[self]
-        except KeyError:
-            pass
+        for name in type(self)._state_properties_:
+            value = getattr(self, name)
 
-        # Root component?
-        if self is self.session._high_level_root_component:
-            result = True
+            if type(value) in (list, dict, set):
+                value = copy.copy(value)
 
-        # Has the builder been garbage collected?
-        else:
-            builder = self._weak_builder_()
-            if builder is None:
-                result = False
+            result[name] = value
 
-            # Has the builder since created new build output, and this component
-            # isn't part of it anymore?
-            else:
-                parent_data = builder._build_data_
-                assert parent_data is not None
-                result = (
-                    parent_data.build_generation == self._build_generation_
-                    and builder._is_in_component_tree_(cache)
-                )
+        return result
+
+    def _memo_state_is_unchanged_(self) -> bool:
+        """
+        Returns whether all state properties still have the same values as
+        during the component's most recent build. Values are compared by
+        identity first, then by equality.
+        """
+        old_state = self._memo_state_
+
+        if old_state is None:
+            return False
+
+        for name, old_value in old_state.items():
+            new_value = getattr(self, name)
+
+            if new_value is old_value:
+                continue
 
-        # Special case: `rio.DialogContainer`s are considered to be part of the
-        # component tree as long as their owning component is.
-        if not result and isinstance(
-            self, rio.components.dialog_container.DialogContainer
-        ):
             try:
-                owning_component = self.session._weak_components_by_id[
-                    self.owning_component_id
-                ]
-            except KeyError:
-                result = False
-            else:
-                result = (
-                    owning_component._is_in_component_tree_(cache)
-                    and self._id in owning_component._owned_dialogs_
-                )
+                if bool(old_value == new_value):
+                    continue
+            except Exception:
+                pass
 
-        # Cache the result and return
-        cache[self] = result
-        return result
+            return False
+
+        return True
+
+    async def _on_message_(self, msg: Jsonable, /) -> None:
+        raise RuntimeError(
+            f"{type(self).__name__} received unexpected message `{msg}`"
+        )
 
     @t.overload
     async def call_event_handler(
@@ -649,6 +660,9 @@ class Component(abc.ABC, metaclass=ComponentMeta):
         until the GUI is refreshed, and the public `force_refresh()` doesn't
         allow that.
         """
+        # Make sure the component is rebuilt even if it is memoized
+        self._memo_state_ = None
+
         self.session._register_dirty_component(
             self,
             include_children_recursively=False,
@@ -753,3 +767,47 @@ class Component(abc.ABC, metaclass=ComponentMeta):
             self.margin,
             0,
         )
+
+
+def memo(cls: C) -> C:
+    """
+    Skips rebuilding a component if its state hasn't changed.
+
+    Whenever a component is rebuilt, so is every component in its build
+    output which has received new values. Usually that's exactly what you want,
+    but for components with large build functions, such as long lists or
+    tables, it can be wasteful to rebuild everything just because a parent
+    reassigned an identical value.
+
+    Components decorated with `rio.memo` remember the values of all of their
+    properties when they're built. If the component is marked for rebuilding,
+    but none of its properties have changed (as determined by identity, or
+    failing that, `==`), `build` isn't called at all and the previous build
+    output is kept.
+
+    Only use this on components whose `build` function depends exclusively on
+    their own properties. Components which also read data from elsewhere, such
+    as session attachments or global variables, won't notice when that data
+    changes. If needed, you can still call `force_refresh` to rebuild such a
+    component.
+
+    The decorator is inherited by subclasses.
+
+
+    ## Example
+
+    ```python
+    @rio.memo
+    class ProductRow(rio.Component):
+        name: str
+        price: float
+
+        def build(self) -> rio.Component:
+            return rio.Row(
+                rio.Text(self.name, justify="left", grow_x=True),
+                rio.Text(f"${self.price:.2f}"),
+            )
+    ```
+    """
+    cls._rio_memo_ = True  # type: ignore
+    return cls
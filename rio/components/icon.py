@@ -101,7 +101,8 @@ class Icon(FundamentalComponent):
         one directory, which must be named identically to the icon set. Files
         located in the root of that directory can be accessed as
         `"icon_set/icon_name"`. Files located in a subdirectory can be accessed
-        as `"icon_set/icon_name:variant"`.
+        as `"icon_set/icon_name:variant"`. The archive is read into memory when
+        the set is first used, so nothing is extracted to disk.
 
         For SVG files to work as icons...
 
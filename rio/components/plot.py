@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import concurrent.futures
 import io
 import typing as t
 
 from uniserde import JsonDoc
 
-from .. import fills, maybes
+import rio
+
+from .. import assets, fills, maybes
+from ..dataclass import internal_field
 from .fundamental_component import FundamentalComponent
 
 if t.TYPE_CHECKING:
@@ -17,6 +22,71 @@ if t.TYPE_CHECKING:
 __all__ = ["Plot"]
 
 
+# Rendering a plot can easily take hundreds of milliseconds, so it's done in a
+# separate thread to keep the event loop responsive. Matplotlib isn't
+# thread-safe, hence only a single thread.
+_RENDER_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=1,
+    thread_name_prefix="rio-plot-renderer",
+)
+
+
+_RASTER_MEDIA_TYPES = {
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+def _render_figure(
+    figure: object,
+    raster_format: t.Literal["png", "webp"] | None,
+) -> str | assets.BytesAsset:
+    """
+    Renders the given figure. Plotly figures are returned as JSON, matplotlib
+    figures as SVG, or as image asset if a raster format is given.
+
+    This can be slow and is thread-safe as long as the figure isn't modified
+    concurrently.
+    """
+    # Plotly
+    if isinstance(figure, maybes.PLOTLY_GRAPH_TYPES):
+        figure = t.cast("plotly.graph_objects.Figure", figure)
+        return figure.to_json()
+
+    # Matplotlib (+ Seaborn)
+    if isinstance(figure, maybes.MATPLOTLIB_GRAPH_TYPES):
+        # Seaborn "figures" are actually matplotlib `Axes` objects
+        if isinstance(figure, maybes.MATPLOTLIB_AXES_TYPES):
+            figure = figure.figure
+
+        figure = t.cast("matplotlib.figure.Figure", figure)
+
+        file = io.BytesIO()
+        figure.savefig(
+            file,
+            format="svg" if raster_format is None else raster_format,
+            transparent=True,
+            bbox_inches="tight",
+        )
+
+        if raster_format is None:
+            return bytes(file.getbuffer()).decode("utf-8")
+
+        asset = assets.Asset.new(
+            bytes(file.getbuffer()),
+            _RASTER_MEDIA_TYPES[raster_format],
+        )
+
+        # Hashing large images isn't free either. Get it done while we're
+        # still in the worker thread. The result is cached by the asset.
+        _ = asset.secret_id
+
+        return asset
+
+    # Unsupported
+    raise TypeError(f"Unsupported plot type: {type(figure)}")
+
+
 @t.final
 class Plot(FundamentalComponent):
     """
@@ -34,6 +104,11 @@ class Plot(FundamentalComponent):
     Plots created with `plotly` will be interactive when displayed in Rio. We
     recommend using it over the other options.
 
+    Rendering a plot can be slow, so Rio renders each figure only once, in a
+    background thread, and displays it as soon as it's ready. If you modify a
+    figure in place, assign it to the plot again or call `force_refresh` to
+    have it rendered anew.
+
     ## Attributes
 
     `figure`: The plot figure to display.
@@ -43,6 +118,13 @@ class Plot(FundamentalComponent):
 
     `corner_radius`: The corner radius of the plot
 
+    `raster_format`: By default `matplotlib` and `seaborn` plots are sent to
+        the client as SVG. Complex plots, such as scatter plots with many
+        thousands of points, can result in huge SVGs though. If set to `"png"`
+        or `"webp"`, the plot is rendered to an image of that format instead.
+        Has no effect on `plotly` plots, since those are rendered by the
+        browser.
+
 
     ## Examples
 
@@ -147,6 +229,20 @@ class Plot(FundamentalComponent):
     )
     background: fills._FillLike | None
     corner_radius: float | tuple[float, float, float, float] | None
+    raster_format: t.Literal["png", "webp"] | None
+
+    # The figure and raster format the plot was last rendered with, along with
+    # the result. Keeping a reference to the figure makes sure its identity
+    # can't be reused by a different one.
+    _cached_render: (
+        tuple[object, str | None, str | assets.BytesAsset] | None
+    ) = internal_field(default=None, init=False)
+
+    # The figure and raster format currently being rendered in the background,
+    # along with the task doing so
+    _pending_render: tuple[object, str | None, asyncio.Task[None]] | None = (
+        internal_field(default=None, init=False)
+    )
 
     def __init__(
         self,
@@ -158,6 +254,7 @@ class Plot(FundamentalComponent):
         *,
         background: fills._FillLike | None = None,
         corner_radius: float | tuple[float, float, float, float] | None = None,
+        raster_format: t.Literal["png", "webp"] | None = None,
         key: str | int | None = None,
         margin: float | None = None,
         margin_x: float | None = None,
@@ -200,51 +297,126 @@ class Plot(FundamentalComponent):
 
         self.figure = figure
         self.background = background
+        self.raster_format = raster_format
 
         if corner_radius is None:
             self.corner_radius = self.session.theme.corner_radius_small
         else:
             self.corner_radius = corner_radius
 
-    def _custom_serialize_(self) -> JsonDoc:
-        # Figure
-        figure = self.figure
-        plot: JsonDoc
+    def __setattr__(self, name: str, value: object) -> None:
+        # The figure may have been modified in place. Any assignment, even of
+        # the same figure, has it rendered again.
+        if name == "figure":
+            self._invalidate_render()
+
+        super().__setattr__(name, value)
+
+    def force_refresh(self) -> None:
+        # Figures are usually modified in place, which is exactly what
+        # `force_refresh` is meant for
+        self._invalidate_render()
+        return super().force_refresh()
+
+    def _invalidate_render(self) -> None:
+        """
+        Discards the cached render, as well as the result of any render which
+        is still running.
+        """
+        self._cached_render = None
+        self._pending_render = None
+
+    def _get_cached_render(self) -> str | assets.BytesAsset | None:
+        """
+        Returns the rendered figure, if it has already been rendered with the
+        current settings. Returns `None` otherwise.
+        """
+        if self._cached_render is None:
+            return None
+
+        figure, raster_format, rendered = self._cached_render
+
+        if figure is not self.figure or raster_format != self.raster_format:
+            return None
+
+        return rendered
+
+    def _start_rendering(self) -> None:
+        """
+        Starts rendering the figure in the background, unless that is already
+        happening. Once done, the plot is refreshed to send the result to the
+        client.
+        """
+        if self._pending_render is not None:
+            figure, raster_format, _ = self._pending_render
+
+            if figure is self.figure and raster_format == self.raster_format:
+                return
+
+        task = self.session.create_task(
+            self._render_in_background(self.figure, self.raster_format),
+            name=f"Render plot {self._id}",
+        )
+        self._pending_render = (self.figure, self.raster_format, task)
 
-        # Plotly
-        if isinstance(figure, maybes.PLOTLY_GRAPH_TYPES):
-            # Make the plot transparent, so `self.background` shines through.
-            figure = t.cast("plotly.graph_objects.Figure", figure)
+    async def _render_in_background(
+        self,
+        figure: object,
+        raster_format: t.Literal["png", "webp"] | None,
+    ) -> None:
+        try:
+            rendered = await asyncio.get_running_loop().run_in_executor(
+                _RENDER_EXECUTOR,
+                _render_figure,
+                figure,
+                raster_format,
+            )
+        except Exception:
+            rio._logger.exception("Couldn't render the figure of a `rio.Plot`")
+            return
+
+        # Discard the result if the plot has changed in the meantime
+        if (
+            self._pending_render is None
+            or self._pending_render[2] is not asyncio.current_task()
+        ):
+            return
+
+        self._pending_render = None
+        self._cached_render = (figure, raster_format, rendered)
+
+        # Send the finished plot to the client. Refreshes are atomic, so this
+        # can't happen as part of the refresh which has requested the render.
+        self.session._register_dirty_component(
+            self,
+            include_children_recursively=False,
+        )
+        await self.session._refresh()
 
+    def _custom_serialize_(self) -> JsonDoc:
+        # Figure. Rendering it can take a while, so it's done in the
+        # background. Until it's ready, the client displays an empty plot.
+        rendered = self._get_cached_render()
+        plot: JsonDoc | None
+
+        if rendered is None:
+            self._start_rendering()
+            plot = None
+        elif isinstance(self.figure, maybes.PLOTLY_GRAPH_TYPES):
             plot = {
                 "type": "plotly",
-                "json": figure.to_json(),
+                "json": rendered,
             }
-
-        # Matplotlib (+ Seaborn)
-        elif isinstance(figure, maybes.MATPLOTLIB_GRAPH_TYPES):
-            # Seaborn "figures" are actually matplotlib `Axes` objects
-            if isinstance(figure, maybes.MATPLOTLIB_AXES_TYPES):
-                figure = figure.figure
-
-            figure = t.cast("matplotlib.figure.Figure", figure)
-
-            file = io.BytesIO()
-            figure.savefig(
-                file,
-                format="svg",
-                transparent=True,
-                bbox_inches="tight",
-            )
-
+        elif isinstance(rendered, assets.Asset):
             plot = {
                 "type": "matplotlib",
-                "svg": bytes(file.getbuffer()).decode("utf-8"),
+                "imageUrl": rendered._serialize(self.session),
             }
-
-        # Unsupported
         else:
-            raise TypeError(f"Unsupported plot type: {type(figure)}")
+            plot = {
+                "type": "matplotlib",
+                "svg": rendered,
+            }
 
         # Corner radius
         if isinstance(self.corner_radius, (int, float)):
@@ -3,6 +3,7 @@ from __future__ import annotations
 import typing as t
 
 from .. import utils
+from ..dataclass import internal_field
 from .component import Component
 from .fundamental_component import FundamentalComponent
 
@@ -26,6 +27,10 @@ class HighLevelRootComponent(Component):
     build_function: t.Callable[[], Component]
     build_connection_lost_message_function: t.Callable[[], Component]
 
+    # If set, the next fundamental root component takes over this id. See
+    # `Session._hibernate`.
+    _fundamental_root_id_: int | None = internal_field(default=None, init=False)
+
     def build(self) -> Component:
         # Spawn the dev tools if running in debug mode.
         if self.session._app_server.debug_mode:
@@ -39,12 +44,25 @@ class HighLevelRootComponent(Component):
         # Build the user's root component
         user_root = utils.safe_build(self.build_function)
 
-        return FundamentalRootComponent(
+        root = FundamentalRootComponent(
             user_root,
             utils.safe_build(self.build_connection_lost_message_function),
             dev_tools=dev_tools,
         )
 
+        # A hibernated session is built anew once its client reconnects, but
+        # the client still displays the previous root. Reusing its id makes the
+        # client update that root in place, rather than adding a second one to
+        # the page.
+        if self._fundamental_root_id_ is not None:
+            weak_components_by_id = self.session._weak_components_by_id
+            del weak_components_by_id[root._id]
+            root._id = self._fundamental_root_id_
+            weak_components_by_id[root._id] = root
+            self._fundamental_root_id_ = None
+
+        return root
+
 
 class FundamentalRootComponent(FundamentalComponent):
     """
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import functools
+import operator
 import typing as t
 from dataclasses import KW_ONLY, dataclass, field
 
@@ -10,6 +12,7 @@ from uniserde import JsonDoc
 import rio
 
 from .. import maybes
+from ..dataclass import internal_field
 from .fundamental_component import FundamentalComponent
 
 if t.TYPE_CHECKING:
@@ -24,6 +27,10 @@ __all__ = ["Table"]
 TableValue = int | float | str
 
 
+# How many rows a lazy table sends to the client at once
+LAZY_CHUNK_SIZE = 200
+
+
 @t.final
 @dataclass
 class TableSelection:
@@ -303,6 +310,41 @@ def _data_to_columnar(
     return headers, columns
 
 
+def _sort_and_filter_frame(
+    frame: nw.DataFrame,
+    *,
+    sort_column: str | None,
+    sort_descending: bool,
+    filter_text: str,
+) -> nw.DataFrame:
+    """
+    Returns a copy of the frame which only contains rows with at least one
+    value containing `filter_text` (case-insensitive), sorted by the given
+    column. This is the data displayed by lazy tables.
+    """
+    if filter_text:
+        needle = filter_text.lower()
+        conditions = [
+            nw.col(column_name)
+            .cast(nw.String)
+            .str.to_lowercase()
+            .str.contains(needle, literal=True)
+            for column_name in frame.columns
+        ]
+
+        if conditions:
+            frame = frame.filter(functools.reduce(operator.or_, conditions))
+
+    if sort_column is not None:
+        frame = frame.sort(
+            sort_column,
+            descending=sort_descending,
+            nulls_last=True,
+        )
+
+    return frame
+
+
 @t.final
 class Table(FundamentalComponent):  # TODO: add more content to docstring
     """
@@ -326,6 +368,12 @@ class Table(FundamentalComponent):  # TODO: add more content to docstring
 
     `show_row_numbers`: Whether to show row numbers on the left side of the table.
 
+    `lazy`: If `True`, the data is kept on the server and rows are only sent to
+        the client as the user scrolls down to them. Sorting and filtering are
+        also performed on the server. This allows displaying DataFrames with
+        millions of rows, which would otherwise overwhelm the browser. Only
+        `pandas` and `polars` DataFrames are supported in this mode.
+
 
     ## Examples
 
@@ -381,6 +429,7 @@ class Table(FundamentalComponent):  # TODO: add more content to docstring
     _: KW_ONLY
 
     show_row_numbers: bool = True
+    lazy: bool = False
 
     # All headers, if present
     _headers: list[str] | None = field(default=None, init=False)
@@ -401,9 +450,38 @@ class Table(FundamentalComponent):  # TODO: add more content to docstring
         default_factory=list, init=False
     )
 
+    # Lazy tables only: How the user has chosen to view the data, and which
+    # rows the client has most recently requested. These are controlled by
+    # the client.
+    _sort_column: str | None = field(default=None, init=False)
+    _sort_descending: bool = field(default=False, init=False)
+    _filter_text: str = field(default="", init=False)
+    _chunk_start: int = field(default=0, init=False)
+
+    # Lazy tables only: The sorted and filtered data, along with the inputs it
+    # was computed from. Sorting a large frame is expensive, so this is only
+    # recomputed when one of the inputs changes.
+    _lazy_view: tuple[tuple[object, ...], nw.DataFrame] | None = internal_field(
+        default=None, init=False
+    )
+
+    # Lazy tables only: Incremented each time the view is recomputed. This
+    # tells the client to discard any rows it has received previously.
+    _lazy_view_version: int = internal_field(default=0, init=False)
+
     def __post_init__(self) -> None:
-        # Bring the data into a standardized format
-        self._headers, self._columns = _data_to_columnar(self.data)
+        # Bring the data into a standardized format. Lazy tables keep the data
+        # as is and only convert the rows that are actually displayed.
+        if self.lazy:
+            if not isinstance(self.data, maybes.DATAFRAME_TYPES):
+                raise ValueError(
+                    "Lazy tables require a pandas or polars DataFrame as data"
+                )
+
+            self._headers = nw.from_native(self.data, eager_only=True).columns
+            self._columns = []
+        else:
+            self._headers, self._columns = _data_to_columnar(self.data)
 
         # Help out the reconciler. This is needed to make sure new values aren't
         # silently dropped
@@ -418,14 +496,113 @@ class Table(FundamentalComponent):  # TODO: add more content to docstring
         )
 
     def _custom_serialize_(self) -> JsonDoc:
-        return {
+        result: JsonDoc = {
             "headers": self._headers,
             "columns": self._columns,
             "styling": [style._as_json() for style in self._styling],
             "children": [child._id for child in self._children],
             "childPositions": self._child_positions,
+            "lazy": self.lazy,
         }  # type: ignore
 
+        # Lazy tables only send the most recently requested chunk of rows
+        if self.lazy:
+            view = self._get_lazy_view()
+            chunk = view[
+                self._chunk_start : self._chunk_start + LAZY_CHUNK_SIZE
+            ]
+
+            result["columns"] = [
+                chunk[column_name].to_list() for column_name in chunk.columns
+            ]
+            result["rowCount"] = len(view)
+            result["chunkStart"] = self._chunk_start
+            result["viewVersion"] = self._lazy_view_version
+            result["sortColumn"] = self._sort_column
+            result["sortDescending"] = self._sort_descending
+            result["filterText"] = self._filter_text
+
+        return result
+
+    def _get_lazy_view(self) -> nw.DataFrame:
+        """
+        Returns the table's data, sorted and filtered as requested by the
+        client. The result is cached.
+        """
+        inputs = (
+            self.data,
+            self._sort_column,
+            self._sort_descending,
+            self._filter_text,
+        )
+
+        # Cached? The data is compared by identity, since comparing
+        # DataFrames is expensive and doesn't return a `bool`.
+        if self._lazy_view is not None:
+            cached_inputs, cached_view = self._lazy_view
+
+            if (
+                cached_inputs[0] is inputs[0]
+                and cached_inputs[1:] == inputs[1:]
+            ):
+                return cached_view
+
+        # Nope, compute it
+        view = _sort_and_filter_frame(
+            nw.from_native(self.data, eager_only=True),  # type: ignore
+            sort_column=self._sort_column,
+            sort_descending=self._sort_descending,
+            filter_text=self._filter_text,
+        )
+
+        self._lazy_view = (inputs, view)
+        self._lazy_view_version += 1
+
+        return view
+
+    async def _on_message_(self, msg: t.Any) -> None:
+        # Only lazy tables talk to the server
+        assert self.lazy, msg
+        assert isinstance(msg, dict), msg
+
+        try:
+            msg_type = msg["type"]
+
+            # The client has scrolled to rows it doesn't have yet
+            if msg_type == "requestRows":
+                self._chunk_start = max(int(msg["start"]), 0)
+
+            # The user has clicked a header
+            elif msg_type == "sort":
+                sort_column = msg["column"]
+
+                if sort_column is not None and (
+                    self._headers is None or sort_column not in self._headers
+                ):
+                    raise AssertionError(
+                        f"Frontend has requested sorting by an unknown column: {msg}"
+                    )
+
+                self._sort_column = sort_column
+                self._sort_descending = bool(msg["descending"])
+                self._chunk_start = 0
+
+            # The user has typed into the filter field
+            elif msg_type == "filter":
+                self._filter_text = str(msg["text"])
+                self._chunk_start = 0
+
+            else:
+                raise AssertionError(
+                    f"Frontend has sent an unknown message type: {msg}"
+                )
+
+        except (KeyError, TypeError, ValueError):
+            raise AssertionError(f"Frontend has sent an invalid message: {msg}")
+
+        # Refresh the session
+        await self.session._refresh()
+
     def add(
         self,
         child: rio.Component,
@@ -487,6 +664,9 @@ class Table(FundamentalComponent):  # TODO: add more content to docstring
         headers! This is like numpy's shape but takes into account the many
         different types of data that can be passed to the data attribute.
         """
+        if self.lazy:
+            return nw.from_native(self.data, eager_only=True).shape  # type: ignore
+
         try:
             return (len(self._columns[0]), len(self._columns))
         except IndexError:
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import typing as t
+from dataclasses import KW_ONLY, field
+
+import imy.docstrings
+
+import rio
+
+from .component import Component
+from .fundamental_component import FundamentalComponent
+
+__all__ = [
+    "VirtualListView",
+]
+
+
+# How many items are built before the client has reported how many actually fit
+# on the screen
+INITIAL_VISIBLE_ITEM_COUNT = 30
+
+
+@t.final
+class VirtualListView(Component):
+    """
+    A scrollable list which only builds the items that are currently visible.
+
+    `ListView` needs all of its children up front. That's fine for a few dozen,
+    or even a few hundred items, but becomes slow once lists grow into the
+    thousands: every single item has to be built, sent to the client and
+    rendered, even though only a handful of them fit on the screen at a time.
+
+    `VirtualListView` instead takes the number of items and a function which
+    builds the item at a given index. Only the items which are currently
+    visible on the screen (plus a few more above and below, so scrolling stays
+    smooth) are built. As the user scrolls, the client reports which items
+    have become visible and the list builds those on demand.
+
+    All items must have the same height, given by `item_height`. This allows
+    the list to know how large it is without having to build all of its items.
+
+    The list scrolls by itself, so make sure to give it a height, for example
+    by setting `grow_y=True` or `min_height`.
+
+
+    ## Attributes
+
+    `item_count`: The total number of items in the list.
+
+    `build_item`: A function which receives the index of an item, and returns
+        the component to display for it. It is called during the list's build,
+        so the same rules as for `build` apply: It may create components, but
+        mustn't modify any state.
+
+    `item_height`: The height of each item.
+
+    `overscan`: How many items above and below the visible area are built in
+        addition to the visible ones. Higher values avoid empty space when
+        scrolling quickly, at the cost of building more components.
+
+
+    ## Examples
+
+    This example displays a list of 50,000 items, only a few dozen of which
+    are ever built at the same time:
+
+    ```python
+    class MyComponent(rio.Component):
+        products: list[str] = [f"Product {i}" for i in range(50_000)]
+
+        def build_product(self, index: int) -> rio.Component:
+            return rio.SimpleListItem(self.products[index])
+
+        def build(self) -> rio.Component:
+            return rio.VirtualListView(
+                item_count=len(self.products),
+                build_item=self.build_product,
+                grow_y=True,
+            )
+    ```
+    """
+
+    item_count: int
+    build_item: t.Callable[[int], rio.Component]
+
+    _: KW_ONLY
+
+    item_height: float = 3.0
+    overscan: int = 10
+
+    # The range of items currently visible on the client. The end is exclusive.
+    _visible_start: int = field(init=False, default=0)
+    _visible_end: int = field(init=False, default=INITIAL_VISIBLE_ITEM_COUNT)
+
+    def _on_visible_range_change(self, start: int, end: int) -> None:
+        # Only assign if something has changed, to avoid pointless rebuilds
+        if start != self._visible_start:
+            self._visible_start = start
+
+        if end != self._visible_end:
+            self._visible_end = end
+
+    def build(self) -> rio.Component:
+        first_index = max(
+            min(self._visible_start, self.item_count) - self.overscan, 0
+        )
+        end_index = min(self._visible_end + self.overscan, self.item_count)
+
+        # Each item is wrapped in a container with a key derived from its
+        # index. This way items are reconciled with their previous selves
+        # while scrolling, and only newly visible ones are sent to the client.
+        children: list[rio.Component] = [
+            rio.Container(
+                self.build_item(index),
+                key=f"rio-virtual-list-item-{index}",
+            )
+            for index in range(first_index, end_index)
+        ]
+
+        return _VirtualListViewport(
+            children=children,
+            first_index=first_index,
+            item_count=self.item_count,
+            item_height=self.item_height,
+            overscan=self.overscan,
+            on_visible_range_change=self._on_visible_range_change,
+        )
+
+
+@t.final
+@imy.docstrings.mark_as_private
+class _VirtualListViewport(FundamentalComponent):
+    children: list[rio.Component]
+    first_index: int
+    item_count: int
+    item_height: float
+    overscan: int
+    on_visible_range_change: t.Callable[[int, int], None]
+
+    async def _on_message_(self, msg: t.Any) -> None:
+        # Parse the message
+        assert isinstance(msg, dict), msg
+
+        try:
+            start = int(msg["start"])
+            end = int(msg["end"])
+        except (KeyError, TypeError, ValueError):
+            raise AssertionError(
+                f"Frontend has sent an invalid visible range: {msg}"
+            )
+
+        # Don't trust the client to stay within bounds
+        start = min(max(start, 0), self.item_count)
+        end = min(max(end, start), self.item_count)
+
+        self.on_visible_range_change(start, end)
+
+        # Refresh the session
+        await self.session._refresh()
+
+
+_VirtualListViewport._unique_id_ = "VirtualListViewport-builtin"
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import typing as t
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 # Never import * from typing_extensions! It breaks `Any` on 3.10, preventing
 # users from connecting. Ask me how I know.
@@ -90,6 +90,11 @@ class InitialClientMessage(uniserde.Serde):
 
     primary_pointer_type: t.Literal["mouse", "touch"]
 
+    # All wire protocols the client is able to decode. The server picks one of
+    # these for the messages it sends. See `Session._wire_protocol`. Clients
+    # which don't send this field only understand plain JSON.
+    wire_protocols: list[str] = field(default_factory=lambda: ["json"])
+
     @classmethod
     def from_defaults(
         cls,
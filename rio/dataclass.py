@@ -162,6 +162,7 @@ class RioDataclassMeta(abc.ABCMeta):
         # We also need to create a RioField for each field.
 
         cls_vars = vars(cls)
+        raw_annotations: dict = cls_vars.get("__annotations__", {})
         annotations = inspection.get_local_annotations(cls)
 
         local_fields: dict[str, RioField] = {}
@@ -169,13 +170,22 @@ class RioDataclassMeta(abc.ABCMeta):
 
         rio_field: RioField
 
-        for attr_name, annotation in annotations.items():
-            if attr_name == "_" and annotation is dataclasses.KW_ONLY:
-                continue
-
-            # Skip `ClassVar` annotations
-            if t.get_origin(annotation) is t.ClassVar:
-                continue
+        for attr_name, raw_annotation in raw_annotations.items():
+            # Resolving annotations can be expensive, since it imports any
+            # modules they refer to (e.g. `matplotlib` for `rio.Plot`). Only
+            # resolve those which could be `KW_ONLY` or a `ClassVar`.
+            if attr_name == "_" or (
+                not isinstance(raw_annotation, str)
+                or "ClassVar" in raw_annotation
+            ):
+                annotation = annotations[attr_name]
+
+                if attr_name == "_" and annotation is dataclasses.KW_ONLY:
+                    continue
+
+                # Skip `ClassVar` annotations
+                if t.get_origin(annotation) is t.ClassVar:
+                    continue
 
             try:
                 field_or_default = cls_vars[attr_name]
@@ -9,6 +9,7 @@ from . import (
     deploy_page,
     docs_page,
     icons_page,
+    profiler_page,
     project_page,
     rio_developer_page,
     theme_picker_page,
@@ -25,6 +26,7 @@ class DevToolsSidebar(rio.Component):
             "tree",
             "docs",
             "deploy",
+            "profiler",
             "rio-developer",
         ]
         | None
@@ -94,6 +96,12 @@ class DevToolsSidebar(rio.Component):
                 min_width=REGULAR_PAGE_WIDTH,
             )
 
+        # Profiler
+        if self.selected_page == "profiler":
+            return profiler_page.ProfilerPage(
+                min_width=WIDE_PAGE_WIDTH,
+            )
+
         # Rio Developer
         if self.selected_page == "rio-developer":
             return rio_developer_page.RioDeveloperPage(
@@ -115,6 +123,7 @@ class DevToolsSidebar(rio.Component):
             "Icons",
             "Theme",
             # "Docs",
+            "Profiler",
             "Deploy",
         ]
 
@@ -124,6 +133,7 @@ class DevToolsSidebar(rio.Component):
             "material/emoji_people",
             "material/palette",
             # "material/library_books",
+            "material/speed",
             "material/rocket_launch",
         ]
 
@@ -133,6 +143,7 @@ class DevToolsSidebar(rio.Component):
             "icons",
             "theme",
             # "docs",
+            "profiler",
             "deploy",
         ]
 
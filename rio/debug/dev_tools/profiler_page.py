@@ -0,0 +1,192 @@
+import json
+
+import rio
+import rio.profiler
+
+# How many component classes to list
+MAX_DISPLAYED_CLASSES = 30
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+
+    return f"{seconds * 1000:.1f} ms"
+
+
+def _format_size(n_bytes: int) -> str:
+    if n_bytes >= 1024 * 1024:
+        return f"{n_bytes / (1024 * 1024):.1f} MiB"
+
+    if n_bytes >= 1024:
+        return f"{n_bytes / 1024:.1f} KiB"
+
+    return f"{n_bytes} B"
+
+
+class ProfilerPage(rio.Component):
+    @property
+    def _profiler(self) -> rio.profiler.Profiler:
+        return self.session._app_server.profiler
+
+    @rio.event.periodic(1)
+    def _on_tick(self) -> None:
+        # Keep the numbers up to date while recording
+        if self._profiler.enabled:
+            self.force_refresh()
+
+    def _on_start_profiling(self) -> None:
+        self._profiler.enabled = True
+        self.force_refresh()
+
+    def _on_stop_profiling(self) -> None:
+        self._profiler.enabled = False
+        self.force_refresh()
+
+    def _on_reset(self) -> None:
+        self._profiler.reset()
+        self.force_refresh()
+
+    async def _on_save_trace(self) -> None:
+        await self.session.save_file(
+            file_contents=json.dumps(self._profiler.to_chrome_trace()),
+            file_name="rio-trace.json",
+        )
+
+    def _build_controls(self) -> rio.Component:
+        result = rio.Row(spacing=0.5)
+
+        # Start / Stop profiling
+        if self._profiler.enabled:
+            result.add(
+                rio.Button(
+                    "Pause",
+                    icon="material/pause",
+                    color="danger",
+                    on_press=self._on_stop_profiling,
+                    grow_x=True,
+                )
+            )
+        else:
+            result.add(
+                rio.Button(
+                    "Record",
+                    icon="material/play_arrow",
+                    on_press=self._on_start_profiling,
+                    grow_x=True,
+                )
+            )
+
+        result.add(
+            rio.IconButton(
+                "material/delete",
+                style="minor",
+                min_size=2.2,
+                on_press=self._on_reset,
+            )
+        )
+
+        result.add(
+            rio.IconButton(
+                "material/save",
+                style="minor",
+                min_size=2.2,
+                on_press=self._on_save_trace,
+            )
+        )
+
+        return result
+
+    def _build_summary(self) -> rio.Component:
+        refreshes = self._profiler.refreshes()
+
+        if not refreshes:
+            return rio.Text(
+                "Nothing recorded yet",
+                style="dim",
+                justify="left",
+            )
+
+        total_duration = sum(refresh.duration for refresh in refreshes)
+        slowest = max(refreshes, key=lambda refresh: refresh.duration)
+        average_visited = sum(
+            refresh.visited_components for refresh in refreshes
+        ) / len(refreshes)
+
+        return rio.Text(
+            f"{len(refreshes)} refreshes,"
+            f" {_format_duration(total_duration / len(refreshes))} on average,"
+            f" slowest {_format_duration(slowest.duration)}."
+            f" {average_visited:.0f} components visited per refresh.",
+            overflow="wrap",
+            justify="left",
+        )
+
+    def _build_component_table(self) -> rio.Component:
+        grid = rio.Grid(row_spacing=0.3, column_spacing=0.8)
+
+        headings = ("Component", "Builds", "Build", "Reconcile", "Serialized")
+        for column, heading in enumerate(headings):
+            grid.add(
+                rio.Text(
+                    heading,
+                    style="dim",
+                    justify="left" if column == 0 else "right",
+                ),
+                0,
+                column,
+            )
+
+        all_stats = self._profiler.component_stats().items()
+        for row, (component_class, stats) in enumerate(all_stats, start=1):
+            if row > MAX_DISPLAYED_CLASSES:
+                break
+
+            cells = (
+                component_class.__name__,
+                str(stats.build_count),
+                _format_duration(stats.build_time),
+                _format_duration(stats.reconcile_time),
+                _format_size(stats.serialized_bytes),
+            )
+
+            for column, cell in enumerate(cells):
+                grid.add(
+                    rio.Text(
+                        cell,
+                        overflow="ellipsize",
+                        justify="left" if column == 0 else "right",
+                        grow_x=column == 0,
+                    ),
+                    row,
+                    column,
+                )
+
+        return grid
+
+    def build(self) -> rio.Component:
+        return rio.Column(
+            rio.Text(
+                "Profiler",
+                style="heading2",
+                justify="left",
+            ),
+            rio.Markdown(
+                """
+Measures how long each kind of component takes to build, to reconcile with its
+previous build and to serialize. The dev tools' own components are included.
+
+Saved traces can be opened in [speedscope](https://www.speedscope.app) or
+Perfetto.
+"""
+            ),
+            self._build_controls(),
+            self._build_summary(),
+            rio.ScrollContainer(
+                self._build_component_table(),
+                scroll_x="never",
+                grow_y=True,
+            ),
+            spacing=1,
+            margin=1,
+        )
@@ -127,6 +127,7 @@ async def update_and_apply_theme(
     # read theme values and used them to set e.g. their corner radii. Dirty
     # every component to force a full rebuild.
     for component in session._weak_components_by_id.values():
+        component._memo_state_ = None
         session._register_dirty_component(
             component,
             include_children_recursively=False,
@@ -98,6 +98,11 @@ class Dialog(t.Generic[T]):
         # since the code above guards against closing the dialog multiple times.
         del self._owning_component._owned_dialogs_[self._root_component._id]
 
+        # The dialog's components are no longer part of the component tree
+        self._root_component.session._set_subtree_mounted(
+            self._root_component, False
+        )
+
         # Done!
         return True
 
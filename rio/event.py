@@ -11,6 +11,7 @@ __all__ = [
     "on_unmount",
     "on_window_size_change",
     "periodic",
+    "run_in_thread",
 ]
 
 
@@ -383,3 +384,49 @@ def periodic(
         return handler
 
     return decorator
+
+
+def run_in_thread(handler: Func) -> Func:
+    """
+    Runs the decorated synchronous event handler in a worker thread.
+
+    Event handlers are normally executed on the same thread as the rest of the
+    app. If a handler blocks, for example because it's waiting for a slow
+    database query, all sessions freeze until it's done. Handlers decorated
+    with this function are executed in a thread pool instead, so other sessions
+    remain responsive. The session is refreshed once the handler has finished.
+
+    The handler may assign to attributes of components, but shouldn't call any
+    other Rio functions. The size of the thread pool can be configured via
+    `rio.App`'s `event_handler_thread_count` parameter.
+
+    Asynchronous handlers are unaffected by this decorator, since they run on
+    the event loop anyway.
+
+
+    ## Example
+
+    ```python
+    class UserList(rio.Component):
+        users: list[str] = []
+
+        @rio.event.run_in_thread
+        def on_load_users(self):
+            # This blocks, but only this thread
+            self.users = my_database.fetch_all_users()
+
+        def build(self):
+            return rio.Column(
+                rio.Button("Load users", on_press=self.on_load_users),
+                *[rio.Text(user) for user in self.users],
+            )
+    ```
+
+
+    ## Metadata
+
+    `decorator`: True
+    `experimental`: True
+    """
+    vars(handler)["_rio_run_in_thread_"] = True
+    return handler
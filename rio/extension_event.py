@@ -4,11 +4,13 @@ import enum
 import typing as t
 from dataclasses import dataclass
 
-import fastapi
 import imy.docstrings
 
 import rio
 
+if t.TYPE_CHECKING:
+    import fastapi
+
 __all__ = [
     "ExtensionAppStartEvent",
     "ExtensionAppCloseEvent",
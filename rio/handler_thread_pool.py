@@ -0,0 +1,168 @@
+"""
+Runs synchronous event handlers in worker threads.
+
+Event handlers are normally called on the event loop's thread. That's fast, but
+if a handler blocks (e.g. waiting for a database), every session in the process
+freezes until it's done. Handlers which opt in via `rio.event.run_in_thread` are
+instead executed by a `HandlerThreadPool`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import dataclasses
+import threading
+import time
+import typing as t
+from datetime import timedelta
+
+__all__ = ["HandlerThreadPool", "HandlerThreadPoolStats"]
+
+
+T = t.TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class HandlerThreadPoolStats:
+    """
+    A snapshot of a `HandlerThreadPool`'s state.
+
+    `max_workers`: How many handlers can run at the same time.
+
+    `running`: How many handlers are currently running.
+
+    `queued`: How many handlers are waiting for a free thread.
+
+    `completed`: How many handlers have finished running, successfully or not.
+
+    `total_wait_time`: How long all handlers which have been started so far
+        spent waiting for a free thread, combined.
+    """
+
+    max_workers: int
+    running: int
+    queued: int
+    completed: int
+    total_wait_time: timedelta
+
+    @property
+    def saturated(self) -> bool:
+        """
+        Whether all threads are busy, meaning new handlers have to wait.
+        """
+        return self.running >= self.max_workers
+
+
+class HandlerThreadPool:
+    """
+    A bounded pool of threads for running event handlers, which keeps track of
+    how busy it is.
+
+    Threads are only started once they're needed.
+    """
+
+    def __init__(self, *, max_workers: int) -> None:
+        assert max_workers > 0, max_workers
+
+        self.max_workers = max_workers
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+
+        # The counters are modified by the worker threads
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queued = 0
+        self._completed = 0
+        self._total_wait_time = 0.0
+
+    def stats(self) -> HandlerThreadPoolStats:
+        with self._lock:
+            return HandlerThreadPoolStats(
+                max_workers=self.max_workers,
+                running=self._running,
+                queued=self._queued,
+                completed=self._completed,
+                total_wait_time=timedelta(seconds=self._total_wait_time),
+            )
+
+    async def run(self, func: t.Callable[..., T], *args: object) -> T:
+        """
+        Runs `func(*args)` in a worker thread and returns its result.
+
+        Threads can't be interrupted. If this coroutine is cancelled while the
+        function is already running, it waits for the function to finish
+        before re-raising the cancellation. Thus the function is guaranteed to
+        no longer be running once this returns.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="rio-event-handler",
+            )
+
+        with self._lock:
+            self._queued += 1
+
+        # Like `asyncio.to_thread`, make context variables available to the
+        # function
+        context = contextvars.copy_context()
+
+        concurrent_future = self._executor.submit(
+            context.run,
+            self._run_job,
+            time.monotonic(),
+            func,
+            args,
+        )
+        concurrent_future.add_done_callback(self._on_job_done)
+
+        future = asyncio.wrap_future(concurrent_future)
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not concurrent_future.cancel():
+                await asyncio.wait([future])
+
+                # Don't let asyncio complain about unretrieved exceptions
+                if not future.cancelled():
+                    future.exception()
+
+            raise
+
+    def _run_job(
+        self,
+        submitted_at: float,
+        func: t.Callable[..., T],
+        args: tuple[object, ...],
+    ) -> T:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._total_wait_time += time.monotonic() - submitted_at
+
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _on_job_done(self, future: concurrent.futures.Future[t.Any]) -> None:
+        # Jobs which were cancelled before they started never got the chance
+        # to remove themselves from the queue
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+
+    def shutdown(self) -> None:
+        """
+        Stops all threads once they've finished their current job. Jobs which
+        haven't started yet are cancelled.
+        """
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
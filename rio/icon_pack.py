@@ -0,0 +1,244 @@
+"""
+Icon packs store an entire icon set in a single file, which can be read without
+unpacking it first.
+
+The file starts with a small header, followed by an index and the SVG data of
+all icons:
+
+- 8 bytes: The magic value `RIOICONS`
+- 2 bytes: The format version, currently 1
+- 2 bytes: Flags. If bit 0 is set, every icon is compressed with zlib.
+- 4 bytes: The length of the index, in bytes
+- The index, as UTF-8 encoded JSON. It maps the icon names (`icon` or
+  `icon:variant`) to the offset and length of the icon's data, relative to the
+  end of the index.
+- The icons' data
+
+All integers are little endian. Packs are memory-mapped when opened, so only the
+index is read up front and looking up an icon is a dictionary lookup and a
+slice.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import mmap
+import struct
+import tarfile
+import typing as t
+import zlib
+from pathlib import Path
+
+from .errors import AssetError
+
+__all__ = ["IconPack", "write_icon_pack"]
+
+
+MAGIC = b"RIOICONS"
+FORMAT_VERSION = 1
+
+FLAG_ZLIB_COMPRESSED = 1
+
+# Magic, version, flags, index length
+_HEADER = struct.Struct("<8sHHI")
+
+
+def _make_key(icon_name: str, variant: str | None) -> str:
+    if variant is None:
+        return icon_name
+
+    return f"{icon_name}:{variant}"
+
+
+def write_icon_pack(
+    file: t.BinaryIO,
+    icons: t.Iterable[tuple[str, str | None, str]],
+    *,
+    compress: bool = True,
+) -> None:
+    """
+    Writes an icon pack containing the given `(icon_name, variant, svg)`
+    tuples to the file. Icons are stored in the given order.
+
+    If `compress` is `True`, each icon is compressed on its own. This makes the
+    pack considerably smaller, at the cost of having to decompress icons when
+    they're first used.
+    """
+    index: dict[str, tuple[int, int]] = {}
+    data = io.BytesIO()
+
+    for icon_name, variant, svg in icons:
+        key = _make_key(icon_name, variant)
+
+        if key in index:
+            raise ValueError(f"The icon `{key}` was passed more than once")
+
+        icon_data = svg.encode("utf-8")
+
+        if compress:
+            icon_data = zlib.compress(icon_data, 9)
+
+        index[key] = (data.tell(), len(icon_data))
+        data.write(icon_data)
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode("utf-8")
+    flags = FLAG_ZLIB_COMPRESSED if compress else 0
+
+    file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(index_bytes)))
+    file.write(index_bytes)
+    file.write(data.getbuffer())
+
+
+class IconPack:
+    """
+    An icon set, read from an icon pack.
+    """
+
+    def __init__(self, buffer: bytes | mmap.mmap, *, name: str) -> None:
+        """
+        Parses the header and index of the icon pack contained in `buffer`. The
+        buffer must stay valid for as long as the pack is used.
+
+        ## Raises
+
+        `AssetError`: If the buffer doesn't contain a valid icon pack.
+        """
+        self.name = name
+        self._buffer = buffer
+
+        try:
+            magic, version, flags, index_length = _HEADER.unpack_from(buffer)
+        except struct.error:
+            magic = version = flags = index_length = None
+
+        if magic != MAGIC:
+            raise AssetError(f"`{name}` is not an icon pack")
+
+        if version != FORMAT_VERSION:
+            raise AssetError(
+                f"The icon pack `{name}` uses format version {version}, but"
+                f" only version {FORMAT_VERSION} is supported"
+            )
+
+        assert index_length is not None
+        index_start = _HEADER.size
+        self._data_start = index_start + index_length
+        self._is_compressed = bool(flags & FLAG_ZLIB_COMPRESSED)
+
+        # Maps icon keys (`icon` or `icon:variant`) to the offset and length of
+        # their data
+        self._index: dict[str, list[int]] = json.loads(
+            buffer[index_start : self._data_start]
+        )
+
+        self._variants = tuple(
+            dict.fromkeys(variant for _, variant in self.icons())
+        )
+
+    @classmethod
+    def open(cls, path: Path) -> IconPack:
+        """
+        Memory-maps the icon pack at the given path.
+
+        ## Raises
+
+        `AssetError`: If the file doesn't contain a valid icon pack.
+        """
+        with path.open("rb") as file:
+            try:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            # Empty files can't be mapped
+            except ValueError:
+                raise AssetError(f"`{path}` is not an icon pack") from None
+
+        return cls(buffer, name=str(path))
+
+    @classmethod
+    def from_tar_archive(cls, path: Path, icon_set: str) -> IconPack:
+        """
+        Reads an icon set from a `.tar.xz` archive, the format icon sets used
+        before icon packs existed. The archive must contain a single directory
+        named after the icon set. SVG files located directly in that directory
+        are part of the default variant, while ones in subdirectories belong
+        to the variant of the same name.
+
+        The pack is kept in memory, so nothing is written to disk.
+
+        ## Raises
+
+        `AssetError`: If the archive doesn't contain any icons for the set.
+        """
+        icons: list[tuple[str, str | None, str]] = []
+
+        with tarfile.open(path, "r:xz") as tar_file:
+            for member in tar_file:
+                if not member.isfile():
+                    continue
+
+                parts = member.name.split("/")
+
+                if parts[0] != icon_set or not parts[-1].endswith(".svg"):
+                    continue
+
+                if len(parts) == 2:
+                    variant = None
+                elif len(parts) == 3:
+                    variant = parts[1]
+                else:
+                    continue
+
+                svg_file = tar_file.extractfile(member)
+                assert svg_file is not None
+
+                icons.append(
+                    (
+                        parts[-1].removesuffix(".svg"),
+                        variant,
+                        svg_file.read().decode("utf-8"),
+                    )
+                )
+
+        if not icons:
+            raise AssetError(
+                f"The archive `{path}` doesn't contain any icons. Is the"
+                f" directory in the archive named `{icon_set}`?"
+            )
+
+        buffer = io.BytesIO()
+        write_icon_pack(buffer, icons, compress=False)
+        return cls(buffer.getvalue(), name=str(path))
+
+    def get_svg(self, icon_name: str, variant: str | None) -> str | None:
+        """
+        Returns the SVG source of the given icon, or `None` if the pack doesn't
+        contain it.
+        """
+        try:
+            offset, length = self._index[_make_key(icon_name, variant)]
+        except KeyError:
+            return None
+
+        start = self._data_start + offset
+        icon_data = self._buffer[start : start + length]
+
+        if self._is_compressed:
+            icon_data = zlib.decompress(icon_data)
+
+        return icon_data.decode("utf-8")
+
+    def variants(self) -> t.Iterable[str | None]:
+        """
+        Returns the names of all variants in the pack, without duplicates.
+        `None` stands for the default variant.
+        """
+        return self._variants
+
+    def icons(self) -> t.Iterable[tuple[str, str | None]]:
+        """
+        Yields the names and variants of all icons in the pack.
+        """
+        for key in self._index:
+            icon_name, _, variant = key.partition(":")
+            yield icon_name, variant or None
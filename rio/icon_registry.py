@@ -1,24 +1,28 @@
 from __future__ import annotations
 
 import logging
-import tarfile
 import typing as t
 from pathlib import Path
 
-from . import utils
+from . import icon_pack, utils
 from .errors import AssetError
 
 # Maps icon names (set/icon:variant) to the icon's SVG string. The icon
 # names are canonical form.
 cached_icons: dict[str, str] = {}
 
-# Maps icon set names to the path of the archive file containing the icons
+# Maps icon set names to the path of the file containing the icons. This is
+# either an icon pack, or a `.tar.xz` archive for sets which were created
+# before icon packs existed.
 icon_set_archives: dict[str, Path] = {
-    "material": utils.RIO_ASSETS_DIR / "icon_sets" / "material.tar.xz",
-    "rio": utils.RIO_ASSETS_DIR / "icon_sets" / "rio.tar.xz",
-    "styling": utils.RIO_ASSETS_DIR / "icon_sets" / "styling.tar.xz",
+    "material": utils.RIO_ASSETS_DIR / "icon_sets" / "material.rioicons",
+    "rio": utils.RIO_ASSETS_DIR / "icon_sets" / "rio.rioicons",
+    "styling": utils.RIO_ASSETS_DIR / "icon_sets" / "styling.rioicons",
 }
 
+# Icon sets which have already been opened, by name
+open_icon_sets: dict[str, icon_pack.IconPack] = {}
+
 
 def parse_icon_name(icon_name: str) -> tuple[str, str, str | None]:
     """
@@ -72,81 +76,36 @@ def normalize_icon_name(icon_name: str) -> str:
     return f"{set}/{name}:{section}"
 
 
-def _icon_set_extraction_dir(icon_set: str) -> Path:
-    """
-    Given the name of an icon set, return the directory where the icon set
-    will be extracted to. The directory will be created if necessary.
-    """
-    return utils.ASSET_MANAGER.get_cache_path(
-        Path("icon_sets") / icon_set,
-    )
-
-
-def _ensure_icon_set_is_extracted(icon_set: str) -> None:
+def _get_icon_set(icon_set: str) -> icon_pack.IconPack:
     """
-    Given the name of an icon set, extract the icon set's archive to the
-    cache directory. The target director must not exist yet. Raises a
-    `KeyError` if no icon set with the given name has been registered.
+    Given the name of an icon set, return the icon pack containing its icons,
+    opening it if necessary. Raises a `KeyError` if no icon set with the given
+    name has been registered.
     """
-    # If the target directory already exists there is nothing to do
-    icon_set_dir = _icon_set_extraction_dir(icon_set)
-
-    if icon_set_dir.exists():
-        return
-
-    # Get the path to the icon set's archive. If there is no icon set with
-    # the given name, this will raise a `KeyError`. That's fine.
-    archive_path = icon_set_archives[icon_set]
-
-    # Extract the set
-    logging.debug(
-        f"Extracting icon set `{icon_set}` from `{archive_path}` to `{icon_set_dir}`"
-    )
-
-    with tarfile.open(archive_path, "r:xz") as tar_file:
-        tar_file.extractall(icon_set_dir.parent)
+    try:
+        return open_icon_sets[icon_set]
+    except KeyError:
+        pass
 
-    # Sanity check: Make sure the target directory exists now
-    if not icon_set_dir.exists():
-        raise RuntimeError(
-            f"After extracting icon set `{icon_set}` from `{archive_path}` to `{icon_set_dir.parent}`, the target directory does not exist. Is the directory in the archive named correctly?"
-        )
+    # Get the path to the icon set's file. If there is no icon set with the
+    # given name, this will raise a `KeyError`. That's fine.
+    path = icon_set_archives[icon_set]
 
+    logging.debug(f"Opening icon set `{icon_set}` from `{path}`")
 
-def _get_icon_svg_path(icon_name: str) -> Path:
-    """
-    Given an icon name, return the path to the SVG file for that icon. This
-    will extract the icon if necessary.
-    """
-    # Prepare some paths
-    icon_set, icon_name, variant = parse_icon_name(icon_name)
-
-    icon_set_dir = _icon_set_extraction_dir(icon_set)
-
-    if variant is None:
-        svg_path = icon_set_dir / f"{icon_name}.svg"
+    if path.name.endswith(".tar.xz"):
+        pack = icon_pack.IconPack.from_tar_archive(path, icon_set)
     else:
-        svg_path = icon_set_dir / variant / f"{icon_name}.svg"
+        pack = icon_pack.IconPack.open(path)
 
-    # Extract the icon set if necessary
-    try:
-        _ensure_icon_set_is_extracted(icon_set)
-    except KeyError:
-        raise AssetError(
-            f"No icon set with the name {icon_set!r} is registered"
-        )
-
-    if not svg_path.exists():
-        raise AssetError(f"There is no icon named {icon_name!r}")
-
-    return svg_path
+    open_icon_sets[icon_set] = pack
+    return pack
 
 
 def get_icon_svg(icon_name: str) -> str:
     """
-    Given an icon name, return the SVG string for that icon. This will
-    extract the icon if necessary. If the icon name is invalid or there is
-    no matching icon, raise an `AssetError`.
+    Given an icon name, return the SVG string for that icon. If the icon name
+    is invalid or there is no matching icon, raise an `AssetError`.
     """
 
     # Normalize the icon name
@@ -158,27 +117,22 @@ def get_icon_svg(icon_name: str) -> str:
     except KeyError:
         pass
 
-    # Get the path to the icon's SVG file
-    svg_path = _get_icon_svg_path(icon_name)
+    # Look up the icon in its set
+    icon_set, name, variant = parse_icon_name(icon_name)
 
-    # Read the SVG file
     try:
-        svg_string = svg_path.read_text()
-    except FileNotFoundError:
-        # Figure out which part of the name is the problem to show a
-        # descriptive error message
-        icon_set, icon_name, variant = parse_icon_name(icon_name)
-
-        icon_set_dir = _icon_set_extraction_dir(icon_set)
+        pack = _get_icon_set(icon_set)
+    except KeyError:
+        raise AssetError(
+            f"Unknown icon set `{icon_set}`. Known icon sets are: `{'`, `'.join(icon_set_archives.keys())}`"
+        ) from None
 
-        if not icon_set_dir.exists():
-            raise AssetError(
-                f"Unknown icon set `{icon_set}`. Known icon sets are: `{'`, `'.join(icon_set_archives.keys())}`"
-            ) from None
+    svg_string = pack.get_svg(name, variant)
 
+    if svg_string is None:
         raise AssetError(
-            f"There is no icon named `{icon_name}` in the `{icon_set}` icon set"
-        ) from None
+            f"There is no icon named `{name}` in the `{icon_set}` icon set"
+        )
 
     # Cache the icon
     cached_icons[icon_name] = svg_string
@@ -187,33 +141,6 @@ def get_icon_svg(icon_name: str) -> str:
     return svg_string
 
 
-def _get_variant_directories(
-    icon_set: str,
-) -> t.Iterable[tuple[str | None, Path]]:
-    """
-    Given the name of an icon set, list the names of all variants in that
-    set along with the directory they are stored in.
-    """
-
-    # Make sure the icon set is extracted
-    _ensure_icon_set_is_extracted(icon_set)
-
-    # Iterate over all files in the icon set directory. Directories
-    # correspond to variants. If icons are found in the root directory, they
-    # are part of the default variant.
-    icon_set_dir = _icon_set_extraction_dir(icon_set)
-    has_default_variant = False
-
-    for path in icon_set_dir.iterdir():
-        if path.is_dir():
-            yield (path.name, path)
-        else:
-            has_default_variant = True
-
-    if has_default_variant:
-        yield (None, icon_set_dir)
-
-
 def all_icon_sets() -> t.Iterable[str]:
     """
     Return the names of all icon set names known to rio.
@@ -226,8 +153,7 @@ def all_variants_in_set(icon_set: str) -> t.Iterable[str | None]:
     Given the name of an icon set, list the names of all variants in that
     set.
     """
-    for name, _ in _get_variant_directories(icon_set):
-        yield name
+    return _get_icon_set(icon_set).variants()
 
 
 def all_icons_in_set(
@@ -244,24 +170,17 @@ def all_icons_in_set(
 
     `KeyError`: if there is not icon set or variant with the given name.
     """
-    # Find all available variants. This will also extract the icon set if
+    # Find all available variants. This will also open the icon set if
     # necessary.
-    variants = dict(_get_variant_directories(icon_set))
-
-    # Apply the variant filter. Any `KeyError` is propagated.
-    if variant is not None:
-        variants = {variant: variants[variant]}
-
-    # Iterate over all variants
-    for variant_name, path in variants.items():
-        for icon_path in path.iterdir():
-            # Only care for SVG files
-            if icon_path.is_dir() or icon_path.suffix != ".svg":
-                continue
-
-            # Yield
-            icon_name = icon_path.stem
-            yield icon_name, variant_name
+    pack = _get_icon_set(icon_set)
+
+    # Apply the variant filter
+    if variant is not None and variant not in pack.variants():
+        raise KeyError(variant)
+
+    for icon_name, icon_variant in pack.icons():
+        if variant is None or icon_variant == variant:
+            yield icon_name, icon_variant
 
 
 def register_icon_set(
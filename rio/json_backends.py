@@ -0,0 +1,208 @@
+"""
+Pluggable JSON encoders and decoders for the messages exchanged with the
+client.
+
+Every single message sent over the websocket is serialized as JSON, including
+potentially huge ones like the initial `updateComponentStates` or tables with
+thousands of cells. Python's builtin `json` module is comparatively slow, so
+faster third party libraries are used if they're installed.
+"""
+
+from __future__ import annotations
+
+import abc
+import json
+import typing as t
+
+from uniserde import Jsonable
+
+from . import maybes
+
+__all__ = [
+    "JsonBackend",
+    "StdlibJsonBackend",
+    "OrjsonBackend",
+    "MsgspecBackend",
+    "JsonBackendName",
+    "get_json_backend",
+]
+
+
+JsonBackendName = t.Literal["auto", "stdlib", "orjson", "msgspec"]
+
+
+def _serialize_special_types(obj: object) -> Jsonable:
+    try:
+        func = maybes.TYPE_NORMALIZERS[type(obj)]
+    except KeyError:
+        pass
+    else:
+        return func(obj)  # type: ignore
+
+    # Numpy arrays can't be normalized by type alone
+    if isinstance(obj, maybes.NUMPY_ARRAY_TYPES):
+        return obj.tolist()
+
+    raise TypeError(f"Can't serialize {obj!r} of type {type(obj)} as JSON")
+
+
+class JsonBackend(abc.ABC):
+    """
+    Converts messages to JSON and back.
+
+    Encoders must handle the "weird" types described in `maybes`, such as numpy
+    scalars, in addition to regular JSON values. Dictionaries may have `int`
+    keys, which must be converted to strings.
+    """
+
+    # Human readable name of the backend, for logging and debugging
+    name: t.ClassVar[str]
+
+    @abc.abstractmethod
+    def dumps(self, data: Jsonable) -> str:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, text: str | bytes) -> t.Any:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}>"
+
+
+class StdlibJsonBackend(JsonBackend):
+    """
+    Uses Python's builtin `json` module. Always available, but the slowest of
+    the bunch.
+    """
+
+    name = "stdlib"
+
+    def dumps(self, data: Jsonable) -> str:
+        try:
+            return json.dumps(data, default=_serialize_special_types)
+        except TypeError:
+            # Re-initialize the maybes, someone probably imported numpy/pandas
+            # after the app was started
+            maybes.initialize(force=True)
+            return json.dumps(data, default=_serialize_special_types)
+
+    def loads(self, text: str | bytes) -> t.Any:
+        return json.loads(text)
+
+
+class OrjsonBackend(JsonBackend):
+    """
+    Uses `orjson`, which also serializes numpy arrays and scalars natively.
+    """
+
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson  # type: ignore
+
+        self._orjson = orjson
+        self._options = (
+            orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY  # type: ignore
+        )
+
+    def dumps(self, data: Jsonable) -> str:
+        try:
+            result = self._orjson.dumps(
+                data,
+                default=_serialize_special_types,
+                option=self._options,
+            )
+        except TypeError:
+            maybes.initialize(force=True)
+
+            try:
+                result = self._orjson.dumps(
+                    data,
+                    default=_serialize_special_types,
+                    option=self._options,
+                )
+
+            # orjson rejects some values the standard library accepts, like
+            # integers above 64 bits and some kinds of non-string keys
+            except TypeError:
+                return json.dumps(data, default=_serialize_special_types)
+
+        return result.decode("utf-8")
+
+    def loads(self, text: str | bytes) -> t.Any:
+        return self._orjson.loads(text)
+
+
+class MsgspecBackend(JsonBackend):
+    """
+    Uses `msgspec`. Numpy values are supported, but converted to Python values
+    first.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec  # type: ignore
+
+        self._encoder = msgspec.json.Encoder(enc_hook=self._enc_hook)
+        self._decoder = msgspec.json.Decoder()
+
+    @staticmethod
+    def _enc_hook(obj: object) -> Jsonable:
+        try:
+            return _serialize_special_types(obj)
+        except TypeError:
+            maybes.initialize(force=True)
+            return _serialize_special_types(obj)
+
+    def dumps(self, data: Jsonable) -> str:
+        try:
+            return self._encoder.encode(data).decode("utf-8")
+
+        # msgspec rejects some values the standard library accepts, like
+        # integers above 64 bits and some kinds of non-string keys
+        except (TypeError, OverflowError):
+            return json.dumps(data, default=_serialize_special_types)
+
+    def loads(self, text: str | bytes) -> t.Any:
+        return self._decoder.decode(text)
+
+
+_BACKENDS_BY_NAME: dict[str, type[JsonBackend]] = {
+    "orjson": OrjsonBackend,
+    "msgspec": MsgspecBackend,
+    "stdlib": StdlibJsonBackend,
+}
+
+
+def get_json_backend(name: JsonBackendName = "auto") -> JsonBackend:
+    """
+    Instantiates the JSON backend with the given name. If the name is `"auto"`,
+    the fastest available backend is chosen.
+
+    ## Raises
+
+    `ValueError`: If there is no backend with the given name.
+
+    `ImportError`: If the required library isn't installed.
+    """
+    if name != "auto":
+        try:
+            backend_cls = _BACKENDS_BY_NAME[name]
+        except KeyError:
+            raise ValueError(
+                f"Unknown JSON backend `{name}`. Valid values are"
+                f" {', '.join(map(repr, t.get_args(JsonBackendName)))}"
+            ) from None
+
+        return backend_cls()
+
+    # Try the backends in order of preference
+    for backend_cls in _BACKENDS_BY_NAME.values():
+        try:
+            return backend_cls()
+        except ImportError:
+            pass
+
+    assert False, "The stdlib backend should always be available"
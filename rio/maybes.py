@@ -81,8 +81,16 @@ def initialize(force: bool = False) -> None:
 
         numpy_floats = tuple(introspection.iter_subclasses(numpy.floating))
         numpy_ints = tuple(introspection.iter_subclasses(numpy.integer))
-        numpy_bools = tuple(introspection.iter_subclasses(numpy.bool_))
-        numpy_strings = tuple(introspection.iter_subclasses(numpy.str_))
+        # `numpy.bool_` and `numpy.str_` are concrete classes without any
+        # subclasses, so make sure to include them as well
+        numpy_bools = (
+            numpy.bool_,
+            *introspection.iter_subclasses(numpy.bool_),
+        )
+        numpy_strings = (
+            numpy.str_,
+            *introspection.iter_subclasses(numpy.str_),
+        )
 
         FLOAT_TYPES = (*FLOAT_TYPES, *numpy_floats, *numpy_ints)
         INT_TYPES += numpy_ints
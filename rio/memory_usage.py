@@ -0,0 +1,86 @@
+"""
+Rough accounting of how much memory sessions occupy.
+
+Python has no way of telling how much memory an object graph really uses, and
+walking it in full would be slow. Instead, the estimate adds up the shallow
+sizes of all components, their attributes and the state last sent to the
+client. Objects shared between several components are counted once for each,
+and nested containers are only counted one level deep, so treat the result as
+an indication rather than an exact figure.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import sys
+import typing as t
+
+import rio
+
+__all__ = ["SessionMemoryUsage", "estimate_session_memory_usage"]
+
+
+@dataclasses.dataclass(frozen=True)
+class SessionMemoryUsage:
+    """
+    How much memory a single session occupies.
+
+    `component_count`: How many components exist in the session, including
+        ones which were removed from the tree but haven't been garbage
+        collected yet.
+
+    `estimated_bytes`: A rough estimate of the memory used by the session's
+        components.
+
+    `is_connected`: Whether a client is currently connected to the session.
+
+    `is_hibernating`: Whether the session's component tree has been released
+        while waiting for the client to reconnect.
+    """
+
+    component_count: int
+    estimated_bytes: int
+    is_connected: bool
+    is_hibernating: bool
+
+
+def _shallow_size_of_values(values: t.Iterable[object]) -> int:
+    # Components are counted on their own, so don't count them again when
+    # they're referenced by other components
+    return sum(
+        sys.getsizeof(value)
+        for value in values
+        if not isinstance(value, rio.Component)
+    )
+
+
+def estimate_session_memory_usage(session: rio.Session) -> SessionMemoryUsage:
+    """
+    Estimates how much memory the given session occupies. This walks all of
+    the session's components, so don't call it more often than necessary.
+    """
+    components = list(session._weak_components_by_id.values())
+    total_size = 0
+
+    for component in components:
+        attributes = vars(component)
+
+        total_size += sys.getsizeof(component)
+        total_size += sys.getsizeof(attributes)
+        total_size += _shallow_size_of_values(attributes.values())
+
+        build_data = component._build_data_
+        if build_data is not None:
+            total_size += sys.getsizeof(build_data)
+            total_size += _shallow_size_of_values(vars(build_data).values())
+
+    for state in session._last_sent_component_states.values():
+        total_size += sys.getsizeof(state)
+        total_size += _shallow_size_of_values(state.values())
+
+    return SessionMemoryUsage(
+        component_count=len(components),
+        estimated_bytes=total_size,
+        is_connected=session._transport is not None,
+        is_hibernating=session._is_hibernating,
+    )
@@ -0,0 +1,206 @@
+"""
+Lightweight metrics for monitoring apps in production.
+
+Sessions and the app server feed a handful of counters and histograms as they
+go about their business. Recording a value is a couple of additions, and
+rendering the metrics only formats numbers which are already known, so
+scraping them is cheap enough to do as often as monitoring systems like.
+
+The metrics can be served in Prometheus' text format via
+`rio.App(expose_metrics=True)`.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import typing as t
+
+__all__ = ["Counter", "Histogram", "Metrics"]
+
+
+# Upper bounds of the histogram buckets. Values are sorted into the first
+# bucket they fit into.
+REFRESH_DURATION_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+EVENT_HANDLER_DURATION_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+MESSAGE_SIZE_BUCKETS = (
+    256,
+    1024,
+    4 * 1024,
+    16 * 1024,
+    64 * 1024,
+    256 * 1024,
+    1024 * 1024,
+    4 * 1024 * 1024,
+)
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+
+    return repr(value)
+
+
+class Counter:
+    """
+    A value which only ever goes up, such as the number of sessions created.
+    """
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def increment(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def _render(self, lines: list[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.description}")
+        lines.append(f"# TYPE {self.name} counter")
+        lines.append(f"{self.name} {self.value}")
+
+
+class Histogram:
+    """
+    Counts how many observed values fall into each of a fixed set of buckets,
+    as well as their number and sum.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: t.Sequence[float],
+    ) -> None:
+        assert list(buckets) == sorted(buckets), buckets
+
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+
+        # One extra bucket for values larger than all bounds
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self._bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def _render(self, lines: list[str]) -> None:
+        lines.append(f"# HELP {self.name} {self.description}")
+        lines.append(f"# TYPE {self.name} histogram")
+
+        # Prometheus buckets are cumulative
+        cumulative_count = 0
+        for bound, count in zip(
+            self.buckets + (math.inf,), self._bucket_counts
+        ):
+            cumulative_count += count
+            lines.append(
+                f'{self.name}_bucket{{le="{_format_number(bound)}"}}'
+                f" {cumulative_count}"
+            )
+
+        lines.append(f"{self.name}_sum {_format_number(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+
+
+class Metrics:
+    """
+    All metrics collected by an app server.
+
+    Values are recorded from the event loop's thread only, so no locking is
+    needed.
+    """
+
+    def __init__(self) -> None:
+        self.refresh_duration = Histogram(
+            "rio_refresh_duration_seconds",
+            "Time taken to build and serialize the components of a session.",
+            REFRESH_DURATION_BUCKETS,
+        )
+
+        self.event_handler_duration = Histogram(
+            "rio_event_handler_duration_seconds",
+            "Time taken by event handlers, including waiting for a thread.",
+            EVENT_HANDLER_DURATION_BUCKETS,
+        )
+
+        self.message_size = Histogram(
+            "rio_sent_message_size_bytes",
+            "Size of the messages sent to clients.",
+            MESSAGE_SIZE_BUCKETS,
+        )
+
+        self.sessions_created = Counter(
+            "rio_sessions_created_total",
+            "Number of sessions created.",
+        )
+
+        self.sessions_expired = Counter(
+            "rio_sessions_expired_total",
+            "Number of sessions closed because their client didn't reconnect.",
+        )
+
+        self.sessions_hibernated = Counter(
+            "rio_sessions_hibernated_total",
+            "Number of disconnected sessions whose components were released.",
+        )
+
+    def render_prometheus_text(
+        self,
+        gauges: t.Iterable[tuple[str, str, float]],
+    ) -> str:
+        """
+        Returns all metrics in Prometheus' text exposition format.
+
+        Gauges describe the current state of the app rather than accumulating
+        over time, so they aren't stored here. Instead, pass them in as
+        `(name, description, value)` tuples.
+        """
+        lines: list[str] = []
+
+        for name, description, value in gauges:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {_format_number(value)}")
+
+        for metric in (
+            self.sessions_created,
+            self.sessions_expired,
+            self.sessions_hibernated,
+            self.refresh_duration,
+            self.event_handler_duration,
+            self.message_size,
+        ):
+            metric._render(lines)
+
+        lines.append("")
+        return "\n".join(lines)
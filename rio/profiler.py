@@ -0,0 +1,315 @@
+"""
+Opt-in timing of what sessions spend their time on while refreshing.
+
+When enabled, sessions report how long each component took to build, to
+reconcile with its previous build output and to serialize, as well as how many
+bytes of state were sent for it. The figures are aggregated per component
+class, and the individual timings are additionally kept as a trace which can be
+exported and inspected in tools like speedscope, Perfetto or Chrome's
+`about:tracing`.
+
+A disabled profiler costs next to nothing, since sessions only check whether
+it's enabled a couple of times per refresh.
+"""
+
+from __future__ import annotations
+
+import collections
+import dataclasses
+import json
+import os
+import time
+import typing as t
+from pathlib import Path
+
+import rio
+
+__all__ = ["ComponentClassStats", "Profiler", "RefreshStats"]
+
+
+@dataclasses.dataclass
+class ComponentClassStats:
+    """
+    Aggregated timings for all components of a single class. All times are in
+    seconds.
+
+    `build_count`: How often components of this class were built.
+
+    `build_time`: The time spent in the `build` methods of these components,
+        combined.
+
+    `reconcile_count`: How often the build output of these components was
+        reconciled with the previous one.
+
+    `reconcile_time`: The time spent reconciling, combined.
+
+    `serialize_count`: How often these components were serialized to be sent
+        to the client.
+
+    `serialize_time`: The time spent serializing, combined.
+
+    `serialized_bytes`: The size of the JSON sent to the client for these
+        components, combined.
+    """
+
+    build_count: int = 0
+    build_time: float = 0.0
+    reconcile_count: int = 0
+    reconcile_time: float = 0.0
+    serialize_count: int = 0
+    serialize_time: float = 0.0
+    serialized_bytes: int = 0
+
+    @property
+    def total_time(self) -> float:
+        """
+        The time spent building, reconciling and serializing, combined.
+        """
+        return self.build_time + self.reconcile_time + self.serialize_time
+
+
+@dataclasses.dataclass(frozen=True)
+class RefreshStats:
+    """
+    Timings of a single refresh of a single session.
+
+    `started_at`: When the refresh started, as returned by
+        `time.perf_counter()`.
+
+    `duration`: How long the refresh took, in seconds. This includes building
+        and serializing all components, but not sending them to the client.
+
+    `visited_components`: How many components were built or serialized during
+        the refresh.
+    """
+
+    started_at: float
+    duration: float
+    visited_components: int
+
+
+class Profiler:
+    """
+    Collects build, reconciliation and serialization timings from all sessions
+    of an app server.
+
+    The profiler only records anything while `enabled` is `True`. It can be
+    toggled at any time, e.g. to only profile a specific interaction.
+
+    All `record_*` methods must be called from the event loop's thread.
+    """
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = False,
+        max_trace_events: int = 100_000,
+        max_refreshes: int = 1_000,
+    ) -> None:
+        self.enabled = enabled
+
+        # Timestamps in the trace are relative to this
+        self._origin = time.perf_counter()
+
+        self._component_stats: dict[
+            type[rio.Component], ComponentClassStats
+        ] = {}
+
+        self._refreshes: collections.deque[RefreshStats] = collections.deque(
+            maxlen=max_refreshes
+        )
+
+        # (session id, name, category, start, end) for every recorded timing.
+        # Old events are discarded to keep memory usage in check.
+        self._trace_events: collections.deque[
+            tuple[int, str, str, float, float]
+        ] = collections.deque(maxlen=max_trace_events)
+
+    def reset(self) -> None:
+        """
+        Discards everything recorded so far.
+        """
+        self._origin = time.perf_counter()
+        self._component_stats.clear()
+        self._refreshes.clear()
+        self._trace_events.clear()
+
+    def _get_stats(
+        self, component_class: type[rio.Component]
+    ) -> ComponentClassStats:
+        try:
+            return self._component_stats[component_class]
+        except KeyError:
+            stats = ComponentClassStats()
+            self._component_stats[component_class] = stats
+            return stats
+
+    def record_build(
+        self,
+        session: rio.Session,
+        component_class: type[rio.Component],
+        started_at: float,
+        finished_at: float,
+    ) -> None:
+        stats = self._get_stats(component_class)
+        stats.build_count += 1
+        stats.build_time += finished_at - started_at
+
+        self._trace_events.append(
+            (
+                id(session),
+                component_class.__name__,
+                "build",
+                started_at,
+                finished_at,
+            )
+        )
+
+    def record_reconciliation(
+        self,
+        session: rio.Session,
+        component_class: type[rio.Component],
+        started_at: float,
+        finished_at: float,
+    ) -> None:
+        stats = self._get_stats(component_class)
+        stats.reconcile_count += 1
+        stats.reconcile_time += finished_at - started_at
+
+        self._trace_events.append(
+            (
+                id(session),
+                f"reconcile {component_class.__name__}",
+                "reconcile",
+                started_at,
+                finished_at,
+            )
+        )
+
+    def record_serialization(
+        self,
+        session: rio.Session,
+        component_class: type[rio.Component],
+        started_at: float,
+        finished_at: float,
+        serialized_bytes: int,
+    ) -> None:
+        stats = self._get_stats(component_class)
+        stats.serialize_count += 1
+        stats.serialize_time += finished_at - started_at
+        stats.serialized_bytes += serialized_bytes
+
+        self._trace_events.append(
+            (
+                id(session),
+                f"serialize {component_class.__name__}",
+                "serialize",
+                started_at,
+                finished_at,
+            )
+        )
+
+    def record_refresh(
+        self,
+        session: rio.Session,
+        started_at: float,
+        finished_at: float,
+        visited_components: int,
+    ) -> None:
+        self._refreshes.append(
+            RefreshStats(
+                started_at=started_at,
+                duration=finished_at - started_at,
+                visited_components=visited_components,
+            )
+        )
+
+        self._trace_events.append(
+            (id(session), "refresh", "refresh", started_at, finished_at)
+        )
+
+    def component_stats(
+        self,
+    ) -> dict[type[rio.Component], ComponentClassStats]:
+        """
+        Returns the aggregated timings of every component class which has been
+        recorded, with the most expensive classes first.
+        """
+        return {
+            component_class: dataclasses.replace(stats)
+            for component_class, stats in sorted(
+                self._component_stats.items(),
+                key=lambda item: item[1].total_time,
+                reverse=True,
+            )
+        }
+
+    def refreshes(self) -> list[RefreshStats]:
+        """
+        Returns the most recent refreshes, oldest first.
+        """
+        return list(self._refreshes)
+
+    def to_chrome_trace(self) -> dict[str, t.Any]:
+        """
+        Returns everything recorded so far in the Chrome trace event format.
+        This format is understood by speedscope, Perfetto and Chrome's
+        `about:tracing` page.
+        """
+        pid = os.getpid()
+        events: list[dict[str, t.Any]] = []
+
+        # Refreshes of different sessions can interleave, since sessions yield
+        # to the event loop while refreshing. To keep the events of each
+        # session properly nested, every session is shown as its own thread.
+        thread_ids: dict[int, int] = {}
+
+        for (
+            session_id,
+            name,
+            category,
+            started_at,
+            finished_at,
+        ) in self._trace_events:
+            try:
+                tid = thread_ids[session_id]
+            except KeyError:
+                tid = thread_ids[session_id] = len(thread_ids) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": tid,
+                        "args": {"name": f"Session {tid}"},
+                    }
+                )
+
+            events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": tid,
+                    # Microseconds
+                    "ts": (started_at - self._origin) * 1e6,
+                    "dur": (finished_at - started_at) * 1e6,
+                }
+            )
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+        }
+
+    def export_chrome_trace(self, path: Path | str) -> None:
+        """
+        Writes everything recorded so far to a file in the Chrome trace event
+        format. Open the file in https://www.speedscope.app, Perfetto or
+        Chrome's `about:tracing` page to explore it.
+        """
+        Path(path).write_text(
+            json.dumps(self.to_chrome_trace()),
+            encoding="utf-8",
+        )
@@ -14,7 +14,7 @@ from introspection import convert_case
 
 import rio.components.error_placeholder
 
-from . import deprecations, url_pattern, utils
+from . import caching, deprecations, url_pattern, utils
 from .errors import NavigationFailed
 
 __all__ = [
@@ -444,6 +444,90 @@ def _get_parser_for_annotation(
     ) from None
 
 
+class _PageIndex:
+    """
+    Finds the first page matching a URL among a sequence of sibling pages.
+
+    Trying each page's URL pattern one after another is slow for apps with
+    many pages. Instead, pages are grouped by the first segment of their URL
+    pattern, and only those pages which could possibly match are tried, in
+    their original order.
+    """
+
+    def __init__(self, pages: tuple[ComponentPage | Redirect, ...]) -> None:
+        self.pages = pages
+
+        # Group the pages by the first segment of their URL pattern. Pages
+        # starting with a path parameter could match any URL.
+        wildcard_pages: list[tuple[int, ComponentPage | Redirect]] = []
+        pages_by_first_segment: dict[
+            str, list[tuple[int, ComponentPage | Redirect]]
+        ] = {}
+
+        for position, page in enumerate(pages):
+            first_segment = page._url_pattern.first_literal_segment
+
+            if first_segment is None:
+                wildcard_pages.append((position, page))
+            else:
+                pages_by_first_segment.setdefault(first_segment, []).append(
+                    (position, page)
+                )
+
+        # Precompute the candidates for each first segment. These include the
+        # wildcard pages, and are in the same order as the pages passed in.
+        self._wildcard_pages = [page for _, page in wildcard_pages]
+
+        self._candidates_by_first_segment = {
+            first_segment: [
+                page for _, page in sorted(literal_pages + wildcard_pages)
+            ]
+            for first_segment, literal_pages in pages_by_first_segment.items()
+        }
+
+    def match(
+        self,
+        path: str,
+    ) -> tuple[ComponentPage | Redirect, dict[str, str], str] | None:
+        """
+        Returns the first page matching the path, along with its path arguments
+        and the remaining part of the path. Returns `None` if no page matches.
+        """
+        first_segment = path.partition("/")[0]
+        candidates = self._candidates_by_first_segment.get(
+            first_segment, self._wildcard_pages
+        )
+
+        for page in candidates:
+            did_match, raw_path_arguments, remaining_path = (
+                page._url_pattern.match(path)
+            )
+
+            if did_match:
+                return page, raw_path_arguments, remaining_path
+
+        return None
+
+
+# Indices for all sequences of sibling pages (`App.pages` and the `children` of
+# each page), by the `id` of the sequence. The pages can be changed at any time,
+# so each index is only used if it was built from the same pages.
+_PAGE_INDICES = caching.TtlLruCache[int, _PageIndex](max_size=1024)
+
+
+def _get_page_index(
+    pages: t.Iterable[ComponentPage | Redirect],
+) -> _PageIndex:
+    pages_tuple = tuple(pages)
+    index = _PAGE_INDICES.get(id(pages))
+
+    if index is None or index.pages != pages_tuple:
+        index = _PageIndex(pages_tuple)
+        _PAGE_INDICES.put(id(pages), index)
+
+    return index
+
+
 def _get_active_page_instances(
     *,
     available_pages: t.Iterable[rio.ComponentPage | rio.Redirect],
@@ -468,18 +552,14 @@ def _get_active_page_instances(
     assert not remaining_path.startswith("/"), remaining_path
 
     # Get the first matching page
-    for page in available_pages:
-        did_match, raw_path_arguments, remaining_path = page._url_pattern.match(
-            remaining_path
-        )
-
-        if did_match:
-            break
+    match = _get_page_index(available_pages).match(remaining_path)
 
     # No matching page found
-    else:
+    if match is None:
         return []
 
+    page, raw_path_arguments, remaining_path = match
+
     # Remember this page
     active_pages = [
         (page, raw_path_arguments),
@@ -4,7 +4,6 @@ import collections.abc
 import enum
 import functools
 import inspect
-import json
 import types
 import typing as t
 
@@ -14,7 +13,7 @@ from uniserde import Jsonable, JsonDoc
 
 import rio
 
-from . import color, fills, inspection, maybes, session
+from . import color, fills, inspection, json_backends, session
 from .components import fundamental_component
 from .dataclass import class_local_fields
 from .self_serializing import SelfSerializing
@@ -28,6 +27,8 @@ Serializer = t.Callable[["session.Session", T], Jsonable]
 
 FILL_LIKES = {*t.get_args(fills._FillLike), None, type(None)}
 
+_STDLIB_JSON_BACKEND = json_backends.StdlibJsonBackend()
+
 
 def _float_or_zero(obj: object) -> float:
     try:
@@ -43,17 +44,6 @@ def _float_if_not_none(obj: object) -> float | None:
     return float(obj)  # type: ignore
 
 
-def _serialize_special_types(obj: object) -> Jsonable:
-    try:
-        func = maybes.TYPE_NORMALIZERS[type(obj)]
-    except KeyError:
-        raise TypeError(
-            f"Can't serialize {obj!r} of type {type(obj)} as JSON"
-        ) from None
-
-    return func(obj)  # type: ignore
-
-
 def _get_margin(*margins: float | None) -> float:
     for margin in margins:
         if margin is not None:
@@ -62,17 +52,18 @@ def _get_margin(*margins: float | None) -> float:
     return 0
 
 
-def serialize_json(data: Jsonable) -> str:
+def serialize_json(
+    data: Jsonable,
+    backend: json_backends.JsonBackend | None = None,
+) -> str:
     """
-    Like `json.dumps`, but can also serialize numpy types.
+    Like `json.dumps`, but can also serialize numpy types. If no backend is
+    given, Python's builtin `json` module is used.
     """
-    try:
-        return json.dumps(data, default=_serialize_special_types)
-    except TypeError:
-        # Re-initialize the maybes, someone probably imported numpy/pandas after
-        # the app was started
-        maybes.initialize(force=True)
-        return json.dumps(data, default=_serialize_special_types)
+    if backend is None:
+        backend = _STDLIB_JSON_BACKEND
+
+    return backend.dumps(data)
 
 
 def serialize_and_host_component(component: rio.Component) -> JsonDoc:
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import collections
 import copy
+import functools
 import inspect
 import json
 import logging
@@ -10,10 +11,12 @@ import pathlib
 import random
 import shutil
 import string
+import threading
 import time
 import traceback
 import typing as t
 import weakref
+import zlib
 from datetime import tzinfo
 
 import ordered_set
@@ -32,7 +35,9 @@ from . import (
     errors,
     fills,
     global_state,
+    icon_registry,
     inspection,
+    memory_usage,
     routing,
     serialization,
     session_attachments,
@@ -52,10 +57,92 @@ __all__ = ["Session"]
 T = t.TypeVar("T")
 
 
+# Messages shorter than this (in characters) are never compressed
+MIN_COMPRESSED_MESSAGE_LENGTH = 1024
+
+# The zlib compression level used for the "json+deflate" wire protocol.
+# Compression happens on the event loop, so this trades bandwidth for latency.
+MESSAGE_COMPRESSION_LEVEL = 6
+
+# Messages are sent by a background task. If that task doesn't finish within
+# this many seconds, the client is considered congested and the session stops
+# waiting for it. Further messages are queued instead.
+CONGESTED_SEND_TIME = 0.05
+
+# When a session closes, queued messages get this many seconds to reach the
+# client before the connection is dropped
+CLOSING_SEND_TIMEOUT = 5
+
+# The names under which fonts are registered on the client. These are the same
+# for all sessions, so CSS referring to fonts can be shared between sessions.
+_FONT_NAMES: dict[text_style.Font, str] = {}
+
+
 class WontSerialize(Exception):
     pass
 
 
+def _copy_json(value: t.Any) -> t.Any:
+    """
+    Copies the containers in a serialized value, so that later in-place changes
+    to the original don't affect the copy. Everything else is immutable in
+    practice and shared.
+    """
+    if isinstance(value, dict):
+        return {key: _copy_json(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_copy_json(item) for item in value]
+
+    if isinstance(value, tuple):
+        return tuple(_copy_json(item) for item in value)
+
+    return value
+
+
+def _get_payload_size(payload: str | bytes) -> int:
+    """
+    Returns how many bytes the payload takes up when it's sent. Text is sent
+    as UTF-8, so its length in characters can be considerably smaller.
+    """
+    if isinstance(payload, bytes) or payload.isascii():
+        return len(payload)
+
+    return len(payload.encode("utf-8"))
+
+
+def _merge_component_state_updates(older: JsonDoc, newer: JsonDoc) -> JsonDoc:
+    """
+    Combines two `updateComponentStates` messages into a single one with the
+    same effect. Delta states only contain some properties, so the states of
+    components present in both messages are merged as well.
+    """
+    older_params: dict[str, t.Any] = older["params"]  # type: ignore
+    newer_params: dict[str, t.Any] = newer["params"]  # type: ignore
+
+    delta_states = dict(older_params["deltaStates"])
+
+    for component_id, delta_state in newer_params["deltaStates"].items():
+        try:
+            older_delta_state = delta_states[component_id]
+        except KeyError:
+            delta_states[component_id] = delta_state
+        else:
+            delta_states[component_id] = {**older_delta_state, **delta_state}
+
+    root_component_id = newer_params["rootComponentId"]
+    if root_component_id is None:
+        root_component_id = older_params["rootComponentId"]
+
+    return {
+        **newer,
+        "params": {
+            "deltaStates": delta_states,
+            "rootComponentId": root_component_id,
+        },
+    }
+
+
 class Session(unicall.Unicall):
     """
     Represents a single client connection to the app.
@@ -196,6 +283,7 @@ class Session(unicall.Unicall):
         base_url: rio.URL,
         active_page_url: rio.URL,
         theme_: theme.Theme,
+        wire_protocol: t.Literal["json", "json+deflate"] = "json",
     ) -> None:
         super().__init__(
             send_message=self.__send_message,  # type: ignore
@@ -311,6 +399,15 @@ class Session(unicall.Unicall):
         # The currently connected transport, if any
         self.__transport = transport
 
+        # How outgoing messages are encoded. This has been negotiated with the
+        # client when the session was created, and stays the same across
+        # reconnects.
+        #
+        # - "json": Text frames containing JSON
+        # - "json+deflate": Like "json", but large messages are compressed
+        #   with zlib and sent as binary frames instead
+        self._wire_protocol = wire_protocol
+
         # Must be acquired while synchronizing the user's settings
         self._settings_sync_lock = asyncio.Lock()
 
@@ -360,6 +457,18 @@ class Session(unicall.Unicall):
             weakref.WeakSet()
         )
 
+        # The most recent state which has been sent to the client for each
+        # component. This allows refreshes to only send the properties that
+        # have actually changed, rather than each visited component's full
+        # state.
+        #
+        # Components that the client doesn't know about (anymore) must not
+        # have an entry here, since they need their full state sent. Entries
+        # are removed when components are unmounted.
+        self._last_sent_component_states: weakref.WeakKeyDictionary[
+            rio.Component, JsonDoc
+        ] = weakref.WeakKeyDictionary()
+
         # HTML components have source code which must be evaluated by the client
         # exactly once. Keep track of which components have already sent their
         # source code.
@@ -367,15 +476,49 @@ class Session(unicall.Unicall):
             inspection.get_child_component_containing_attribute_names_for_builtin_components()
         )
 
+        # The names of all icons whose SVG source has already been sent to the
+        # client, so it doesn't have to fetch them one by one.
+        self._sent_icon_names: set[str] = set()
+
         # Boolean indicating whether this session has already been closed.
         self._was_closed = False
 
+        # Whether the component tree has been released to save memory while
+        # the client is disconnected. See `_hibernate`.
+        self._is_hibernating = False
+
         # This lock is used to order state updates that are sent to the client.
         # Without it a message which was generated later might be sent to the
         # client before an earlier message, leading to invalid component
         # references.
         self._refresh_lock = asyncio.Lock()
 
+        # Refreshes are coalesced: Everyone who requests a refresh before the
+        # next one starts shares it. This is the future of that next refresh,
+        # or `None` if there isn't one pending. See `_refresh`.
+        self._pending_refresh: asyncio.Future[None] | None = None
+
+        # When the most recent refresh started, as `time.monotonic()`
+        self._last_refresh_start_time = -float("inf")
+
+        # Messages for the client are queued here and sent by a background
+        # task, so a slow client doesn't stall the session. Each entry holds
+        # the message, its encoded form and the encoded form's size in bytes.
+        # See `__send_message`.
+        self._outgoing_messages = collections.deque[
+            tuple[JsonDoc, str | bytes, int]
+        ]()
+        self._outgoing_message_bytes = 0
+        self._message_sender_task: asyncio.Task[None] | None = None
+
+        # Event handlers may run in worker threads, see
+        # `_call_event_handler_in_thread`. While any are running, components
+        # marked as dirty from within these threads are passed on to the event
+        # loop's thread.
+        self._event_handlers_running_in_threads = 0
+        self._event_loop: asyncio.AbstractEventLoop | None = None
+        self._event_loop_thread_id: int | None = None
+
         # Attachments. These are arbitrary values which are passed around inside
         # of the app. They can be looked up by their type.
         # Note: These are initialized by the AppServer.
@@ -387,24 +530,127 @@ class Session(unicall.Unicall):
         self.http_headers: t.Mapping[str, str] = http_headers
 
         # Instantiate the root component
+        self._high_level_root_component = self._create_root_component()
+
+    def _create_root_component(self) -> root_components.HighLevelRootComponent:
+        """
+        Creates a new, not yet built, root component for this session.
+        """
         global_state.currently_building_component = None
         global_state.currently_building_session = self
 
-        self._high_level_root_component = (
-            root_components.HighLevelRootComponent(
-                app_server_.app._build,
-                app_server_.app._build_connection_lost_message,
+        try:
+            root_component = root_components.HighLevelRootComponent(
+                self._app_server.app._build,
+                self._app_server.app._build_connection_lost_message,
             )
-        )
+        finally:
+            global_state.currently_building_session = None
 
-        global_state.currently_building_session = None
+        root_component._is_mounted_ = True
+        return root_component
 
     async def __send_message(self, message: JsonDoc) -> None:
         if self._transport is None:
             return
 
-        msg_text = serialization.serialize_json(message)
-        await self._transport.send(msg_text)
+        # If the client hasn't received the previous component states yet,
+        # there's no point in sending outdated ones. Merge them with the new
+        # states instead.
+        queue = self._outgoing_messages
+
+        if (
+            queue
+            and message["method"] == "updateComponentStates"
+            and queue[-1][0]["method"] == "updateComponentStates"
+        ):
+            older_message, _, older_payload_size = queue.pop()
+            self._outgoing_message_bytes -= older_payload_size
+            message = _merge_component_state_updates(older_message, message)
+
+        payload = self._encode_message(message)
+        payload_size = _get_payload_size(payload)
+        queue.append((message, payload, payload_size))
+        self._outgoing_message_bytes += payload_size
+
+        # If messages are already being sent, the new one will be picked up
+        # automatically. Unless the client has fallen so far behind that it's
+        # unlikely to ever catch up.
+        if self._message_sender_task is not None:
+            max_bytes = self._app_server.app._max_queued_message_bytes
+
+            if (
+                max_bytes is not None
+                and self._outgoing_message_bytes > max_bytes
+            ):
+                self._disconnect_slow_client()
+
+            return
+
+        sender_task = self._message_sender_task = self.create_task(
+            self._send_outgoing_messages(),
+            name="Send outgoing messages",
+        )
+
+        # As long as the client keeps up, wait until the message has been sent.
+        # This way messages are processed in the same order as without a
+        # queue. Only congested clients make messages pile up.
+        await asyncio.wait([sender_task], timeout=CONGESTED_SEND_TIME)
+
+    def _encode_message(self, message: JsonDoc) -> str | bytes:
+        msg_text = serialization.serialize_json(
+            message, self._app_server.app._json_backend
+        )
+
+        # Compress large messages, if the client supports that. Small ones
+        # would barely shrink, so they're sent as is.
+        if (
+            self._wire_protocol == "json+deflate"
+            and len(msg_text) >= MIN_COMPRESSED_MESSAGE_LENGTH
+        ):
+            return zlib.compress(
+                msg_text.encode("utf-8"), MESSAGE_COMPRESSION_LEVEL
+            )
+
+        return msg_text
+
+    async def _send_outgoing_messages(self) -> None:
+        """
+        Sends all queued messages to the client, in order.
+        """
+        try:
+            while self._outgoing_messages:
+                # The queue is cleared whenever the transport changes
+                transport = self._transport
+                assert transport is not None
+
+                _, payload, payload_size = self._outgoing_messages.popleft()
+                self._outgoing_message_bytes -= payload_size
+
+                await transport.send(payload)
+                self._app_server.metrics.message_size.observe(payload_size)
+        finally:
+            if self._message_sender_task is asyncio.current_task():
+                self._message_sender_task = None
+
+    def _disconnect_slow_client(self) -> None:
+        """
+        Drops the connection to the client, but keeps the session alive. The
+        client will reconnect and receive the full state of all components
+        at once, rather than all the queued messages.
+        """
+        logging.warning(
+            f"Disconnecting a client which has fallen behind by"
+            f" {self._outgoing_message_bytes} bytes"
+        )
+
+        # Stop listening for messages from the old connection. It would
+        # otherwise mistake the connection being closed for the client leaving.
+        serve_task = self._app_server._session_serve_tasks.get(self)
+        if serve_task is not None:
+            serve_task.cancel("Client is too slow")
+
+        self._transport = None
 
     async def __receive_message(self) -> JsonDoc:
         if self._transport is None:
@@ -422,6 +668,15 @@ class Session(unicall.Unicall):
         if self.__transport is not None:
             self.__transport.close()
 
+        # Queued messages were meant for the old transport. Clients receive
+        # the full state when they reconnect anyway.
+        self._outgoing_messages.clear()
+        self._outgoing_message_bytes = 0
+
+        if self._message_sender_task is not None:
+            self._message_sender_task.cancel()
+            self._message_sender_task = None
+
         # Remember the new transport
         self.__transport = transport
 
@@ -773,6 +1028,12 @@ window.resizeTo(screen.availWidth, screen.availHeight);
                 except RuntimeError:  # Websocket is already closed
                     pass
 
+        # Give queued messages a chance to reach the client
+        if self._message_sender_task is not None:
+            await asyncio.wait(
+                [self._message_sender_task], timeout=CLOSING_SEND_TIMEOUT
+            )
+
         # Cancel all running tasks
         for task in self._running_tasks:
             task.cancel("Session is closing")
@@ -845,8 +1106,15 @@ window.resizeTo(screen.availWidth, screen.availHeight);
             return
 
         # If the handler is available, call it and await it if necessary
+        started_at = time.perf_counter()
+
         try:
-            result = handler(*event_data)
+            if self._should_run_event_handler_in_thread(handler):
+                result = await self._call_event_handler_in_thread(
+                    handler, *event_data
+                )
+            else:
+                result = handler(*event_data)
 
             if inspect.isawaitable(result):
                 await result
@@ -856,6 +1124,10 @@ window.resizeTo(screen.availWidth, screen.availHeight);
             print("Exception in event handler:")
             traceback.print_exc()
 
+        self._app_server.metrics.event_handler_duration.observe(
+            time.perf_counter() - started_at
+        )
+
         if refresh:
             await self._refresh()
 
@@ -891,6 +1163,15 @@ window.resizeTo(screen.availWidth, screen.availHeight);
         if handler is None:
             return
 
+        # Handlers which asked not to block the event loop are called in a
+        # task, just like asynchronous ones
+        if self._should_run_event_handler_in_thread(handler):
+            self.create_task(
+                self._call_event_handler(handler, *event_data, refresh=True),
+                name=f'Event handler for "{handler!r}"',
+            )
+            return
+
         # Try to call the event handler synchronously
         try:
             result = handler(*event_data)
@@ -916,6 +1197,40 @@ window.resizeTo(screen.availWidth, screen.availHeight);
 
         self.create_task(worker(), name=f'Event handler for "{handler!r}"')
 
+    def _should_run_event_handler_in_thread(
+        self,
+        handler: t.Callable[..., object],
+    ) -> bool:
+        """
+        Returns whether the handler has opted into being run in a worker
+        thread, via `rio.event.run_in_thread`.
+        """
+        # Asynchronous handlers don't block the event loop in the first place
+        if inspect.iscoroutinefunction(handler):
+            return False
+
+        return getattr(handler, "_rio_run_in_thread_", False)
+
+    async def _call_event_handler_in_thread(
+        self,
+        handler: t.Callable[..., T],
+        *event_data: object,
+    ) -> T:
+        """
+        Calls the event handler in one of the app server's worker threads and
+        returns its result. Exceptions are propagated.
+        """
+        self._event_loop = asyncio.get_running_loop()
+        self._event_loop_thread_id = threading.get_ident()
+        self._event_handlers_running_in_threads += 1
+
+        try:
+            return await self._app_server.handler_thread_pool.run(
+                handler, *event_data
+            )
+        finally:
+            self._event_handlers_running_in_threads -= 1
+
     def url_for_asset(self, asset: pathlib.Path) -> rio.URL:
         """
         Returns the URL for the given asset file. The asset must be located in
@@ -1112,7 +1427,24 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
 
         The children of non-fundamental components are not added, since they
         will be added after the parent is built anyway.
+
+        This may be called from event handlers running in worker threads, in
+        which case the component is handed over to the event loop's thread.
         """
+        if (
+            self._event_handlers_running_in_threads
+            and threading.get_ident() != self._event_loop_thread_id
+        ):
+            assert self._event_loop is not None
+            self._event_loop.call_soon_threadsafe(
+                functools.partial(
+                    self._register_dirty_component,
+                    component,
+                    include_children_recursively=include_children_recursively,
+                )
+            )
+            return
+
         self._dirty_components.add(component)
 
         if not include_children_recursively or not isinstance(
@@ -1156,6 +1488,11 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
         # Keep track of of previous child components
         old_children_in_build_boundary_for_visited_children = {}
 
+        # Only pay for the timings if somebody is interested in them
+        profiler = self._app_server.profiler
+        if not profiler.enabled:
+            profiler = None
+
         # Build all dirty components
         while self._dirty_components:
             component = self._dirty_components.pop()
@@ -1193,15 +1530,39 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
                 # If the event handler made the component dirty again, undo it
                 self._dirty_components.discard(component)
 
+            # Memoized components don't need to be rebuilt if none of their
+            # state has changed since the previous build. Their previous build
+            # output is kept as is.
+            if (
+                type(component)._rio_memo_
+                and component._build_data_ is not None
+                and component._memo_state_is_unchanged_()
+            ):
+                old_children_in_build_boundary_for_visited_children.setdefault(
+                    component,
+                    component._build_data_.all_children_in_build_boundary,
+                )
+                continue
+
             # Others need to be built
             global_state.currently_building_component = component
             global_state.currently_building_session = self
 
-            build_result = utils.safe_build(component.build)
+            if profiler is None:
+                build_result = utils.safe_build(component.build)
+            else:
+                started_at = time.perf_counter()
+                build_result = utils.safe_build(component.build)
+                profiler.record_build(
+                    self, type(component), started_at, time.perf_counter()
+                )
 
             global_state.currently_building_component = None
             global_state.currently_building_session = None
 
+            if type(component)._rio_memo_:
+                component._memo_state_ = component._get_memo_state_()
+
             if component in self._dirty_components:
                 raise RuntimeError(
                     f"The `build()` method of the component `{component}` has"
@@ -1239,7 +1600,14 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
             # - Update the component data with the build output resulting from
             #   the operations above
             else:
-                self._reconcile_tree(component_data, build_result)
+                if profiler is None:
+                    self._reconcile_tree(component_data, build_result)
+                else:
+                    started_at = time.perf_counter()
+                    self._reconcile_tree(component_data, build_result)
+                    profiler.record_reconciliation(
+                        self, type(component), started_at, time.perf_counter()
+                    )
 
                 # Reconciliation can change the build result. Make sure nobody
                 # uses `build_result` instead of `component_data.build_result`
@@ -1250,9 +1618,11 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
                 component_data.build_generation = global_state.build_generation
                 global_state.build_generation += 1
 
-            # Remember the previous children of this component
-            old_children_in_build_boundary_for_visited_children[component] = (
-                component_data.all_children_in_build_boundary
+            # Remember the previous children of this component. If it is built
+            # multiple times, keep the children from before this refresh.
+            old_children_in_build_boundary_for_visited_children.setdefault(
+                component,
+                component_data.all_children_in_build_boundary,
             )
 
             # Inject the builder and build generation
@@ -1270,14 +1640,15 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
 
         # Determine which components are alive, to avoid sending references to
         # dead components to the frontend.
-        is_in_component_tree_cache: dict[rio.Component, bool] = {
-            self._high_level_root_component: True,
-        }
+        self._update_mount_states(
+            visited_components,
+            old_children_in_build_boundary_for_visited_children,
+        )
 
         visited_and_live_components: set[rio.Component] = {
             component
             for component in visited_components
-            if component._is_in_component_tree_(is_in_component_tree_cache)
+            if component._is_mounted_
         }
 
         all_children_old = set[rio.Component]()
@@ -1302,24 +1673,26 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
         unmounted_components = all_children_old - all_children_new
 
         # The state/children of newly mounted components must also be sent to
-        # the client.
-        unvisited_mounted_components = (
-            mounted_components - visited_and_live_components
-        )
+        # the client. Walk each newly mounted subtree once, skipping components
+        # which have already been visited. Otherwise every component of a
+        # remounted subtree would walk its own subtree again, which grows
+        # exponentially with the subtree's depth.
+        to_do = list(mounted_components - visited_and_live_components)
 
-        while unvisited_mounted_components:
-            visited_and_live_components.update(unvisited_mounted_components)
+        while to_do:
+            component = to_do.pop()
 
-            new_children = list[rio.Component]()
-            for component in unvisited_mounted_components:
-                if not isinstance(
-                    component, fundamental_component.FundamentalComponent
-                ):
-                    new_children += component._iter_component_tree_(
-                        include_root=False
-                    )
+            if component in visited_and_live_components:
+                continue
 
-            unvisited_mounted_components = new_children
+            visited_and_live_components.add(component)
+
+            if isinstance(
+                component, fundamental_component.FundamentalComponent
+            ):
+                to_do.extend(component._iter_direct_children_())
+            else:
+                to_do.append(component._build_data_.build_result)  # type: ignore
 
         return (
             visited_and_live_components,
@@ -1338,7 +1711,69 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
         Afterwards, the client is also informed of any changes, meaning that
         after this method returns there are no more dirty components in the
         session, and Python's state and the client's state are in sync.
+
+        Refreshes don't start immediately. Instead they run on the next
+        iteration of the event loop, or once the app's `refresh_interval` has
+        passed since the previous refresh. All calls made in the meantime share
+        the same refresh, so bursts of events result in a single
+        `updateComponentStates` message.
         """
+        if self._pending_refresh is None:
+            self._pending_refresh = asyncio.get_running_loop().create_future()
+            self.create_task(
+                self._run_pending_refresh(self._pending_refresh),
+                name="Session refresh",
+            )
+
+        # Shield the shared future, so cancelling one caller doesn't cancel
+        # the refresh for everyone else
+        await asyncio.shield(self._pending_refresh)
+
+    async def _run_pending_refresh(self, future: asyncio.Future[None]) -> None:
+        try:
+            # Wait for the next iteration of the event loop, or until the
+            # refresh interval has passed. Anyone requesting a refresh in the
+            # meantime joins this one.
+            refresh_interval = (
+                self._app_server.app._refresh_interval.total_seconds()
+            )
+            delay = (
+                self._last_refresh_start_time
+                + refresh_interval
+                - time.monotonic()
+            )
+            await asyncio.sleep(max(delay, 0))
+
+            # From now on, refresh requests must be handled by a new refresh.
+            # This one may already have missed their changes.
+            self._pending_refresh = None
+            self._last_refresh_start_time = time.monotonic()
+
+            await self._refresh_now()
+
+        # If the session is closed while the refresh is pending, the task is
+        # cancelled. Make sure nobody keeps waiting for it.
+        except asyncio.CancelledError:
+            if self._pending_refresh is future:
+                self._pending_refresh = None
+
+            future.cancel()
+            raise
+
+        # Errors are reported to everyone waiting for the refresh
+        except Exception as error:
+            future.set_exception(error)
+
+        else:
+            future.set_result(None)
+
+    async def _refresh_now(self) -> None:
+        """
+        Performs a refresh right away. See `_refresh` for details.
+        """
+        # Hibernating sessions are only rebuilt once the client reconnects
+        if self._is_hibernating:
+            return
 
         # For why this lock is here see its creation in `__init__`
         async with self._refresh_lock:
@@ -1346,6 +1781,8 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
             self._crashed_build_functions.clear()
 
             while self._dirty_components:
+                refresh_started_at = time.perf_counter()
+
                 # Refresh and get a set of all components which have been
                 # visited
                 (
@@ -1358,13 +1795,25 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
                 if not visited_components:
                     return
 
-                # Serialize all components which have been visited
-                delta_states: dict[int, JsonDoc] = {
-                    component._id: serialization.serialize_and_host_component(
-                        component
+                # Serialize all components which have been visited. Only
+                # properties which have changed since they were last sent to
+                # the client are included.
+                delta_states = self._serialize_delta_states(visited_components)
+
+                # Sending the states isn't part of the refresh. That's covered
+                # by the message metrics.
+                refresh_finished_at = time.perf_counter()
+                self._app_server.metrics.refresh_duration.observe(
+                    refresh_finished_at - refresh_started_at
+                )
+
+                if self._app_server.profiler.enabled:
+                    self._app_server.profiler.record_refresh(
+                        self,
+                        refresh_started_at,
+                        refresh_finished_at,
+                        len(visited_components),
                     )
-                    for component in visited_components
-                }
 
                 await self._update_component_states(
                     visited_components, delta_states
@@ -1421,6 +1870,9 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
             await component._initialize_on_client(self)
             self._initialized_html_components.add(type(component)._unique_id_)
 
+        # Send any icons the client doesn't have yet, before it needs them
+        await self._send_icons(visited_components)
+
         # Check whether the root component needs replacing. Take care to never
         # send the high level root component. JS only cares about the
         # fundamental one.
@@ -1442,26 +1894,310 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
             delta_states, root_component_id
         )
 
+    async def _send_icons(self, components: t.Iterable[rio.Component]) -> None:
+        """
+        Sends the SVG sources of all icons displayed by the given components,
+        which haven't been sent to the client yet, in a single message. Without
+        this, the client would have to fetch every icon separately.
+        """
+        new_icons: dict[str, str] = {}
+
+        for component in components:
+            if not isinstance(component, rio.Icon):
+                continue
+
+            # The client caches icons by the name they're referred to by, so
+            # don't normalize it
+            icon_name = component.icon
+
+            if icon_name in self._sent_icon_names or icon_name in new_icons:
+                continue
+
+            try:
+                new_icons[icon_name] = icon_registry.get_icon_svg(icon_name)
+
+            # Let the client request the icon as usual. It knows how to deal
+            # with missing icons.
+            except errors.AssetError:
+                continue
+
+        if not new_icons:
+            return
+
+        # If the message is lost because the client disconnects, it will fall
+        # back to fetching the icons itself
+        self._sent_icon_names.update(new_icons)
+        await self._remote_register_icons(new_icons)
+
     async def _send_all_components_on_reconnect(self) -> None:
         self._initialized_html_components.clear()
+        self._sent_icon_names.clear()
+
+        # If the component tree was released, it has to be built from scratch.
+        # Since nothing has been sent to the client yet, a regular refresh
+        # sends every single component.
+        if self._is_hibernating:
+            self._is_hibernating = False
+            self._last_sent_component_states.clear()
+            await self._refresh_now()
+            return
 
         # For why this lock is here see its creation in `__init__`
         async with self._refresh_lock:
-            visited_components: set[rio.Component] = set()
-            delta_states = {}
+            # The client starts from scratch, so it needs the full state of
+            # every single component
+            self._last_sent_component_states.clear()
 
-            for (
-                component
-            ) in self._high_level_root_component._iter_component_tree_():
-                visited_components.add(component)
-                delta_states[component._id] = (
-                    serialization.serialize_and_host_component(component)
-                )
+            all_components = list(
+                self._high_level_root_component._iter_component_tree_()
+            )
+            visited_components = set(all_components)
+
+            delta_states = self._serialize_delta_states(all_components)
 
             await self._update_component_states(
                 visited_components, delta_states
             )
 
+    def _hibernate(self) -> None:
+        """
+        Releases the component tree of a disconnected session to save memory.
+        Everything stored in the session itself, such as attachments and the
+        active page, is kept. Once the client reconnects, the tree is built
+        anew by `_send_all_components_on_reconnect`.
+
+        Any state stored in components is lost.
+        """
+        assert self._transport is None, "Only disconnected sessions hibernate"
+
+        if self._is_hibernating:
+            return
+
+        # Components are about to disappear, so give them the same
+        # notification as if they had been removed from the tree
+        root_component = self._high_level_root_component
+
+        for component in root_component._iter_component_tree_():
+            if not component._is_mounted_:
+                continue
+
+            component._is_mounted_ = False
+
+            for handler, _ in component._rio_event_handlers_[
+                rio.event.EventTag.ON_UNMOUNT
+            ]:
+                self._call_event_handler_sync(handler, component)
+
+        # All other references to components are weak, so replacing the root
+        # component releases the entire tree
+        self._is_hibernating = True
+        self._dirty_components.clear()
+        self._last_sent_component_states.clear()
+        self._crashed_build_functions.clear()
+        self._high_level_root_component = self._create_root_component()
+
+        # The client keeps displaying the old root, so the new one must take
+        # over its id
+        if root_component._build_data_ is not None:
+            self._high_level_root_component._fundamental_root_id_ = (
+                root_component._build_data_.build_result._id
+            )
+
+    def _get_memory_usage(self) -> memory_usage.SessionMemoryUsage:
+        """
+        Estimates how much memory this session occupies. See
+        `memory_usage.SessionMemoryUsage`.
+        """
+        return memory_usage.estimate_session_memory_usage(self)
+
+    def _serialize_delta_states(
+        self,
+        components: t.Iterable[rio.Component],
+    ) -> dict[int, JsonDoc]:
+        """
+        Serializes the given components, keeping only the properties which have
+        changed since they were last sent to the client. Returns the resulting
+        states by component id.
+        """
+        profiler = self._app_server.profiler
+
+        if not profiler.enabled:
+            return {
+                component._id: self._get_delta_state(
+                    component,
+                    serialization.serialize_and_host_component(component),
+                )
+                for component in components
+            }
+
+        json_backend = self._app_server.app._json_backend
+        delta_states: dict[int, JsonDoc] = {}
+
+        for component in components:
+            started_at = time.perf_counter()
+            delta_state = self._get_delta_state(
+                component,
+                serialization.serialize_and_host_component(component),
+            )
+            finished_at = time.perf_counter()
+
+            # Measuring the size isn't part of the serialization, so it's done
+            # after the clock has stopped
+            serialized = serialization.serialize_json(delta_state, json_backend)
+            profiler.record_serialization(
+                self,
+                type(component),
+                started_at,
+                finished_at,
+                len(serialized.encode("utf-8")),
+            )
+
+            delta_states[component._id] = delta_state
+
+        return delta_states
+
+    def _get_delta_state(
+        self,
+        component: rio.Component,
+        state: JsonDoc,
+    ) -> JsonDoc:
+        """
+        Given the freshly serialized state of a component, returns only those
+        properties which differ from the state last sent to the client. If the
+        client doesn't know the component yet, the full state is returned.
+
+        The new state is remembered as the one known by the client. It is
+        copied, since `_custom_serialize_` may return mutable internals of the
+        component, which could later be changed in place.
+        """
+        old_state = self._last_sent_component_states.get(component)
+        self._last_sent_component_states[component] = _copy_json(state)
+
+        if old_state is None:
+            return state
+
+        delta_state: JsonDoc = {}
+
+        for key, value in state.items():
+            try:
+                old_value = old_state[key]
+            except KeyError:
+                delta_state[key] = value
+                continue
+
+            if old_value is value:
+                continue
+
+            # The values can be arbitrary JSON, which may include types like
+            # numpy arrays that don't support comparison to a `bool`. If in
+            # doubt, send the value.
+            try:
+                unchanged = bool(old_value == value)
+            except Exception:
+                unchanged = False
+
+            if not unchanged:
+                delta_state[key] = value
+
+        return delta_state
+
+    def _update_mount_states(
+        self,
+        visited_components: t.Iterable[rio.Component],
+        old_children_in_build_boundary: t.Mapping[
+            rio.Component, t.AbstractSet[rio.Component]
+        ],
+    ) -> None:
+        """
+        Updates the `_is_mounted_` flag of all components affected by the
+        builds of a refresh.
+
+        `visited_components` are all components which have been built or have
+        otherwise changed during the refresh. `old_children_in_build_boundary`
+        maps each component that has been built to the children in its build
+        boundary before the refresh started.
+        Only the differences between those and the current children have to be
+        processed, so this is proportional to the number of components that
+        were actually added or removed, rather than the size of the tree.
+        """
+        # Unmount all removed components first. This way, components which
+        # have moved from one builder to another are mounted again below.
+        for builder, old_children in old_children_in_build_boundary.items():
+            new_children = builder._build_data_.all_children_in_build_boundary  # type: ignore
+
+            for child in old_children - new_children:
+                if child._is_mounted_:
+                    self._set_subtree_mounted(child, False)
+
+        # Mount all added components, as long as their builder is mounted. If
+        # the builder itself has only just been mounted, its entire subtree has
+        # already been taken care of.
+        for builder, old_children in old_children_in_build_boundary.items():
+            if not builder._is_mounted_:
+                continue
+
+            new_children = builder._build_data_.all_children_in_build_boundary  # type: ignore
+
+            for child in new_children - old_children:
+                self._set_subtree_mounted(child, True)
+
+        # Reconciliation can also hand new children to fundamental components
+        # without rebuilding their builder. Those are visited, since they've
+        # changed, so make sure their children are mounted as well.
+        for component in visited_components:
+            if not component._is_mounted_ or not isinstance(
+                component, fundamental_component.FundamentalComponent
+            ):
+                continue
+
+            for child in component._iter_direct_children_():
+                if not child._is_mounted_:
+                    self._set_subtree_mounted(child, True)
+
+    def _set_subtree_mounted(
+        self,
+        component: rio.Component,
+        is_mounted: bool,
+    ) -> None:
+        """
+        Sets the `_is_mounted_` flag of the given component, all of its
+        children and the components in any dialogs owned by them.
+
+        When unmounting, the state last sent to the client is also forgotten.
+        The client discards unmounted components, so should they ever be
+        mounted again, they must receive their full state.
+
+        Subtrees whose root already has the desired state are skipped, since
+        their children have already been taken care of. Without this, mounting
+        a deep tree would walk the same components over and over again.
+        """
+        to_do = [component]
+
+        while to_do:
+            component = to_do.pop()
+
+            if component._is_mounted_ == is_mounted:
+                continue
+
+            component._is_mounted_ = is_mounted
+
+            if not is_mounted:
+                self._last_sent_component_states.pop(component, None)
+
+            # Fundamental components have their children stored as attributes,
+            # while high-level ones have only their build result. Beware of
+            # components which have never been built.
+            if isinstance(
+                component, fundamental_component.FundamentalComponent
+            ):
+                to_do.extend(component._iter_direct_children_())
+            elif component._build_data_ is not None:
+                to_do.append(component._build_data_.build_result)
+
+            # Dialogs live and die with their owning component
+            for dialog in component._owned_dialogs_.values():
+                to_do.append(dialog._root_component)
+
     def _reconcile_tree(
         self,
         old_build_data: BuildData,
@@ -1915,14 +2651,20 @@ window.history.{method}(null, "", {json.dumps(relative_url)})
         except KeyError:
             pass
 
-        # Generate a random name for the font
-        while True:
-            font_name = "".join(
-                random.choice(string.ascii_letters) for _ in range(10)
-            )
+        # Look up the font's name, generating a random one if this is the first
+        # time any session uses the font
+        try:
+            font_name = _FONT_NAMES[font]
+        except KeyError:
+            while True:
+                font_name = "".join(
+                    random.choice(string.ascii_letters) for _ in range(10)
+                )
 
-            if font_name not in self._registered_font_names:
-                break
+                if font_name not in _FONT_NAMES.values():
+                    break
+
+            _FONT_NAMES[font] = font_name
 
         # Register the font files as assets
         font_assets: list[assets.Asset] = []
@@ -2566,12 +3308,45 @@ a.remove();
         # Done
         return result
 
+    def _get_theme_css_values(self, thm: theme.Theme) -> dict[str, str]:
+        """
+        Like `_calculate_theme_css_values`, but the result is shared by all
+        sessions using the same theme instance.
+        """
+        cache = self._app_server._theme_css_cache
+        cached = cache.get(id(thm))
+
+        # The cache holds on to the theme, so if the theme is still the same
+        # object, its id can't have been reused
+        if cached is None or cached[0] is not thm:
+            variables = self._calculate_theme_css_values(thm)
+            cache.put(id(thm), (thm, variables))
+            return variables
+
+        # The variables refer to fonts by name. Those names are shared by all
+        # sessions, but each client still needs the fonts themselves.
+        fonts = [thm.font, thm.monospace_font]
+
+        for style in (
+            thm.heading1_style,
+            thm.heading2_style,
+            thm.heading3_style,
+            thm.text_style,
+        ):
+            if style.font is not None:
+                fonts.append(style.font)
+
+        for font in fonts:
+            self._register_font(font)
+
+        return cached[1]
+
     async def _apply_theme(self, thm: theme.Theme) -> None:
         # Store the theme in the session
         self.theme = thm
 
         # Get all CSS values to apply
-        variables = self._calculate_theme_css_values(thm)
+        variables = self._get_theme_css_values(thm)
 
         # Update the variables client-side
         await self._remote_apply_theme(
@@ -2811,6 +3586,7 @@ a.remove();
         # Register the dialog with the component. This keeps it (and contained
         # components) alive until the component is destroyed.
         owning_component._owned_dialogs_[dialog_container._id] = result
+        dialog_container._is_mounted_ = owning_component._is_mounted_
 
         # Refresh. This will build any components in the dialog and send them to
         # the client
@@ -3318,6 +4094,10 @@ a.remove();
     ) -> None:
         raise NotImplementedError  # pragma: no cover
 
+    @unicall.remote(name="registerIcons", await_response=False)
+    async def _remote_register_icons(self, icons: dict[str, str]) -> None:
+        raise NotImplementedError  # pragma: no cover
+
     @unicall.remote(
         name="closeSession",
         await_response=False,
@@ -3362,6 +4142,18 @@ a.remove();
         # Update the component's state
         component._validate_delta_state_from_frontend(delta_state)
         component._apply_delta_state_from_frontend(delta_state)
+
+        # The client's state has diverged from the one sent by the server.
+        # Forget the affected values, so they're sent again the next time the
+        # component is refreshed.
+        try:
+            last_sent_state = self._last_sent_component_states[component]
+        except KeyError:
+            pass
+        else:
+            for key in delta_state:
+                last_sent_state.pop(key, None)
+
         await component._call_event_handlers_for_delta_state(delta_state)
 
         # Trigger a refresh. The component itself doesn't need to rebuild, but
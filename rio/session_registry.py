@@ -0,0 +1,526 @@
+"""
+Pluggable storage for session tokens and hosted assets.
+
+When a client first loads the app, one HTTP request fetches the HTML and a
+second one opens the websocket. Similarly, assets are hosted by whichever
+process rendered the component using them, but fetched by separate requests.
+If the app is served by multiple worker processes (e.g. `uvicorn --workers 4`
+or several replicas behind a load balancer) these requests frequently end up
+in different processes.
+
+A session registry stores this information somewhere all workers can see it.
+The default `InMemorySessionRegistry` only works within a single process.
+`SqliteSessionRegistry` shares everything between all processes on the same
+machine via a SQLite database.
+
+Note that running sessions themselves can't be moved between processes. If a
+client reconnects to a different worker than the one its session is running
+in, the worker closes the connection and the client keeps retrying until it
+reaches the correct one.
+"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import concurrent.futures
+import dataclasses
+import json
+import os
+import sqlite3
+import time
+import typing as t
+import weakref
+from datetime import timedelta
+from pathlib import Path
+
+import rio
+
+from . import assets
+
+__all__ = [
+    "LatentSession",
+    "SessionRegistry",
+    "InMemorySessionRegistry",
+    "SqliteSessionRegistry",
+]
+
+
+T = t.TypeVar("T")
+
+
+@dataclasses.dataclass(frozen=True)
+class LatentSession:
+    """
+    Everything needed to create a session for a client which has requested the
+    app's HTML, but hasn't connected via websocket yet.
+    """
+
+    url: str
+    client_ip: str
+    client_port: int
+    http_headers: tuple[tuple[str, str], ...]
+
+
+class SessionRegistry(abc.ABC):
+    """
+    Keeps track of session tokens and hosted assets.
+
+    All methods are called from the event loop. Slow work, like accessing a
+    database, must not block it. Methods whose results are needed are
+    coroutines. The synchronous ones may be called while serializing
+    components, so they must return right away, e.g. by handing the work to a
+    background thread.
+    """
+
+    @abc.abstractmethod
+    async def add_latent_session(
+        self,
+        token: str,
+        session: LatentSession,
+    ) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def pop_latent_session(self, token: str) -> LatentSession | None:
+        """
+        Removes and returns the latent session with the given token. Returns
+        `None` if there is no such session.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def add_active_session(self, token: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def remove_active_session(self, token: str) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def is_active_session(self, token: str) -> bool:
+        """
+        Returns whether a session with the given token is running, in any
+        process.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def host_asset(self, asset: assets.HostedAsset) -> None:
+        """
+        Makes the asset available under its secret id. The asset is hosted for
+        at least as long as the Python object is alive.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_asset(self, secret_id: str) -> assets.HostedAsset | None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """
+        Releases any resources held by the registry.
+        """
+        pass
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """
+    Stores everything in the memory of the current process. This is the
+    fastest option, but only works if the app is served by a single process.
+    """
+
+    def __init__(self) -> None:
+        self._latent_sessions: dict[str, LatentSession] = {}
+        self._active_session_tokens: set[str] = set()
+
+        # Assets are held weakly, meaning they're hosted for as long as their
+        # corresponding Python objects are alive.
+        self._assets: weakref.WeakValueDictionary[str, assets.HostedAsset] = (
+            weakref.WeakValueDictionary()
+        )
+
+    async def add_latent_session(
+        self,
+        token: str,
+        session: LatentSession,
+    ) -> None:
+        self._latent_sessions[token] = session
+
+    async def pop_latent_session(self, token: str) -> LatentSession | None:
+        return self._latent_sessions.pop(token, None)
+
+    async def add_active_session(self, token: str) -> None:
+        self._active_session_tokens.add(token)
+
+    def remove_active_session(self, token: str) -> None:
+        self._active_session_tokens.discard(token)
+
+    async def is_active_session(self, token: str) -> bool:
+        return token in self._active_session_tokens
+
+    def host_asset(self, asset: assets.HostedAsset) -> None:
+        self._assets[asset.secret_id] = asset
+
+    async def get_asset(self, secret_id: str) -> assets.HostedAsset | None:
+        return self._assets.get(secret_id)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS latent_sessions (
+    token TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    url TEXT NOT NULL,
+    client_ip TEXT NOT NULL,
+    client_port INTEGER NOT NULL,
+    http_headers TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS active_sessions (
+    token TEXT PRIMARY KEY,
+    pid INTEGER NOT NULL,
+    renewed_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS assets (
+    secret_id TEXT PRIMARY KEY,
+    hosted_at REAL NOT NULL,
+    media_type TEXT,
+    path TEXT,
+    data BLOB
+);
+"""
+
+
+class SqliteSessionRegistry(SessionRegistry):
+    """
+    Shares session tokens and assets between all processes on the same machine
+    using a SQLite database. Point all workers at the same file.
+
+    Since nobody knows when assets are no longer used by other processes,
+    shared assets expire after `asset_lifetime`. Clients which haven't
+    connected yet expire after `latent_session_lifetime`.
+
+    Each process regularly renews the sessions running in it. Sessions which
+    haven't been renewed for `active_session_lifetime`, e.g. because their
+    process has crashed, are no longer considered active.
+
+    All database accesses happen in a dedicated thread, one at a time, so the
+    event loop is never blocked by them. Since that thread processes them in
+    order, anything stored is visible to all later calls of the same process.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        asset_lifetime: timedelta = timedelta(days=1),
+        latent_session_lifetime: timedelta = timedelta(hours=1),
+        active_session_lifetime: timedelta = timedelta(minutes=1),
+    ) -> None:
+        self.path = Path(path)
+        self.asset_lifetime = asset_lifetime
+        self.latent_session_lifetime = latent_session_lifetime
+        self.active_session_lifetime = active_session_lifetime
+
+        # Assets hosted by this process. Checking these first avoids database
+        # round trips, and prevents the same asset from being written to the
+        # database over and over.
+        self._local_assets: weakref.WeakValueDictionary[
+            str, assets.HostedAsset
+        ] = weakref.WeakValueDictionary()
+
+        self._last_purge = 0.0
+
+        # Only ever used from within the executor's thread
+        self._connection: sqlite3.Connection | None = None
+
+        # Forked worker processes inherit the executor, but not its thread.
+        # Each process creates its own executor (and connection) on first use.
+        self._executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self._executor_pid: int | None = None
+
+        self._renewal_task: asyncio.Task[None] | None = None
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # Connect lazily. Forked worker processes mustn't share a connection.
+        if self._connection is None:
+            self._connection = sqlite3.connect(
+                self.path,
+                timeout=10,
+                isolation_level=None,
+            )
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(_SQLITE_SCHEMA)
+
+        return self._connection
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        pid = os.getpid()
+
+        if self._executor is None or self._executor_pid != pid:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="rio-session-registry",
+            )
+            self._executor_pid = pid
+            self._connection = None
+
+        return self._executor
+
+    async def _run(self, function: t.Callable[..., T], *args: object) -> T:
+        """
+        Runs the function in the database thread and returns its result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._get_executor(),
+            function,
+            *args,
+        )
+
+    def _run_in_background(
+        self,
+        function: t.Callable[..., object],
+        *args: object,
+    ) -> None:
+        """
+        Queues the function to be run in the database thread, without waiting
+        for it.
+        """
+
+        def worker() -> None:
+            try:
+                function(*args)
+            except Exception:
+                rio._logger.exception("Error in the session registry")
+
+        self._get_executor().submit(worker)
+
+    def _purge_expired_entries(self) -> None:
+        # Don't do this on every call, it's not free
+        now = time.time()
+        if now - self._last_purge < 60:
+            return
+
+        self._last_purge = now
+
+        self._db.execute(
+            "DELETE FROM latent_sessions WHERE created_at < ?",
+            (now - self.latent_session_lifetime.total_seconds(),),
+        )
+        self._db.execute(
+            "DELETE FROM active_sessions WHERE renewed_at < ?",
+            (now - self.active_session_lifetime.total_seconds(),),
+        )
+        self._db.execute(
+            "DELETE FROM assets WHERE hosted_at < ?",
+            (now - self.asset_lifetime.total_seconds(),),
+        )
+
+    async def add_latent_session(
+        self,
+        token: str,
+        session: LatentSession,
+    ) -> None:
+        await self._run(self._add_latent_session, token, session)
+
+    def _add_latent_session(self, token: str, session: LatentSession) -> None:
+        self._purge_expired_entries()
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO latent_sessions VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                token,
+                time.time(),
+                session.url,
+                session.client_ip,
+                session.client_port,
+                json.dumps(session.http_headers),
+            ),
+        )
+
+    async def pop_latent_session(self, token: str) -> LatentSession | None:
+        return await self._run(self._pop_latent_session, token)
+
+    def _pop_latent_session(self, token: str) -> LatentSession | None:
+        # Multiple processes may receive the same token at the same time (e.g.
+        # from duplicated browser tabs). Make sure only one of them gets it.
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+
+        try:
+            row = db.execute(
+                "SELECT url, client_ip, client_port, http_headers"
+                " FROM latent_sessions WHERE token = ?",
+                (token,),
+            ).fetchone()
+
+            db.execute("DELETE FROM latent_sessions WHERE token = ?", (token,))
+        finally:
+            db.execute("COMMIT")
+
+        if row is None:
+            return None
+
+        url, client_ip, client_port, http_headers = row
+
+        return LatentSession(
+            url=url,
+            client_ip=client_ip,
+            client_port=client_port,
+            http_headers=tuple(
+                (name, value) for name, value in json.loads(http_headers)
+            ),
+        )
+
+    async def add_active_session(self, token: str) -> None:
+        await self._run(self._add_active_session, token)
+
+        # Keep the sessions of this process alive for as long as it's running
+        if self._renewal_task is None or self._renewal_task.done():
+            self._renewal_task = asyncio.create_task(
+                self._periodically_renew_active_sessions(),
+                name="Renew active sessions in the session registry",
+            )
+
+    def _add_active_session(self, token: str) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO active_sessions VALUES (?, ?, ?)",
+            (token, os.getpid(), time.time()),
+        )
+
+    async def _periodically_renew_active_sessions(self) -> None:
+        interval = self.active_session_lifetime.total_seconds() / 3
+
+        while True:
+            await asyncio.sleep(interval)
+            await self._run(self._renew_active_sessions)
+
+    def _renew_active_sessions(self) -> None:
+        self._db.execute(
+            "UPDATE active_sessions SET renewed_at = ? WHERE pid = ?",
+            (time.time(), os.getpid()),
+        )
+
+    def remove_active_session(self, token: str) -> None:
+        self._run_in_background(self._remove_active_session, token)
+
+    def _remove_active_session(self, token: str) -> None:
+        self._db.execute(
+            "DELETE FROM active_sessions WHERE token = ?",
+            (token,),
+        )
+
+    async def is_active_session(self, token: str) -> bool:
+        return await self._run(self._is_active_session, token)
+
+    def _is_active_session(self, token: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM active_sessions WHERE token = ? AND renewed_at >= ?",
+            (
+                token,
+                time.time() - self.active_session_lifetime.total_seconds(),
+            ),
+        ).fetchone()
+
+        return row is not None
+
+    def host_asset(self, asset: assets.HostedAsset) -> None:
+        secret_id = asset.secret_id
+
+        # Assets are identified by their content, so if this process is
+        # already hosting it, so is the database
+        if secret_id in self._local_assets:
+            return
+
+        if isinstance(asset, assets.BytesAsset):
+            path = None
+            data = bytes(asset.data)
+        elif isinstance(asset, assets.PathAsset):
+            path = str(asset.path)
+            data = None
+        else:
+            raise TypeError(f"Unable to share asset of unknown type: {asset}")
+
+        # This process can serve the asset right away. Other processes can
+        # once it has been written to the database.
+        self._local_assets[secret_id] = asset
+        self._run_in_background(
+            self._store_asset,
+            secret_id,
+            asset.media_type,
+            path,
+            data,
+        )
+
+    def _store_asset(
+        self,
+        secret_id: str,
+        media_type: str | None,
+        path: str | None,
+        data: bytes | None,
+    ) -> None:
+        self._purge_expired_entries()
+
+        self._db.execute(
+            "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?)",
+            (secret_id, time.time(), media_type, path, data),
+        )
+
+    async def get_asset(self, secret_id: str) -> assets.HostedAsset | None:
+        try:
+            return self._local_assets[secret_id]
+        except KeyError:
+            pass
+
+        row = await self._run(self._load_asset, secret_id)
+
+        if row is None:
+            return None
+
+        media_type, path, data = row
+
+        if path is not None:
+            result = assets.PathAsset(path, media_type)
+        else:
+            result = assets.BytesAsset(data, media_type)
+
+        # Ids may depend on the process that computed them, so keep the one
+        # the asset was stored under
+        result._secret_id = secret_id
+        return result
+
+    def _load_asset(
+        self,
+        secret_id: str,
+    ) -> tuple[str | None, str | None, bytes | None] | None:
+        return self._db.execute(
+            "SELECT media_type, path, data FROM assets WHERE secret_id = ?",
+            (secret_id,),
+        ).fetchone()
+
+    async def close(self) -> None:
+        if self._renewal_task is not None:
+            self._renewal_task.cancel()
+            self._renewal_task = None
+
+        if self._executor is None or self._executor_pid != os.getpid():
+            return
+
+        # Wait for any queued writes, then clean up
+        await self._run(self._close_connection)
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    def _close_connection(self) -> None:
+        if self._connection is None:
+            return
+
+        # Sessions running in this process are gone for good
+        self._connection.execute(
+            "DELETE FROM active_sessions WHERE pid = ?",
+            (os.getpid(),),
+        )
+        self._connection.close()
+        self._connection = None
@@ -1,3 +1,19 @@
+import importlib
+import typing as t
+
 from .abstract_transport import *
-from .fastapi_websocket_transport import *
 from .message_recorder_transport import *
+
+if t.TYPE_CHECKING:
+    from .fastapi_websocket_transport import *
+
+
+# Importing `fastapi` takes a long time, so the websocket transport is only
+# loaded once it's actually needed
+def __getattr__(name: str) -> object:
+    if name == "FastapiWebsocketTransport":
+        return importlib.import_module(
+            ".fastapi_websocket_transport", __name__
+        ).FastapiWebsocketTransport
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -19,9 +19,13 @@ class AbstractTransport(abc.ABC):
         self.closed = asyncio.Event()
 
     @abc.abstractmethod
-    async def send(self, message: str, /) -> None:
+    async def send(self, message: str | bytes, /) -> None:
         """
         Send the message if possible. If the transport is closed, do nothing.
+
+        Text messages contain JSON. Binary messages are only sent if the client
+        has agreed to a wire protocol that uses them, and contain
+        zlib-compressed JSON.
         """
         raise NotImplementedError
 
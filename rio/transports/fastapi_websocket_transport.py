@@ -3,27 +3,37 @@ import asyncio
 import fastapi
 from uniserde import JsonDoc
 
+from .. import json_backends
 from .abstract_transport import *
 
 __all__ = ["FastapiWebsocketTransport"]
 
 
 class FastapiWebsocketTransport(AbstractTransport):
-    def __init__(self, websocket: fastapi.WebSocket):
+    def __init__(
+        self,
+        websocket: fastapi.WebSocket,
+        json_backend: json_backends.JsonBackend,
+    ):
         super().__init__()
 
         self._websocket = websocket
+        self._json_backend = json_backend
         self._closed_intentionally = False
 
-    async def send(self, msg: str) -> None:
+    async def send(self, msg: str | bytes) -> None:
         try:
-            await self._websocket.send_text(msg)
+            if isinstance(msg, bytes):
+                await self._websocket.send_bytes(msg)
+            else:
+                await self._websocket.send_text(msg)
         except RuntimeError:
             pass  # Socket is already closed
 
     async def receive(self) -> JsonDoc:
         try:
-            return await self._websocket.receive_json()
+            message_text = await self._websocket.receive_text()
+            return self._json_backend.loads(message_text)
         except RuntimeError:
             pass  # Socket is already closed
         except fastapi.WebSocketDisconnect as err:
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import typing as t
+import zlib
 
 from uniserde import JsonDoc
 
@@ -24,7 +25,10 @@ class MessageRecorderTransport(AbstractTransport):
             | type[TransportClosedIntentionally]
         ]()
 
-    async def send(self, msg: str) -> None:
+    async def send(self, msg: str | bytes) -> None:
+        if isinstance(msg, bytes):
+            msg = zlib.decompress(msg).decode("utf-8")
+
         parsed_msg = json.loads(msg)
         self.sent_messages.append(parsed_msg)
 
@@ -9,6 +9,16 @@ class UrlPattern:
             self._build_regex(pattern)
         )
 
+        # URLs can only match if they start with the same segment as the
+        # pattern. This allows routing to skip most patterns without trying
+        # them. `None` if the first segment is a path parameter.
+        first_segment = pattern.partition("/")[0]
+
+        if first_segment.startswith("{"):
+            self.first_literal_segment: str | None = None
+        else:
+            self.first_literal_segment = first_segment
+
     def _build_regex(
         self, pattern: str
     ) -> tuple[re.Pattern, str, frozenset[str]]:
@@ -0,0 +1,95 @@
+"""
+Compares the available JSON backends by serializing the initial
+`updateComponentStates` message of a page containing roughly 10,000 components.
+
+Usage: `python scripts/benchmark_json_backends.py`
+"""
+
+import asyncio
+import timeit
+
+import rio
+import rio.testing
+from rio import json_backends, serialization
+
+# Configure: How many rows the page should have. Each row consists of 5
+# components (+ the ones created internally by Rio).
+ROW_COUNT = 2_000
+
+# Configure: How often each backend should serialize the message
+REPETITIONS = 20
+
+
+class BenchmarkRow(rio.Component):
+    index: int
+
+    def build(self) -> rio.Component:
+        return rio.Row(
+            rio.Icon("material/star", fill="primary"),
+            rio.Text(f"Row {self.index}", justify="left", grow_x=True),
+            rio.Switch(is_on=self.index % 2 == 0),
+            spacing=0.5,
+            margin=0.2,
+        )
+
+
+def build() -> rio.Component:
+    return rio.Column(*[BenchmarkRow(index) for index in range(ROW_COUNT)])
+
+
+async def build_initial_message() -> dict:
+    """
+    Builds the benchmark page and returns the same message the session would
+    send to a freshly connected client.
+    """
+    async with rio.testing.TestClient(build) as test_client:
+        session = test_client.session
+
+        delta_states = {
+            component._id: serialization.serialize_and_host_component(component)
+            for component in session._high_level_root_component._iter_component_tree_()
+        }
+
+        return {
+            "jsonrpc": "2.0",
+            "method": "updateComponentStates",
+            "params": {
+                "deltaStates": delta_states,
+                "rootComponentId": None,
+            },
+        }
+
+
+def main() -> None:
+    message = asyncio.run(build_initial_message())
+    component_count = len(message["params"]["deltaStates"])
+
+    print(f"Serializing a message containing {component_count} components")
+
+    for name in ("stdlib", "orjson", "msgspec"):
+        try:
+            backend = json_backends.get_json_backend(name)
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+
+        encoded = backend.dumps(message)
+
+        dumps_time = timeit.timeit(
+            lambda backend=backend: backend.dumps(message),
+            number=REPETITIONS,
+        )
+        loads_time = timeit.timeit(
+            lambda backend=backend, encoded=encoded: backend.loads(encoded),
+            number=REPETITIONS,
+        )
+
+        print(
+            f"{name:>8}: dumps {dumps_time / REPETITIONS * 1000:7.2f} ms"
+            f" | loads {loads_time / REPETITIONS * 1000:7.2f} ms"
+            f" | {len(encoded) / 1024:,.0f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
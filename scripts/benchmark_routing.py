@@ -0,0 +1,136 @@
+"""
+Measures how long it takes to find the active pages for a URL, in apps with
+many pages. Compares the compiled page index against trying every page's URL
+pattern one after another.
+
+Usage: `python scripts/benchmark_routing.py`
+"""
+
+import timeit
+
+import rio
+from rio import routing
+
+# Configure: How many top-level pages the app has. Each of them also has a few
+# child pages.
+PAGE_COUNTS = (10, 100, 1000)
+
+# Configure: How many child pages each top-level page has
+CHILDREN_PER_PAGE = 5
+
+# Configure: How often to resolve each URL
+REPETITIONS = 2000
+
+
+def build_page(**kwargs: object) -> rio.Component:
+    return rio.Spacer()
+
+
+def item_page(item_id: str) -> rio.Component:
+    return rio.Spacer()
+
+
+def make_pages(page_count: int) -> list[rio.ComponentPage]:
+    return [
+        rio.ComponentPage(
+            name=f"Section {index}",
+            url_segment=f"section-{index}",
+            build=build_page,
+            children=[
+                rio.ComponentPage(
+                    name=f"Subsection {child_index}",
+                    url_segment=f"subsection-{child_index}",
+                    build=build_page,
+                )
+                for child_index in range(CHILDREN_PER_PAGE - 1)
+            ]
+            + [
+                rio.ComponentPage(
+                    name="Item",
+                    url_segment="items/{item_id}",
+                    build=item_page,
+                )
+            ],
+        )
+        for index in range(page_count)
+    ]
+
+
+def linear_get_active_page_instances(
+    available_pages,
+    remaining_path: str,
+) -> list:
+    """
+    The straightforward implementation: Try all pages in order.
+    """
+    for page in available_pages:
+        did_match, path_arguments, remaining_path = page._url_pattern.match(
+            remaining_path
+        )
+
+        if did_match:
+            break
+    else:
+        return []
+
+    result = [(page, path_arguments)]
+
+    if isinstance(page, rio.ComponentPage):
+        result += linear_get_active_page_instances(
+            page.children, remaining_path
+        )
+
+    return result
+
+
+def benchmark(page_count: int) -> None:
+    pages = make_pages(page_count)
+
+    # For the linear search, the worst cases are URLs matching the last page,
+    # or no page at all
+    last = page_count - 1
+    paths = [
+        "section-0/subsection-1",
+        f"section-{page_count // 2}/items/42",
+        f"section-{last}/subsection-{CHILDREN_PER_PAGE - 2}",
+        "no-such-page",
+    ]
+
+    # Make sure both implementations agree
+    for path in paths:
+        assert routing._get_active_page_instances(
+            available_pages=pages, remaining_path=path
+        ) == linear_get_active_page_instances(pages, path)
+
+    linear_time = timeit.timeit(
+        lambda: [
+            linear_get_active_page_instances(pages, path) for path in paths
+        ],
+        number=REPETITIONS,
+    )
+    indexed_time = timeit.timeit(
+        lambda: [
+            routing._get_active_page_instances(
+                available_pages=pages, remaining_path=path
+            )
+            for path in paths
+        ],
+        number=REPETITIONS,
+    )
+
+    lookups = REPETITIONS * len(paths)
+    print(
+        f"{page_count:5} pages:"
+        f" linear {linear_time / lookups * 1e6:8.2f} µs/lookup |"
+        f" indexed {indexed_time / lookups * 1e6:8.2f} µs/lookup |"
+        f" speedup {linear_time / indexed_time:6.1f}x"
+    )
+
+
+def main() -> None:
+    for page_count in PAGE_COUNTS:
+        benchmark(page_count)
+
+
+if __name__ == "__main__":
+    main()
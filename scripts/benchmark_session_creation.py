@@ -0,0 +1,150 @@
+"""
+Simulates a connection storm, like the one happening after a deploy, when all
+clients reconnect at once. Creates many sessions concurrently and reports how
+many sessions per second the server manages to set up, as well as how long
+clients have to wait for their first `updateComponentStates` message.
+
+Usage: `python scripts/benchmark_session_creation.py`
+"""
+
+import asyncio
+import statistics
+import time
+import warnings
+
+import starlette.datastructures
+
+import rio
+from rio import data_models
+from rio.app_server import TestingServer
+from rio.transports import MessageRecorderTransport
+
+# Configure: How many clients connect at the same time
+SESSION_COUNT = 500
+
+# Configure: The concurrency limits to compare. `None` means unlimited.
+CONCURRENCY_LIMITS = (None, 8, 32, 128)
+
+# Configure: Simulated I/O in `on_session_start`, e.g. loading the user from a
+# database, in seconds
+ON_SESSION_START_DELAY = 0.02
+
+
+class BenchmarkPage(rio.Component):
+    def build(self) -> rio.Component:
+        return rio.Column(
+            rio.Text("Welcome back!", style="heading1"),
+            *[
+                rio.Row(
+                    rio.Icon("material/star", fill="primary"),
+                    rio.Text(f"Item {index}", justify="left", grow_x=True),
+                    rio.Button("Open", shape="rounded"),
+                    spacing=0.5,
+                )
+                for index in range(20)
+            ],
+            spacing=1,
+            margin=2,
+        )
+
+
+async def on_session_start(session: rio.Session) -> None:
+    await asyncio.sleep(ON_SESSION_START_DELAY)
+
+
+async def connect_client(app_server: TestingServer, start_time: float) -> float:
+    """
+    Creates a session and returns the time from `start_time` until the client
+    received its first `updateComponentStates` message.
+    """
+    first_refresh_time: float | None = None
+
+    def process_sent_message(message: dict) -> None:
+        nonlocal first_refresh_time
+
+        # Answer requests, or the session would wait for a response forever
+        if "id" in message:
+            transport.queue_response(
+                {
+                    "jsonrpc": "2.0",
+                    "id": message["id"],
+                    "result": None,
+                }
+            )
+
+        if (
+            message["method"] == "updateComponentStates"
+            and first_refresh_time is None
+        ):
+            first_refresh_time = time.perf_counter()
+
+    transport = MessageRecorderTransport(
+        process_sent_message=process_sent_message
+    )
+
+    session = await app_server.create_session(
+        initial_message=data_models.InitialClientMessage.from_defaults(
+            url="http://benchmark.test/",
+        ),
+        transport=transport,
+        client_ip="localhost",
+        client_port=12345,
+        http_headers=starlette.datastructures.Headers(),
+    )
+
+    assert first_refresh_time is not None
+    await session._close(close_remote_session=False)
+
+    return first_refresh_time - start_time
+
+
+async def run_storm(concurrency_limit: int | None) -> None:
+    app = rio.App(
+        build=BenchmarkPage,
+        on_session_start=on_session_start,
+        max_concurrent_session_creations=concurrency_limit,
+    )
+    app_server = TestingServer(
+        app,
+        debug_mode=False,
+        running_in_window=False,
+    )
+
+    # Warm up, so one-time costs don't skew the results
+    await connect_client(app_server, time.perf_counter())
+
+    # All clients connect at the same time, so their latencies include the time
+    # spent waiting for other sessions
+    start_time = time.perf_counter()
+    latencies = await asyncio.gather(
+        *[connect_client(app_server, start_time) for _ in range(SESSION_COUNT)]
+    )
+    duration = time.perf_counter() - start_time
+
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+
+    limit = "unlimited" if concurrency_limit is None else concurrency_limit
+
+    print(
+        f"Limit {limit:>9}: {SESSION_COUNT / duration:7.1f} sessions/s"
+        f" | p50 {p50 * 1000:8.1f} ms"
+        f" | p99 {p99 * 1000:8.1f} ms"
+        f" | max {latencies[-1] * 1000:8.1f} ms"
+    )
+
+
+async def main() -> None:
+    # Under load, `on_session_start` takes longer than Rio considers reasonable.
+    # That's expected here, so don't spam the console.
+    warnings.simplefilter("ignore", UserWarning)
+
+    print(f"Creating {SESSION_COUNT} sessions at once")
+
+    for concurrency_limit in CONCURRENCY_LIMITS:
+        await run_storm(concurrency_limit)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,14 +1,13 @@
 """
 This file reads all materials icons/symbols from their github repository and
-packs them into a `.tar.xz` archive that can be used by rio as icon set.
+packs them into an icon pack that can be used by rio as icon set. See
+`rio/icon_pack.py` for details on the format.
 
 The repository is expected to be available locally already - this script does
 not clone it.
 """
 
 import re
-import tarfile
-import tempfile
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
@@ -16,6 +15,7 @@ import revel
 from revel import *  # type: ignore
 
 import rio
+import rio.icon_pack
 
 # Configure: The name the resulting icon set will have
 SET_NAME = "material"
@@ -37,9 +37,14 @@ INPUT_DIR = (
 INPUT_NAME_PATTERN = r"(.+).svg"
 
 # Configure: The output file will be written into this directory as
-# <SET_NAME>.tar.xz
+# <SET_NAME>.rioicons
 OUTPUT_DIR = rio.utils.RIO_ASSETS_DIR / "icon_sets"
 
+# Configure: Whether to compress each icon in the pack. Compressed packs are
+# less than half the size, but icons have to be decompressed when they're first
+# used.
+COMPRESS = True
+
 # For debugging: Stop after processing this many icons. Set to `None` for no
 # limit
 LIMIT = None
@@ -97,72 +102,61 @@ def main() -> None:
 
     # Process all files
     print_chapter("Processing files")
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp_dir = Path(tmp_dir)
-
-        with revel.ProgressBar(max=len(in_files), unit="count") as bar:
-            for ii, file_path in enumerate(in_files):
-                bar.progress = ii
+    icons: list[tuple[str, str | None, str]] = []
 
-                # Extract the name and variant of the icon. If this function returns
-                # `None` the file is skipped.
-                parsed = name_from_icon_path(file_path.relative_to(INPUT_DIR))
+    # Suppress weird "ns0:" prefixes everywhere
+    ET.register_namespace("", "http://www.w3.org/2000/svg")
 
-                if parsed is None:
-                    print(f"{file_path.name} -> [bold]skipped[/bold]")
-                    continue
-
-                icon_name, icon_variant = parsed
-                variant_suffix = (
-                    "" if icon_variant is None else f"/{icon_variant}"
-                )
+    with revel.ProgressBar(max=len(in_files), unit="count") as bar:
+        for ii, file_path in enumerate(in_files):
+            bar.progress = ii
 
-                print(f"{file_path.name} -> {icon_name}{variant_suffix}")
+            # Extract the name and variant of the icon. If this function returns
+            # `None` the file is skipped.
+            parsed = name_from_icon_path(file_path.relative_to(INPUT_DIR))
 
-                # Parse the SVG
-                svg_str = file_path.read_text()
-                tree = ET.fromstring(svg_str)
+            if parsed is None:
+                print(f"{file_path.name} -> [bold]skipped[/bold]")
+                continue
 
-                # Strip the width / height if any
-                if "width" in tree.attrib:
-                    del tree.attrib["width"]
+            icon_name, icon_variant = parsed
+            variant_suffix = "" if icon_variant is None else f"/{icon_variant}"
 
-                if "height" in tree.attrib:
-                    del tree.attrib["height"]
+            print(f"{file_path.name} -> {icon_name}{variant_suffix}")
 
-                # Determine the output path for this icon
-                icon_out_path = tmp_dir
+            # Parse the SVG
+            svg_str = file_path.read_text()
+            tree = ET.fromstring(svg_str)
 
-                if icon_variant is not None:
-                    icon_out_path /= icon_variant
+            # Strip the width / height if any
+            if "width" in tree.attrib:
+                del tree.attrib["width"]
 
-                icon_out_path /= f"{icon_name}.svg"
+            if "height" in tree.attrib:
+                del tree.attrib["height"]
 
-                # Suppress weird "ns0:" prefixes everywhere
-                ET.register_namespace("", "http://www.w3.org/2000/svg")
-
-                # Write the SVG
-                icon_out_path.parent.mkdir(parents=True, exist_ok=True)
-
-                with open(icon_out_path, "w") as f:
-                    f.write(
-                        ET.tostring(
-                            tree,
-                            encoding="unicode",
-                            default_namespace=None,
-                        )
-                    )
+            icons.append(
+                (
+                    icon_name,
+                    icon_variant,
+                    ET.tostring(
+                        tree,
+                        encoding="unicode",
+                        default_namespace=None,
+                    ),
+                )
+            )
 
-        # Compress the temporary directory
-        print_chapter("Compressing files")
-        archive_path = OUTPUT_DIR / f"{SET_NAME}.tar.xz"
+    # Write the icon pack
+    print_chapter("Writing icon pack")
+    pack_path = OUTPUT_DIR / f"{SET_NAME}.rioicons"
 
-        with tarfile.open(archive_path, "w:xz") as out_file:
-            out_file.add(tmp_dir, arcname="")
+    with pack_path.open("wb") as out_file:
+        rio.icon_pack.write_icon_pack(out_file, icons, compress=COMPRESS)
 
     print_chapter(None)
     print(
-        f"[bold]Done![/] You can find the result at [bold]{OUTPUT_DIR.resolve()}/{SET_NAME}.tar.xz[/]"
+        f"[bold]Done![/] You can find the result at [bold]{pack_path.resolve()}[/]"
     )
 
 
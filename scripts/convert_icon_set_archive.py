@@ -0,0 +1,55 @@
+"""
+Converts an icon set from a `.tar.xz` archive into an icon pack. Icon packs can
+be used without extracting them first, so they're faster to load and don't
+need a writable cache directory. See `rio/icon_pack.py` for details on the
+format.
+
+The pack is written next to the archive, with a `.rioicons` suffix.
+
+Usage: `python scripts/convert_icon_set_archive.py path/to/set.tar.xz`
+
+The archive must contain a single directory, which is named after the icon set.
+"""
+
+import sys
+from pathlib import Path
+
+import rio.icon_pack
+
+# Configure: Whether to compress each icon in the pack
+COMPRESS = True
+
+
+def convert(archive_path: Path) -> Path:
+    set_name = archive_path.name.removesuffix(".tar.xz")
+    pack_path = archive_path.with_name(f"{set_name}.rioicons")
+
+    archive = rio.icon_pack.IconPack.from_tar_archive(archive_path, set_name)
+
+    # Sort the icons, so the output doesn't depend on the archive's order
+    icons = []
+    for icon_name, variant in sorted(
+        archive.icons(), key=lambda icon: (icon[1] or "", icon[0])
+    ):
+        svg = archive.get_svg(icon_name, variant)
+        assert svg is not None
+        icons.append((icon_name, variant, svg))
+
+    with pack_path.open("wb") as file:
+        rio.icon_pack.write_icon_pack(file, icons, compress=COMPRESS)
+
+    print(f"{archive_path} -> {pack_path} ({len(icons)} icons)")
+    return pack_path
+
+
+def main() -> None:
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        convert(Path(path))
+
+
+if __name__ == "__main__":
+    main()
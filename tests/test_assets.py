@@ -0,0 +1,101 @@
+import gc
+import sys
+
+import pytest
+
+from rio import assets
+
+
+def make_large_data(fill: int) -> bytes:
+    return bytes([fill]) * (assets.FULL_HASH_THRESHOLD * 4)
+
+
+def test_small_data_is_hashed_in_full() -> None:
+    asset_1 = assets.BytesAsset(b"Hello, world!")
+    asset_2 = assets.BytesAsset(bytearray(b"Hello, world!"))
+
+    assert asset_1.secret_id.startswith("b-")
+    assert asset_1.secret_id == asset_2.secret_id
+
+
+def test_large_data_is_fingerprinted() -> None:
+    data = make_large_data(1)
+
+    asset_1 = assets.BytesAsset(data)
+    asset_2 = assets.BytesAsset(bytes(data))
+
+    assert asset_1.secret_id.startswith("s-")
+    assert asset_1.secret_id == asset_2.secret_id
+
+
+def test_fingerprint_collisions_fall_back_to_full_hash() -> None:
+    data_1 = make_large_data(2)
+
+    # Change a single byte which is not part of any sample
+    data_2 = bytearray(data_1)
+    data_2[assets.FINGERPRINT_SAMPLE_SIZE + 1] = 0
+    data_2 = bytes(data_2)
+
+    assert assets._fingerprint_bytes(data_1) == assets._fingerprint_bytes(
+        data_2
+    )
+
+    asset_1 = assets.BytesAsset(data_1)
+    asset_2 = assets.BytesAsset(data_2)
+
+    assert asset_1.secret_id.startswith("s-")
+    assert asset_2.secret_id.startswith("b-")
+
+
+def test_fingerprints_of_collected_assets_are_not_reused() -> None:
+    data = make_large_data(3)
+
+    asset = assets.BytesAsset(bytearray(data))
+    secret_id = asset.secret_id
+    del asset
+    gc.collect()
+
+    # The content can't be compared to the original anymore, so there is no
+    # way to tell whether it's the same
+    assert assets.BytesAsset(bytearray(data)).secret_id != secret_id
+
+
+def test_fingerprints_are_released_with_their_assets() -> None:
+    data = bytearray(make_large_data(5))
+    fingerprint = assets._fingerprint_bytes(data)
+
+    asset = assets.BytesAsset(data)
+    assert asset.secret_id.startswith("s-")
+    assert fingerprint in assets._FINGERPRINT_OWNERS
+
+    del asset
+    gc.collect()
+
+    assert fingerprint not in assets._FINGERPRINT_OWNERS
+
+
+def test_ids_of_known_bytes_objects_are_cached(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    data = make_large_data(4)
+    asset = assets.BytesAsset(data)
+    secret_id = asset.secret_id
+
+    # Processing the data again would raise an exception
+    monkeypatch.setattr(assets, "_fingerprint_bytes", None)
+
+    assert assets.BytesAsset(data).secret_id == secret_id
+
+
+def test_cached_ids_dont_keep_data_alive() -> None:
+    data = make_large_data(6)
+    reference_count = sys.getrefcount(data)
+
+    asset = assets.BytesAsset(data)
+    assert asset.secret_id.startswith("s-")
+
+    del asset
+    gc.collect()
+
+    assert sys.getrefcount(data) == reference_count
+    assert id(data) not in assets._ASSETS_BY_DATA_ID
@@ -0,0 +1,197 @@
+import gzip
+from pathlib import Path
+
+import fastapi
+import pytest
+import starlette.requests
+
+from rio import byte_serving
+
+
+def make_request(**headers: str) -> fastapi.Request:
+    return starlette.requests.Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "query_string": b"",
+            "headers": [
+                (name.replace("_", "-").encode(), value.encode())
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+async def read_body(response: fastapi.Response) -> bytes:
+    assert isinstance(response, fastapi.responses.StreamingResponse)
+
+    chunks = [chunk async for chunk in response.body_iterator]
+    return b"".join(chunks)  # type: ignore
+
+
+async def test_validators_and_conditional_requests(tmp_path: Path) -> None:
+    file_path = tmp_path / "hello.txt"
+    file_path.write_bytes(b"Hello, world!")
+
+    response = byte_serving.range_requests_response(make_request(), file_path)
+
+    assert response.status_code == 200
+    assert await read_body(response) == b"Hello, world!"
+
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    # The client's copy is up to date
+    response = byte_serving.range_requests_response(
+        make_request(if_none_match=etag), file_path
+    )
+    assert response.status_code == 304
+
+    response = byte_serving.range_requests_response(
+        make_request(if_modified_since=last_modified), file_path
+    )
+    assert response.status_code == 304
+
+    # The client's copy is outdated
+    response = byte_serving.range_requests_response(
+        make_request(if_none_match='W/"outdated"'), file_path
+    )
+    assert response.status_code == 200
+
+
+async def test_precompressed_variants(tmp_path: Path) -> None:
+    file_path = tmp_path / "script.js"
+    file_path.write_bytes(b"console.log('Hello, world!');")
+
+    compressed = gzip.compress(file_path.read_bytes())
+    (tmp_path / "script.js.gz").write_bytes(compressed)
+
+    # Clients which accept gzip get the compressed variant
+    response = byte_serving.range_requests_response(
+        make_request(accept_encoding="gzip, deflate"), file_path
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert await read_body(response) == compressed
+
+    # Others get the original file
+    response = byte_serving.range_requests_response(
+        make_request(accept_encoding="gzip;q=0"), file_path
+    )
+    assert response.headers["content-encoding"] == "identity"
+
+    # Range requests refer to the original file
+    response = byte_serving.range_requests_response(
+        make_request(accept_encoding="gzip", range="bytes=0-6"), file_path
+    )
+    assert response.status_code == 206
+    assert response.headers["content-encoding"] == "identity"
+    assert await read_body(response) == b"console"
+
+
+async def test_compressed_only_files_are_always_served(tmp_path: Path) -> None:
+    compressed = gzip.compress(b"body {}")
+    (tmp_path / "style.css.gz").write_bytes(compressed)
+
+    response = byte_serving.range_requests_response(
+        make_request(), tmp_path / "style.css"
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/css")
+    assert await read_body(response) == compressed
+
+
+def test_parse_range_header() -> None:
+    assert byte_serving.parse_range_header("bytes=0-4", 10) == [(0, 4)]
+    assert byte_serving.parse_range_header("bytes=5-", 10) == [(5, 9)]
+
+    # Suffix ranges and ranges exceeding the file size
+    assert byte_serving.parse_range_header("bytes=-3", 10) == [(7, 9)]
+    assert byte_serving.parse_range_header("bytes=8-100", 10) == [(8, 9)]
+
+    # Multiple ranges
+    assert byte_serving.parse_range_header("bytes=0-1, 4-5, -1", 10) == [
+        (0, 1),
+        (4, 5),
+        (9, 9),
+    ]
+
+    for invalid in ("bytes=20-30", "bytes=5-2", "bytes=a-b", "items=0-1"):
+        with pytest.raises(fastapi.HTTPException) as exc_info:
+            byte_serving.parse_range_header(invalid, 10)
+
+        assert exc_info.value.status_code == 416
+
+
+async def test_multiple_ranges(tmp_path: Path) -> None:
+    file_path = tmp_path / "numbers.txt"
+    file_path.write_bytes(b"0123456789")
+
+    response = byte_serving.range_requests_response(
+        make_request(range="bytes=0-1, -2"), file_path
+    )
+
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.partition("boundary=")[2]
+
+    body = await read_body(response)
+    assert len(body) == int(response.headers["content-length"])
+    assert (
+        body
+        == (
+            f"--{boundary}\r\n"
+            "content-type: text/plain\r\n"
+            "content-range: bytes 0-1/10\r\n"
+            "\r\n"
+            "01\r\n"
+            f"--{boundary}\r\n"
+            "content-type: text/plain\r\n"
+            "content-range: bytes 8-9/10\r\n"
+            "\r\n"
+            "89\r\n"
+            f"--{boundary}--\r\n"
+        ).encode()
+    )
+
+
+async def test_large_files_are_streamed_in_chunks(tmp_path: Path) -> None:
+    file_path = tmp_path / "large.bin"
+    file_path.write_bytes(bytes(range(256)) * 4096)
+
+    response = byte_serving.range_requests_response(make_request(), file_path)
+    assert isinstance(response, fastapi.responses.StreamingResponse)
+
+    chunks = [chunk async for chunk in response.body_iterator]
+    assert len(chunks) > 1
+    assert all(len(chunk) <= byte_serving.CHUNK_SIZE for chunk in chunks)
+    assert b"".join(chunks) == file_path.read_bytes()  # type: ignore
+
+
+async def test_entire_files_use_pathsend_if_supported(tmp_path: Path) -> None:
+    file_path = tmp_path / "hello.txt"
+    file_path.write_bytes(b"Hello, world!")
+
+    response = byte_serving.range_requests_response(make_request(), file_path)
+    messages = []
+
+    async def send(message) -> None:
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "extensions": {"http.response.pathsend": {}},
+    }
+    await response(scope, receive, send)
+
+    assert [message["type"] for message in messages] == [
+        "http.response.start",
+        "http.response.pathsend",
+    ]
+    assert messages[1]["path"] == str(file_path)
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from rio.caching import TtlLruCache
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = TtlLruCache[str, int](max_size=2)
+
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Access `a`, so `b` becomes the least recently used entry
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire() -> None:
+    cache = TtlLruCache[str, int](max_size=2, time_to_live=timedelta(0))
+
+    cache.put("a", 1)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
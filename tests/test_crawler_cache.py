@@ -0,0 +1,100 @@
+import starlette.requests
+
+import rio
+
+CRAWLER_USER_AGENT = "Googlebot/2.1 (+http://www.google.com/bot.html)"
+
+
+def make_crawler_request(
+    path: str,
+    extra_headers: tuple[tuple[bytes, bytes], ...] = (),
+) -> starlette.requests.Request:
+    return starlette.requests.Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "scheme": "http",
+            "server": ("example.com", 80),
+            "client": ("127.0.0.1", 12345),
+            "root_path": "",
+            "path": path,
+            "query_string": b"",
+            "headers": [
+                (b"host", b"example.com"),
+                (b"user-agent", CRAWLER_USER_AGENT.encode()),
+                *extra_headers,
+            ],
+        }
+    )
+
+
+def make_app(**kwargs) -> tuple[rio.App, list[str]]:
+    built_pages: list[str] = []
+
+    class Root(rio.Component):
+        def build(self) -> rio.Component:
+            built_pages.append(str(self.session.active_page_url))
+            return rio.Text("Hello, crawler!")
+
+    app = rio.App(build=Root, **kwargs)
+    return app, built_pages
+
+
+def make_server(app: rio.App):
+    return app._as_fastapi(
+        debug_mode=False,
+        running_in_window=False,
+        internal_on_app_start=None,
+        base_url=None,
+    )
+
+
+async def test_crawler_pages_are_cached() -> None:
+    app, built_pages = make_app(crawler_cache_duration=60)
+    server = make_server(app)
+
+    first = await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+    second = await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+
+    assert first is second
+    assert first.redirect_url is None
+    assert first.initial_messages
+    assert len(built_pages) == 1
+
+    # Different pages are rendered separately
+    await server._get_crawler_render(make_crawler_request("/other"))  # type: ignore
+    assert len(built_pages) == 2
+
+    # Invalidating the cache causes the page to be rendered again
+    app.clear_crawler_cache("http://example.com/")
+    await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+    assert len(built_pages) == 3
+
+
+async def test_crawler_cache_is_disabled_by_default() -> None:
+    app, built_pages = make_app()
+    server = make_server(app)
+
+    await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+    await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+
+    assert len(built_pages) == 2
+
+
+async def test_requests_with_credentials_are_not_cached() -> None:
+    app, built_pages = make_app(crawler_cache_duration=60)
+    server = make_server(app)
+
+    # Anybody can claim to be a crawler. Pages which may depend on who is
+    # requesting them must never be served to somebody else.
+    for headers in (
+        ((b"cookie", b"session=secret"),),
+        ((b"authorization", b"Bearer secret"),),
+    ):
+        request = make_crawler_request("/", headers)
+        await server._get_crawler_render(request)  # type: ignore
+
+    assert len(built_pages) == 2
+
+    await server._get_crawler_render(make_crawler_request("/"))  # type: ignore
+    assert len(built_pages) == 3
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+import rio.testing
+from rio import handler_thread_pool
+
+
+class BlockingComponent(rio.Component):
+    text: str = "Hello"
+
+    @rio.event.run_in_thread
+    def on_press(self) -> None:
+        assert threading.current_thread() is not threading.main_thread()
+        self.text = "World"
+
+    def build(self) -> rio.Component:
+        return rio.Text(self.text)
+
+
+async def test_handler_runs_in_thread() -> None:
+    async with rio.testing.TestClient(BlockingComponent) as test_client:
+        component = test_client.get_component(BlockingComponent)
+
+        await test_client.session._call_event_handler(
+            component.on_press, refresh=True
+        )
+
+        assert component.text == "World"
+        assert test_client.get_component(rio.Text).text == "World"
+
+
+async def test_handlers_in_threads_dont_block_the_event_loop() -> None:
+    # Both handlers must be running at the same time to pass the barrier. That
+    # is only possible if the event loop isn't blocked by either of them.
+    barrier = threading.Barrier(2, timeout=5)
+    finished = asyncio.Event()
+
+    @rio.event.run_in_thread
+    def handler() -> None:
+        barrier.wait()
+
+    async def async_handler() -> None:
+        finished.set()
+
+    async with rio.testing.TestClient(lambda: rio.Text("Hello")) as test_client:
+        await asyncio.gather(
+            test_client.session._call_event_handler(handler, refresh=False),
+            test_client.session._call_event_handler(handler, refresh=False),
+            test_client.session._call_event_handler(
+                async_handler, refresh=False
+            ),
+        )
+
+        assert finished.is_set()
+        stats = test_client._app_server.handler_thread_pool.stats()
+        assert stats.completed == 2
+
+
+async def test_other_handlers_run_on_the_event_loop() -> None:
+    threads: list[threading.Thread] = []
+
+    def handler() -> None:
+        threads.append(threading.current_thread())
+
+    async with rio.testing.TestClient(lambda: rio.Text("Hello")) as test_client:
+        await test_client.session._call_event_handler(handler, refresh=False)
+
+        assert threads == [threading.main_thread()]
+        stats = test_client._app_server.handler_thread_pool.stats()
+        assert stats.completed == 0
+
+
+async def test_pool_stats() -> None:
+    pool = handler_thread_pool.HandlerThreadPool(max_workers=1)
+    release = threading.Event()
+
+    first_job = asyncio.create_task(pool.run(release.wait))
+    second_job = asyncio.create_task(pool.run(release.wait))
+    third_job = asyncio.create_task(pool.run(release.wait))
+
+    while pool.stats().running == 0:
+        await asyncio.sleep(0.01)
+
+    stats = pool.stats()
+    assert stats.saturated
+    assert stats.running == 1
+    assert stats.queued == 2
+
+    # Jobs which haven't started yet can be cancelled
+    third_job.cancel()
+    await asyncio.wait([third_job])
+    assert pool.stats().queued == 1
+
+    release.set()
+    assert await first_job
+    assert await second_job
+
+    stats = pool.stats()
+    assert not stats.saturated
+    assert stats.queued == 0
+    assert stats.completed == 2
+
+    pool.shutdown()
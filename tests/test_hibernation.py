@@ -0,0 +1,152 @@
+import asyncio
+import gc
+import weakref
+from datetime import timedelta
+
+import rio.testing
+
+
+class MountTracker(rio.Component):
+    events: list[str]
+
+    @rio.event.on_mount
+    def _on_mount(self) -> None:
+        self.events.append("mount")
+
+    @rio.event.on_unmount
+    def _on_unmount(self) -> None:
+        self.events.append("unmount")
+
+    def build(self) -> rio.Component:
+        return rio.Text("Hello")
+
+
+async def test_hibernation_releases_and_rebuilds_components() -> None:
+    events: list[str] = []
+
+    async with rio.testing.TestClient(
+        lambda: MountTracker(events)
+    ) as test_client:
+        session = test_client.session
+        session.attach(events)
+
+        usage_before = session._get_memory_usage()
+        assert usage_before.is_connected
+        assert not usage_before.is_hibernating
+
+        weak_text = weakref.ref(test_client.get_component(rio.Text))
+
+        await test_client._simulate_interrupted_connection()
+        session._hibernate()
+        gc.collect()
+
+        # The components are gone, but the session itself is untouched
+        assert weak_text() is None
+        assert session[list] is events
+        assert events == ["mount", "unmount"]
+
+        usage = session._get_memory_usage()
+        assert usage.is_hibernating
+        assert not usage.is_connected
+        assert usage.component_count < usage_before.component_count
+        assert usage.estimated_bytes < usage_before.estimated_bytes
+
+        # Refreshing a hibernating session doesn't build anything
+        await session._refresh()
+        assert session._high_level_root_component._build_data_ is None
+
+        # Once the client reconnects, everything is built anew and sent
+        await test_client._simulate_reconnect()
+        await session._send_all_components_on_reconnect()
+
+        assert not session._is_hibernating
+        assert test_client.get_component(rio.Text).text == "Hello"
+        assert events == ["mount", "unmount", "mount"]
+
+        # The client receives the new root and all of its children, in a single
+        # message. (Icons are sent separately.)
+        [message] = [
+            message
+            for message in test_client._outgoing_messages
+            if message["method"] == "updateComponentStates"
+        ]
+        assert message["params"]["rootComponentId"] is not None
+        assert test_client._last_updated_components.issuperset(
+            session._get_user_root_component()._iter_component_tree_()
+        )
+
+
+async def test_revived_session_keeps_the_clients_root() -> None:
+    async with rio.testing.TestClient(lambda: rio.Text("Hello")) as test_client:
+        session = test_client.session
+        messages = list(test_client._outgoing_messages)
+
+        await test_client._simulate_interrupted_connection()
+        session._hibernate()
+        gc.collect()
+
+        await test_client._simulate_reconnect()
+        await session._send_all_components_on_reconnect()
+        messages += test_client._outgoing_messages
+
+        # Replay the messages like the client does. It creates every component
+        # whose id it doesn't know yet, and adds each new root to the page.
+        client_states: dict[int, dict[str, object]] = {}
+        roots_on_page: list[int] = []
+
+        for message in messages:
+            if message["method"] != "updateComponentStates":
+                continue
+
+            delta_states: dict = message["params"]["deltaStates"]  # type: ignore
+
+            for component_id, delta_state in delta_states.items():
+                component_id = int(component_id)
+
+                if (
+                    component_id not in client_states
+                    and delta_state["_type_"]
+                    == "FundamentalRootComponent-builtin"
+                ):
+                    roots_on_page.append(component_id)
+
+                client_states.setdefault(component_id, {}).update(delta_state)
+
+            root_component_id = message["params"]["rootComponentId"]
+            if root_component_id is not None:
+                assert root_component_id == roots_on_page[0]
+
+        # The revived session must update the existing root, rather than
+        # adding a second one to the page
+        [root_id] = roots_on_page
+        user_root = session._get_user_root_component()
+        assert client_states[root_id]["content"] == user_root._id
+        assert client_states[user_root._id]["text"] == "Hello"
+
+
+async def test_disconnected_sessions_are_cleaned_up() -> None:
+    app = rio.App(
+        build=lambda: rio.Text("Hello"),
+        hibernate_disconnected_sessions_after=0,
+    )
+
+    async with rio.testing.TestClient(app) as test_client:
+        session = test_client.session
+        app_server = test_client._app_server
+
+        # Connected sessions are left alone
+        app_server._clean_up_disconnected_sessions()
+        assert not session._is_hibernating
+
+        await test_client._simulate_interrupted_connection()
+        app_server._clean_up_disconnected_sessions()
+        assert session._is_hibernating
+        assert not session._was_closed
+
+        # Once their lifetime is over, sessions are closed
+        app._disconnected_session_lifetime = timedelta(0)
+        app_server._clean_up_disconnected_sessions()
+        await asyncio.sleep(0.1)
+
+        assert session._was_closed
+        assert session not in app_server.get_session_memory_usage()
@@ -0,0 +1,90 @@
+import io
+import tarfile
+from pathlib import Path
+
+import pytest
+
+import rio
+from rio import icon_pack, icon_registry
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 1 1"></svg>'
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_icon_pack_roundtrip(compress: bool) -> None:
+    icons = [
+        ("star", None, SVG),
+        ("star", "fill", SVG.replace("0 0 1 1", "0 0 2 2")),
+        ("héllo", None, SVG),
+    ]
+
+    buffer = io.BytesIO()
+    icon_pack.write_icon_pack(buffer, icons, compress=compress)
+    pack = icon_pack.IconPack(buffer.getvalue(), name="test")
+
+    for icon_name, variant, svg in icons:
+        assert pack.get_svg(icon_name, variant) == svg
+
+    assert pack.get_svg("star", "outline") is None
+    assert list(pack.icons()) == [
+        ("star", None),
+        ("star", "fill"),
+        ("héllo", None),
+    ]
+    assert list(pack.variants()) == [None, "fill"]
+
+
+def test_invalid_icon_packs_are_rejected(tmp_path: Path) -> None:
+    path = tmp_path / "empty.rioicons"
+    path.write_bytes(b"")
+
+    with pytest.raises(rio.AssetError):
+        icon_pack.IconPack.open(path)
+
+    with pytest.raises(rio.AssetError):
+        icon_pack.IconPack(b"RIOICONX" + bytes(8), name="test")
+
+
+def test_bundled_icons() -> None:
+    assert icon_registry.get_icon_svg("material/castle").startswith("<svg")
+    assert icon_registry.get_icon_svg("castle:fill").startswith("<svg")
+
+    with pytest.raises(rio.AssetError):
+        icon_registry.get_icon_svg("material/no_such_icon")
+
+    with pytest.raises(rio.AssetError):
+        icon_registry.get_icon_svg("no_such_set/castle")
+
+    assert set(icon_registry.all_variants_in_set("rio")) == {
+        None,
+        "color",
+        "fill",
+    }
+    assert ("logo", "color") in icon_registry.all_icons_in_set(
+        "rio", variant="color"
+    )
+
+
+def test_legacy_tar_archives_are_supported(tmp_path: Path) -> None:
+    archive_path = tmp_path / "legacy_test_set.tar.xz"
+
+    with tarfile.open(archive_path, "w:xz") as tar_file:
+        for member_name in (
+            "legacy_test_set/dot.svg",
+            "legacy_test_set/fill/dot.svg",
+        ):
+            svg_bytes = SVG.encode("utf-8")
+            info = tarfile.TarInfo(member_name)
+            info.size = len(svg_bytes)
+            tar_file.addfile(info, io.BytesIO(svg_bytes))
+
+    icon_registry.register_icon_set("legacy_test_set", archive_path)
+
+    try:
+        assert icon_registry.get_icon_svg("legacy_test_set/dot") == SVG
+        assert icon_registry.get_icon_svg("legacy_test_set/dot:fill") == SVG
+        assert sorted(
+            icon_registry.all_icons_in_set("legacy_test_set"), key=str
+        ) == [("dot", "fill"), ("dot", None)]
+    finally:
+        del icon_registry.icon_set_archives["legacy_test_set"]
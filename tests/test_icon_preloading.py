@@ -0,0 +1,41 @@
+import rio.testing
+
+
+class IconList(rio.Component):
+    icons: list[str]
+
+    def build(self) -> rio.Component:
+        return rio.Column(*[rio.Icon(icon) for icon in self.icons])
+
+
+def sent_icons(test_client: rio.testing.TestClient) -> list[str]:
+    return [
+        icon_name
+        for message in test_client._outgoing_messages
+        if message["method"] == "registerIcons"
+        for icon_name in message["params"]["icons"]
+    ]
+
+
+async def test_icons_are_sent_once_before_they_are_needed() -> None:
+    async with rio.testing.TestClient(
+        lambda: IconList(["material/castle", "material/castle", "rio/logo"])
+    ) as test_client:
+        # The icons are sent before the components using them
+        methods = [msg["method"] for msg in test_client._outgoing_messages]
+        assert methods.index("registerIcons") < methods.index(
+            "updateComponentStates"
+        )
+
+        # Rio's own components may use icons as well
+        icons = sent_icons(test_client)
+        assert icons.count("material/castle") == 1
+        assert "rio/logo" in icons
+
+        # Icons the client already knows aren't sent again
+        test_client._outgoing_messages.clear()
+        component = test_client.get_component(IconList)
+        component.icons = ["material/castle", "material/star:fill"]
+        await test_client.refresh()
+
+        assert sent_icons(test_client) == ["material/star:fill"]
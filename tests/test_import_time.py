@@ -0,0 +1,57 @@
+import subprocess
+import sys
+
+# Modules which take a long time to import, and must only be loaded once
+# they're actually needed
+HEAVY_MODULES = (
+    "fastapi",
+    "uvicorn",
+    "langcodes",
+    "matplotlib",
+    "pandas",
+    "plotly",
+    "polars",
+)
+
+# Generous upper bound for the time `import rio` may take, in seconds. This
+# only exists to catch severe regressions, not to benchmark anything.
+MAX_IMPORT_TIME = 3
+
+
+def measure_import_time(module_name: str) -> dict[str, float]:
+    """
+    Imports the given module in a fresh interpreter and returns the cumulative
+    import time of every module that was loaded, in seconds.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    result: dict[str, float] = {}
+
+    # Each line looks like `import time: self [us] | cumulative | name`
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+
+        _, cumulative, name = line.split("|")
+
+        try:
+            result[name.strip()] = int(cumulative) / 1_000_000
+        except ValueError:
+            # Header line
+            continue
+
+    return result
+
+
+def test_heavy_modules_are_imported_lazily() -> None:
+    import_times = measure_import_time("rio")
+
+    for module_name in HEAVY_MODULES:
+        assert module_name not in import_times, module_name
+
+    assert import_times["rio"] < MAX_IMPORT_TIME
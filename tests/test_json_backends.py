@@ -0,0 +1,90 @@
+import json
+
+import pytest
+
+import rio.json_backends
+import rio.maybes
+
+
+def _available_backends() -> list[rio.json_backends.JsonBackend]:
+    result: list[rio.json_backends.JsonBackend] = []
+
+    for name in ("stdlib", "orjson", "msgspec"):
+        try:
+            result.append(rio.json_backends.get_json_backend(name))
+        except ImportError:
+            pass
+
+    return result
+
+
+@pytest.mark.parametrize("backend", _available_backends(), ids=repr)
+def test_round_trip(backend: rio.json_backends.JsonBackend) -> None:
+    message = {
+        "jsonrpc": "2.0",
+        "method": "updateComponentStates",
+        "params": {
+            "deltaStates": {
+                3: {"text": "Hellö", "_margin_": (0, 0, 1.5, 0)},
+                7: {"children": [1, 2, 3], "is_on": True, "key": None},
+            },
+            "rootComponentId": None,
+        },
+    }
+
+    # All backends must produce JSON that is equivalent to the stdlib's
+    encoded = backend.dumps(message)
+    assert isinstance(encoded, str)
+    assert json.loads(encoded) == json.loads(json.dumps(message))
+
+    assert backend.loads(encoded) == json.loads(encoded)
+
+
+@pytest.mark.parametrize("backend", _available_backends(), ids=repr)
+def test_numpy_values(backend: rio.json_backends.JsonBackend) -> None:
+    numpy = pytest.importorskip("numpy")
+    rio.maybes.initialize(force=True)
+
+    encoded = backend.dumps(
+        {
+            "float": numpy.float32(1.5),
+            "int": numpy.int64(3),
+            "bool": numpy.bool_(True),
+            "array": numpy.array([1, 2, 3]),
+        }
+    )
+
+    assert json.loads(encoded) == {
+        "float": 1.5,
+        "int": 3,
+        "bool": True,
+        "array": [1, 2, 3],
+    }
+
+
+@pytest.mark.parametrize("backend", _available_backends(), ids=repr)
+@pytest.mark.parametrize(
+    "message",
+    [
+        {"a": 2**70},
+        {"a": -(2**70)},
+        {1.5: "float key", None: "null key", True: "bool key"},
+        {"nested": [{"a": 2**70}, {2.5: "b"}]},
+    ],
+)
+def test_values_only_the_stdlib_supports(
+    backend: rio.json_backends.JsonBackend,
+    message: dict,
+) -> None:
+    encoded = backend.dumps(message)
+    assert json.loads(encoded) == json.loads(json.dumps(message))
+
+
+def test_auto_picks_a_backend() -> None:
+    backend = rio.json_backends.get_json_backend("auto")
+    assert isinstance(backend, rio.json_backends.JsonBackend)
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        rio.json_backends.get_json_backend("yaml")  # type: ignore
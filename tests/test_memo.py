@@ -0,0 +1,86 @@
+import rio.testing
+
+
+async def test_memo_skips_build_if_state_is_unchanged() -> None:
+    build_count = 0
+
+    @rio.memo
+    class MemoComponent(rio.Component):
+        text: str
+
+        def build(self) -> rio.Component:
+            nonlocal build_count
+            build_count += 1
+            return rio.Text(self.text)
+
+    async with rio.testing.TestClient(
+        lambda: MemoComponent("Hello")
+    ) as test_client:
+        component = test_client.get_component(MemoComponent)
+        assert build_count == 1
+
+        # Assigning an equal value doesn't trigger a rebuild
+        component.text = "Hello"
+        await test_client.refresh()
+        assert build_count == 1
+
+        # Actual changes do
+        component.text = "World"
+        await test_client.refresh()
+        assert build_count == 2
+        assert test_client.get_component(rio.Text).text == "World"
+
+
+async def test_memo_detects_in_place_modifications() -> None:
+    build_count = 0
+
+    @rio.memo
+    class MemoComponent(rio.Component):
+        items: list[str]
+
+        def build(self) -> rio.Component:
+            nonlocal build_count
+            build_count += 1
+            return rio.Column(*[rio.Text(item) for item in self.items])
+
+    async with rio.testing.TestClient(
+        lambda: MemoComponent(["a"])
+    ) as test_client:
+        component = test_client.get_component(MemoComponent)
+
+        component.items.append("b")
+        component.items = component.items
+        await test_client.refresh()
+
+        assert build_count == 2
+        assert len(list(test_client.get_components(rio.Text))) == 2
+
+
+async def test_memo_is_inherited_and_can_be_forced() -> None:
+    build_count = 0
+
+    @rio.memo
+    class MemoComponent(rio.Component):
+        def build(self) -> rio.Component:
+            nonlocal build_count
+            build_count += 1
+            return rio.Spacer()
+
+    class ChildComponent(MemoComponent):
+        pass
+
+    assert ChildComponent._rio_memo_
+    assert not rio.Text._rio_memo_
+
+    async with rio.testing.TestClient(ChildComponent) as test_client:
+        component = test_client.get_component(ChildComponent)
+
+        test_client.session._register_dirty_component(
+            component,
+            include_children_recursively=False,
+        )
+        await test_client.refresh()
+        assert build_count == 1
+
+        await component._force_refresh()
+        assert build_count == 2
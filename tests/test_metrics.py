@@ -0,0 +1,107 @@
+import rio.testing
+from rio import metrics
+from rio.transports import MessageRecorderTransport
+
+
+def make_fastapi_server(app: rio.App):
+    return app._as_fastapi(
+        debug_mode=False,
+        running_in_window=False,
+        internal_on_app_start=None,
+        base_url=None,
+    )
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    histogram = metrics.Histogram("test_seconds", "Test.", (0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    lines: list[str] = []
+    histogram._render(lines)
+
+    assert lines == [
+        "# HELP test_seconds Test.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{le="0.1"} 2',
+        'test_seconds_bucket{le="1.0"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 5.65",
+        "test_seconds_count 4",
+    ]
+
+
+async def test_sessions_feed_metrics() -> None:
+    def on_press() -> None:
+        pass
+
+    async with rio.testing.TestClient(lambda: rio.Text("Hello")) as test_client:
+        app_metrics = test_client._app_server.metrics
+
+        assert app_metrics.sessions_created.value == 1
+        assert app_metrics.refresh_duration.count == 1
+        assert app_metrics.message_size.count == len(
+            test_client._outgoing_messages
+        )
+
+        await test_client.session._call_event_handler(on_press, refresh=False)
+        assert app_metrics.event_handler_duration.count == 1
+
+        text = test_client._app_server.render_metrics()
+        assert "rio_sessions 1\n" in text
+        assert "rio_disconnected_sessions 0\n" in text
+        assert "rio_refresh_duration_seconds_count 1\n" in text
+
+        await test_client._simulate_interrupted_connection()
+        text = test_client._app_server.render_metrics()
+        assert "rio_disconnected_sessions 1\n" in text
+
+
+async def test_message_sizes_are_measured_in_bytes() -> None:
+    class ByteCountingTransport(MessageRecorderTransport):
+        def __init__(self) -> None:
+            super().__init__()
+            self.sent_bytes = 0
+
+        async def send(self, msg: str | bytes) -> None:
+            if isinstance(msg, str):
+                self.sent_bytes += len(msg.encode("utf-8"))
+            else:
+                self.sent_bytes += len(msg)
+
+            await super().send(msg)
+
+    async with rio.testing.TestClient(lambda: rio.Text("Hello")) as test_client:
+        message_size = test_client._app_server.metrics.message_size
+
+        await test_client._simulate_interrupted_connection()
+        transport = ByteCountingTransport()
+        test_client.session._transport = transport
+        sum_before = message_size.sum
+
+        text = test_client.get_component(rio.Text)
+        text.text = "ü" * 1000
+        await test_client.refresh()
+
+        assert transport.sent_bytes > 2000
+        assert message_size.sum - sum_before == transport.sent_bytes
+
+
+async def test_metrics_route_is_opt_in() -> None:
+    def has_metrics_route(server) -> bool:
+        return any(
+            getattr(route, "path", None) == "/rio/metrics"
+            for route in server.routes
+        )
+
+    app = rio.App(build=rio.Spacer)
+    assert not has_metrics_route(make_fastapi_server(app))
+
+    app = rio.App(build=rio.Spacer, expose_metrics=True)
+    server = make_fastapi_server(app)
+    assert has_metrics_route(server)
+
+    response = await server._serve_metrics()
+    assert response.media_type.startswith("text/plain")
+    assert b"# TYPE rio_sessions_created_total counter" in response.body
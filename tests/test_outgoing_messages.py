@@ -0,0 +1,102 @@
+import asyncio
+
+import rio.testing
+from rio.transports import MessageRecorderTransport
+
+
+class CongestedTransport(MessageRecorderTransport):
+    """
+    A transport which doesn't send anything until it's told to.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._uncongested = asyncio.Event()
+
+    def uncongest(self) -> None:
+        self._uncongested.set()
+
+    async def send(self, msg: str | bytes) -> None:
+        await self._uncongested.wait()
+        await super().send(msg)
+
+
+async def connect_congested_transport(
+    test_client: rio.testing.TestClient,
+) -> CongestedTransport:
+    await test_client._simulate_interrupted_connection()
+
+    transport = CongestedTransport()
+    test_client.session._transport = transport
+    return transport
+
+
+async def test_updates_for_congested_clients_are_merged() -> None:
+    def build() -> rio.Component:
+        return rio.Column(rio.Text("A"), rio.Text("B"))
+
+    async with rio.testing.TestClient(build) as test_client:
+        text_a, text_b = test_client.get_components(rio.Text)
+        transport = await connect_congested_transport(test_client)
+
+        # The first update gets stuck in the network, but doesn't stop the
+        # session from refreshing again
+        for text, value in ((text_a, "1"), (text_a, "2"), (text_b, "3")):
+            text.text = value
+            await asyncio.wait_for(test_client.refresh(), timeout=1)
+
+        assert not transport.sent_messages
+
+        transport.uncongest()
+        while test_client.session._message_sender_task is not None:
+            await asyncio.sleep(0.01)
+
+        # The queued updates were combined into one
+        assert [msg["method"] for msg in transport.sent_messages] == [
+            "updateComponentStates",
+            "updateComponentStates",
+        ]
+
+        delta_states = transport.sent_messages[1]["params"]["deltaStates"]
+        assert delta_states[str(text_a._id)]["text"] == "2"
+        assert delta_states[str(text_b._id)]["text"] == "3"
+
+
+async def test_hopelessly_slow_clients_are_disconnected() -> None:
+    app = rio.App(
+        build=lambda: rio.Text("Hello"),
+        max_queued_message_bytes=10_000,
+    )
+
+    async with rio.testing.TestClient(app) as test_client:
+        text = test_client.get_component(rio.Text)
+        transport = await connect_congested_transport(test_client)
+
+        for value in ("A" * 100, "B" * 20_000):
+            text.text = value
+            await test_client.refresh()
+
+        # The session is still alive, waiting for the client to reconnect
+        assert transport.closed.is_set()
+        assert test_client.session._transport is None
+        assert not test_client.session._was_closed
+        assert not test_client.session._outgoing_messages
+
+
+async def test_queued_messages_are_measured_in_bytes() -> None:
+    app = rio.App(
+        build=lambda: rio.Text("Hello"),
+        max_queued_message_bytes=10_000,
+    )
+
+    async with rio.testing.TestClient(app) as test_client:
+        text = test_client.get_component(rio.Text)
+        transport = await connect_congested_transport(test_client)
+
+        # Fewer characters than the limit, but more bytes once encoded
+        for value in ("A" * 100, "ü" * 7_000):
+            text.text = value
+            await test_client.refresh()
+
+        assert transport.closed.is_set()
+        assert test_client.session._transport is None
@@ -0,0 +1,110 @@
+import pytest
+
+import rio.maybes
+import rio.testing
+
+matplotlib_figure = pytest.importorskip("matplotlib.figure")
+
+# Make sure Rio is aware that matplotlib is available, even if other tests have
+# already initialized the maybes
+rio.maybes.initialize(force=True)
+
+
+def make_figure():
+    figure = matplotlib_figure.Figure()
+    figure.add_subplot().plot([1, 2, 3])
+    return figure
+
+
+def count_renders(figure) -> list[int]:
+    render_count = [0]
+    original_savefig = figure.savefig
+
+    def counting_savefig(*args, **kwargs):
+        render_count[0] += 1
+        return original_savefig(*args, **kwargs)
+
+    figure.savefig = counting_savefig
+    return render_count
+
+
+async def wait_for_render(plot: rio.Plot) -> None:
+    # Figures are rendered in the background and sent to the client in a
+    # refresh of their own
+    assert plot._pending_render is not None
+    await plot._pending_render[2]
+
+
+async def test_figure_is_only_rendered_once() -> None:
+    figure = make_figure()
+    render_count = count_renders(figure)
+
+    def build() -> rio.Component:
+        return rio.Plot(figure, min_width=10, min_height=10)
+
+    async with rio.testing.TestClient(build) as test_client:
+        plot = test_client.get_component(rio.Plot)
+
+        # The initial refresh doesn't wait for the figure
+        state = test_client._last_component_state_changes[plot]
+        assert state["plot"] is None
+
+        await wait_for_render(plot)
+        state = test_client._last_component_state_changes[plot]
+        assert state["plot"]["svg"].lstrip().startswith("<?xml")
+        assert render_count[0] == 1
+
+        # Changing unrelated properties or reconnecting must not re-render the
+        # figure
+        plot.corner_radius = 2
+        await test_client.refresh()
+        await test_client.session._send_all_components_on_reconnect()
+
+        assert render_count[0] == 1
+
+        # A new figure must be rendered though
+        plot.figure = make_figure()
+        await test_client.refresh()
+        await wait_for_render(plot)
+
+        state = test_client._last_component_state_changes[plot]
+        assert "svg" in state["plot"]
+
+
+async def test_modified_figure_is_rendered_again() -> None:
+    figure = make_figure()
+    render_count = count_renders(figure)
+
+    def build() -> rio.Component:
+        return rio.Plot(figure)
+
+    async with rio.testing.TestClient(build) as test_client:
+        plot = test_client.get_component(rio.Plot)
+        await wait_for_render(plot)
+        assert render_count[0] == 1
+
+        # Refreshing the plot tells Rio that the figure has been modified
+        figure.axes[0].plot([3, 2, 1])
+        plot.force_refresh()
+        await test_client.refresh()
+        await wait_for_render(plot)
+        assert render_count[0] == 2
+
+        # So does assigning the figure again
+        plot.figure = figure
+        await test_client.refresh()
+        await wait_for_render(plot)
+        assert render_count[0] == 3
+
+
+async def test_raster_format_is_hosted_as_asset() -> None:
+    def build() -> rio.Component:
+        return rio.Plot(make_figure(), raster_format="png")
+
+    async with rio.testing.TestClient(build) as test_client:
+        plot = test_client.get_component(rio.Plot)
+        await wait_for_render(plot)
+        state = test_client._last_component_state_changes[plot]
+
+        assert "svg" not in state["plot"]
+        assert isinstance(state["plot"]["imageUrl"], str)
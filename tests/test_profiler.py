@@ -0,0 +1,75 @@
+import json
+
+import rio.testing
+from rio.debug.dev_tools.profiler_page import ProfilerPage
+
+
+class Greeter(rio.Component):
+    name: str = "World"
+
+    def build(self) -> rio.Component:
+        return rio.Text(f"Hello, {self.name}!")
+
+
+async def test_profiler_is_disabled_by_default() -> None:
+    async with rio.testing.TestClient(Greeter) as test_client:
+        profiler = test_client._app_server.profiler
+
+        test_client.get_component(Greeter).name = "Rio"
+        await test_client.refresh()
+
+        assert not profiler.enabled
+        assert not profiler.component_stats()
+        assert not profiler.refreshes()
+
+
+async def test_profiler_records_component_timings(tmp_path) -> None:
+    app = rio.App(build=Greeter, enable_profiler=True)
+
+    async with rio.testing.TestClient(app) as test_client:
+        profiler = test_client._app_server.profiler
+        profiler.reset()
+
+        test_client.get_component(Greeter).name = "Rio"
+        await test_client.refresh()
+
+        stats = profiler.component_stats()
+        assert stats[Greeter].build_count == 1
+        assert stats[Greeter].reconcile_count == 1
+        assert stats[rio.Text].build_count == 0
+        assert stats[rio.Text].serialized_bytes > len("Hello, Rio!")
+
+        [refresh] = profiler.refreshes()
+        assert refresh.visited_components == 2
+
+        trace_path = tmp_path / "trace.json"
+        profiler.export_chrome_trace(trace_path)
+        trace = json.loads(trace_path.read_text(encoding="utf-8"))
+
+        event_names = {
+            event["name"]
+            for event in trace["traceEvents"]
+            if event["ph"] == "X"
+        }
+        assert event_names == {
+            "refresh",
+            "Greeter",
+            "reconcile Greeter",
+            "serialize Greeter",
+            "serialize Text",
+        }
+
+
+async def test_profiler_page_builds() -> None:
+    app = rio.App(build=ProfilerPage, enable_profiler=True)
+
+    async with rio.testing.TestClient(app) as test_client:
+        page = test_client.get_component(ProfilerPage)
+
+        page.force_refresh()
+        await test_client.refresh()
+
+        assert any(
+            text.text == "ProfilerPage"
+            for text in test_client.get_components(rio.Text)
+        )
@@ -1,3 +1,7 @@
+import asyncio
+import time
+import typing as t
+
 import rio.testing
 
 
@@ -98,3 +102,286 @@ async def test_unmount_and_remount() -> None:
             row_component,
             child_component,
         }
+
+
+async def test_refresh_only_sends_changed_properties() -> None:
+    def build() -> rio.Component:
+        return rio.Container(rio.Text("Hello", justify="left"))
+
+    async with rio.testing.TestClient(build) as test_client:
+        text_component = test_client.get_component(rio.Text)
+
+        text_component.text = "World"
+        await test_client.refresh()
+
+        delta = test_client._last_component_state_changes[text_component]
+        assert delta == {"text": "World"}
+
+
+async def test_remounted_component_receives_full_state() -> None:
+    class DemoComponent(rio.Component):
+        content: rio.Component
+        show_child: bool
+
+        def build(self) -> rio.Component:
+            children = [self.content] if self.show_child else []
+            return rio.Row(*children)
+
+    def build() -> rio.Component:
+        return DemoComponent(
+            rio.Text("hi"),
+            show_child=True,
+        )
+
+    async with rio.testing.TestClient(build) as test_client:
+        root_component = test_client.get_component(DemoComponent)
+        child_component = root_component.content
+
+        root_component.show_child = False
+        await test_client.refresh()
+
+        root_component.show_child = True
+        await test_client.refresh()
+
+        delta = test_client._last_component_state_changes[child_component]
+        assert delta["_type_"] == child_component._unique_id_  # type: ignore
+        assert delta["text"] == "hi"
+
+
+async def test_reconnect_sends_full_state() -> None:
+    def build() -> rio.Component:
+        return rio.Container(rio.Text("Hello"))
+
+    async with rio.testing.TestClient(build) as test_client:
+        text_component = test_client.get_component(rio.Text)
+
+        await test_client._simulate_reconnect()
+        await test_client.session._send_all_components_on_reconnect()
+
+        delta = test_client._last_component_state_changes[text_component]
+        assert delta["text"] == "Hello"
+        assert "_type_" in delta
+
+
+async def test_mount_state_is_tracked() -> None:
+    class DemoComponent(rio.Component):
+        content: rio.Component
+        show_child: bool
+
+        def build(self) -> rio.Component:
+            children = [rio.Card(self.content)] if self.show_child else []
+            return rio.Row(*children)
+
+    def build() -> rio.Component:
+        return DemoComponent(
+            rio.Text("hi"),
+            show_child=True,
+        )
+
+    async with rio.testing.TestClient(build) as test_client:
+        root_component = test_client.get_component(DemoComponent)
+        card_component = test_client.get_component(rio.Card)
+        text_component = test_client.get_component(rio.Text)
+
+        assert root_component._is_mounted_
+        assert card_component._is_mounted_
+        assert text_component._is_mounted_
+
+        # Unmounting a component must also unmount all of its children
+        root_component.show_child = False
+        await test_client.refresh()
+
+        assert root_component._is_mounted_
+        assert not text_component._is_mounted_
+
+        # Changes to unmounted components mustn't be sent to the client
+        test_client._outgoing_messages.clear()
+        text_component.text = "bye"
+        await test_client.refresh()
+        assert not test_client._outgoing_messages
+
+        root_component.show_child = True
+        await test_client.refresh()
+
+        assert text_component._is_mounted_
+        assert text_component in test_client._last_updated_components
+
+
+async def test_deeply_nested_components() -> None:
+    class Nested(rio.Component):
+        depth: int
+
+        def build(self) -> rio.Component:
+            if self.depth == 0:
+                return rio.Text("leaf")
+
+            return Nested(self.depth - 1)
+
+    async with rio.testing.TestClient(lambda: Nested(2_000)) as test_client:
+        components = list(test_client.root_component._iter_component_tree_())
+        assert len(components) == 2_002
+        assert isinstance(components[-1], rio.Text)
+
+        # Only the changed leaf has to be sent
+        leaf = components[-1]
+        leaf.text = "changed"
+        await test_client.refresh()
+        assert test_client._last_updated_components == {leaf}
+
+
+async def test_concurrent_refreshes_are_coalesced() -> None:
+    def build() -> rio.Component:
+        return rio.Column(rio.Text("A"), rio.Text("B"))
+
+    async with rio.testing.TestClient(build) as test_client:
+        text_a, text_b = test_client.get_components(rio.Text)
+        test_client._outgoing_messages.clear()
+
+        # Simulate a burst of events, each of which requests a refresh
+        async def handle_event(text: rio.Text) -> None:
+            text.text = "Changed"
+            await test_client.session._refresh()
+
+        await asyncio.gather(handle_event(text_a), handle_event(text_b))
+
+        update_messages = [
+            message
+            for message in test_client._outgoing_messages
+            if message["method"] == "updateComponentStates"
+        ]
+        assert len(update_messages) == 1
+        assert test_client._last_updated_components == {text_a, text_b}
+
+
+async def test_refresh_interval() -> None:
+    app = rio.App(
+        build=lambda: rio.Text("Hello"),
+        refresh_interval=0.2,
+    )
+
+    async with rio.testing.TestClient(app) as test_client:
+        text = test_client.get_component(rio.Text)
+
+        # The first refresh happened while the session was created, so this
+        # one has to wait for the interval to pass
+        start_time = time.monotonic()
+        text.text = "World"
+        await test_client.refresh()
+
+        assert time.monotonic() - start_time >= 0.1
+        assert test_client._last_updated_components == {text}
+
+
+async def test_in_place_changes_to_serialized_values_are_sent() -> None:
+    async with rio.testing.TestClient(lambda: rio.Text("Hi")) as test_client:
+        session = test_client.session
+        component = test_client.get_component(rio.Text)
+
+        # `_custom_serialize_` may return mutable internals of a component,
+        # which are later changed in place
+        items = ["a"]
+        session._get_delta_state(component, {"items": items})
+
+        items.append("b")
+        delta = session._get_delta_state(component, {"items": items})
+        assert delta == {"items": ["a", "b"]}
+
+        delta = session._get_delta_state(component, {"items": items})
+        assert delta == {}
+
+
+async def test_mounting_deep_trees_visits_each_component_once(
+    monkeypatch,
+) -> None:
+    depth = 500
+
+    def build() -> rio.Component:
+        component: rio.Component = rio.Text("leaf")
+
+        for _ in range(depth):
+            component = rio.Row(component)
+
+        return component
+
+    # Count how often the children of components are looked up. Mounting
+    # mustn't walk subtrees which have already been mounted again, or this
+    # grows quadratically with the depth of the tree.
+    call_count = 0
+    original_iter_direct_children = rio.Component._iter_direct_children_
+
+    def iter_direct_children(self: rio.Component) -> t.Iterable[rio.Component]:
+        nonlocal call_count
+        call_count += 1
+        return original_iter_direct_children(self)
+
+    monkeypatch.setattr(
+        rio.Component, "_iter_direct_children_", iter_direct_children
+    )
+
+    async with rio.testing.TestClient(build) as test_client:
+        rows = list(test_client.get_components(rio.Row))
+        assert len(rows) == depth
+        assert all(row._is_mounted_ for row in rows)
+
+    assert call_count < 10 * depth
+
+
+async def test_remounting_kept_subtree_visits_each_component_once(
+    monkeypatch,
+) -> None:
+    depth = 20
+
+    class Chain(rio.Component):
+        length: int
+
+        def build(self) -> rio.Component:
+            if self.length == 0:
+                return rio.Text("leaf")
+
+            return rio.Row(Chain(self.length - 1))
+
+    class Root(rio.Component):
+        show_chain: bool = True
+
+        def __post_init__(self) -> None:
+            # Keep the chain alive while it's not part of the tree, so it's
+            # remounted without being rebuilt
+            self.chain = Chain(depth)
+
+        def build(self) -> rio.Component:
+            if self.show_chain:
+                return rio.Column(self.chain)
+
+            return rio.Column(rio.Text("hidden"))
+
+    call_count = 0
+    original_iter_direct_children = rio.Component._iter_direct_children_
+
+    def iter_direct_children(self: rio.Component) -> t.Iterable[rio.Component]:
+        nonlocal call_count
+        call_count += 1
+        return original_iter_direct_children(self)
+
+    async with rio.testing.TestClient(Root) as test_client:
+        root = test_client.get_component(Root)
+
+        root.show_chain = False
+        await test_client.refresh()
+        assert not root.chain._is_mounted_
+
+        # Every component of the remounted subtree must be sent to the client,
+        # but each of them must only be visited once. Walking the subtree of
+        # every component again grows exponentially with the depth.
+        monkeypatch.setattr(
+            rio.Component, "_iter_direct_children_", iter_direct_children
+        )
+
+        root.show_chain = True
+        await test_client.refresh()
+
+        chains = list(test_client.get_components(Chain))
+        assert len(chains) == depth + 1
+        assert all(chain._is_mounted_ for chain in chains)
+        assert set(chains) <= test_client._last_component_state_changes.keys()
+
+    assert call_count < 10 * depth
@@ -162,3 +162,54 @@ def test_redirects(
     assert (
         absolute_url_after_redirects_is == absolute_url_after_redirects_should
     )
+
+
+def user_page(user_id: str) -> rio.Component:
+    return FakeComponent()
+
+
+def file_page(path: str) -> rio.Component:
+    return FakeComponent()
+
+
+def test_first_matching_page_is_active() -> None:
+    home = rio.ComponentPage(name="Home", url_segment="", build=FakeComponent)
+    user = rio.ComponentPage(
+        name="User", url_segment="{user_id}", build=user_page
+    )
+    users = rio.ComponentPage(
+        name="Users",
+        url_segment="users",
+        build=FakeComponent,
+        children=[user],
+    )
+    files = rio.ComponentPage(
+        name="Files", url_segment="files/{path:path}", build=file_page
+    )
+    shadowed = rio.ComponentPage(
+        name="Shadowed", url_segment="users", build=FakeComponent
+    )
+    pages = [users, files, shadowed, home]
+
+    def get_active_pages(path: str) -> list:
+        return rio.routing._get_active_page_instances(
+            available_pages=pages,
+            remaining_path=path,
+        )
+
+    assert get_active_pages("") == [(home, {})]
+    assert get_active_pages("users") == [(users, {})]
+    assert get_active_pages("users/42") == [
+        (users, {}),
+        (user, {"user_id": "42"}),
+    ]
+    assert get_active_pages("files/a/b.txt") == [(files, {"path": "a/b.txt"})]
+    assert get_active_pages("nope") == []
+    assert get_active_pages("usersx") == []
+
+    # Changes to the pages take effect immediately
+    pages.insert(0, shadowed)
+    assert get_active_pages("users/42") == [(shadowed, {})]
+
+    pages.clear()
+    assert get_active_pages("") == []
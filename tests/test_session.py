@@ -1,6 +1,11 @@
+import asyncio
+
 import pytest
+import starlette.datastructures
 
 import rio.testing
+from rio import app_server, data_models
+from rio.transports import MessageRecorderTransport
 
 
 async def test_client_attachments():
@@ -40,3 +45,115 @@ async def test_default_attachments():
 
         assert session[Settings] is not settings_attachment
         assert session[Settings]._equals(settings_attachment)
+
+
+async def test_wire_protocol_falls_back_to_json():
+    app = rio.App(build=rio.Spacer, wire_protocol="json+deflate")
+
+    # The test client only advertises support for plain JSON
+    async with rio.testing.TestClient(app) as test_client:
+        assert test_client.session._wire_protocol == "json"
+
+
+def test_wire_protocols_default_to_json():
+    message = data_models.InitialClientMessage.from_defaults(url="/")
+    assert message.wire_protocols == ["json"]
+
+
+async def test_large_messages_are_compressed():
+    async with rio.testing.TestClient(lambda: rio.Text("")) as test_client:
+        test_client.session._wire_protocol = "json+deflate"
+
+        transport = test_client._transport
+        raw_messages: list[str | bytes] = []
+        original_send = transport.send
+
+        async def send(msg: str | bytes) -> None:
+            raw_messages.append(msg)
+            await original_send(msg)
+
+        transport.send = send  # type: ignore
+
+        text = test_client.get_component(rio.Text)
+        text.text = "compressible " * 1000
+        await test_client.refresh()
+
+        assert [type(msg) for msg in raw_messages] == [bytes]
+        assert test_client._last_component_state_changes[text]["text"] == (
+            "compressible " * 1000
+        )
+
+
+async def test_theme_css_is_cached():
+    async with rio.testing.TestClient() as test_client:
+        session = test_client.session
+        theme = session.theme
+
+        # The CSS was computed when the session was created
+        variables = session._get_theme_css_values(theme)
+        assert session._get_theme_css_values(theme) is variables
+
+        # Font names are shared too, so the variables are valid for every
+        # session
+        font_name = variables["--rio-global-font"]
+        assert session._registered_font_names[theme.font] == font_name
+
+
+async def test_session_creation_concurrency_is_limited():
+    concurrent_starts = 0
+    max_concurrent_starts = 0
+    locked_during_build: list[bool] = []
+
+    async def on_session_start(session: rio.Session) -> None:
+        nonlocal concurrent_starts, max_concurrent_starts
+
+        concurrent_starts += 1
+        max_concurrent_starts = max(max_concurrent_starts, concurrent_starts)
+        await asyncio.sleep(0.05)
+        concurrent_starts -= 1
+
+    def build() -> rio.Component:
+        locked_during_build.append(server._session_creation_semaphore.locked())
+        return rio.Spacer()
+
+    app = rio.App(
+        build=build,
+        on_session_start=on_session_start,
+        max_concurrent_session_creations=1,
+    )
+    server = app_server.TestingServer(
+        app,
+        debug_mode=False,
+        running_in_window=False,
+    )
+
+    async def create_session() -> rio.Session:
+        transport = MessageRecorderTransport()
+
+        return await server.create_session(
+            initial_message=data_models.InitialClientMessage.from_defaults(
+                url="http://unit.test/",
+            ),
+            transport=transport,
+            client_ip="localhost",
+            client_port=12345,
+            http_headers=starlette.datastructures.Headers(),
+        )
+
+    sessions = await asyncio.gather(*[create_session() for _ in range(5)])
+
+    # Only building the initial page is limited. Slow `on_session_start`
+    # handlers mustn't hold up other sessions.
+    assert max_concurrent_starts == 5
+    assert locked_during_build == [True] * 5
+
+    for session in sessions:
+        await session._close(close_remote_session=False)
+
+    # Closed sessions must not be kept around
+    assert not server._disconnected_sessions
+
+
+def test_invalid_session_creation_limit():
+    with pytest.raises(ValueError):
+        rio.App(build=rio.Spacer, max_concurrent_session_creations=0)
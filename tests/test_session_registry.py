@@ -0,0 +1,133 @@
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+import rio
+from rio import assets
+from rio.session_registry import (
+    InMemorySessionRegistry,
+    LatentSession,
+    SessionRegistry,
+    SqliteSessionRegistry,
+)
+
+LATENT_SESSION = LatentSession(
+    url="http://localhost:8000/foo",
+    client_ip="127.0.0.1",
+    client_port=12345,
+    http_headers=(("user-agent", "pytest"), ("accept", "text/html")),
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+async def registry(request: pytest.FixtureRequest, tmp_path: Path):
+    if request.param == "memory":
+        result = InMemorySessionRegistry()
+    else:
+        result = SqliteSessionRegistry(tmp_path / "sessions.sqlite")
+
+    yield result
+    await result.close()
+
+
+async def test_latent_sessions(registry: SessionRegistry) -> None:
+    await registry.add_latent_session("token", LATENT_SESSION)
+
+    assert await registry.pop_latent_session("token") == LATENT_SESSION
+
+    # Tokens can only be used once
+    assert await registry.pop_latent_session("token") is None
+
+
+async def test_active_sessions(registry: SessionRegistry) -> None:
+    assert not await registry.is_active_session("token")
+
+    await registry.add_active_session("token")
+    assert await registry.is_active_session("token")
+
+    registry.remove_active_session("token")
+    assert not await registry.is_active_session("token")
+
+
+async def test_assets(registry: SessionRegistry) -> None:
+    asset = assets.Asset.new(b"Hello, world!", "text/plain")
+    registry.host_asset(asset)
+
+    assert await registry.get_asset(asset.secret_id) is asset
+    assert await registry.get_asset("b-nonexistent") is None
+
+
+async def test_sqlite_registry_is_shared_between_processes(
+    tmp_path: Path,
+) -> None:
+    # Two registries using the same file behave like two worker processes
+    path = tmp_path / "sessions.sqlite"
+    worker_1 = SqliteSessionRegistry(path)
+    worker_2 = SqliteSessionRegistry(path)
+
+    await worker_1.add_latent_session("token", LATENT_SESSION)
+    assert await worker_2.pop_latent_session("token") == LATENT_SESSION
+    assert await worker_1.pop_latent_session("token") is None
+
+    await worker_2.add_active_session("token")
+    assert await worker_1.is_active_session("token")
+
+    bytes_asset = assets.Asset.new(b"Hello, world!", "text/plain")
+    path_asset = assets.Asset.new(Path(__file__), "text/x-python")
+    worker_1.host_asset(bytes_asset)
+    worker_1.host_asset(path_asset)
+
+    # Assets are written in the background. Reading anything from the same
+    # registry waits for that to finish.
+    await worker_1.get_asset("b-nonexistent")
+
+    shared_bytes_asset = await worker_2.get_asset(bytes_asset.secret_id)
+    assert isinstance(shared_bytes_asset, assets.BytesAsset)
+    assert shared_bytes_asset.data == b"Hello, world!"
+    assert shared_bytes_asset.media_type == "text/plain"
+
+    shared_path_asset = await worker_2.get_asset(path_asset.secret_id)
+    assert isinstance(shared_path_asset, assets.PathAsset)
+    assert shared_path_asset.path == Path(__file__)
+
+    # Sessions of a worker which shuts down are gone
+    await worker_2.close()
+    assert not await worker_1.is_active_session("token")
+
+    await worker_1.close()
+
+
+async def test_sessions_of_crashed_workers_expire(tmp_path: Path) -> None:
+    path = tmp_path / "sessions.sqlite"
+    crashed_worker = SqliteSessionRegistry(
+        path,
+        active_session_lifetime=timedelta(seconds=0.2),
+    )
+    worker = SqliteSessionRegistry(
+        path,
+        active_session_lifetime=timedelta(seconds=0.2),
+    )
+
+    await crashed_worker.add_active_session("token")
+    assert await worker.is_active_session("token")
+
+    # Sessions are kept alive as long as their worker is running
+    await asyncio.sleep(0.5)
+    assert await worker.is_active_session("token")
+
+    # Simulate a crash, which doesn't get to remove the session
+    assert crashed_worker._renewal_task is not None
+    crashed_worker._renewal_task.cancel()
+
+    await asyncio.sleep(0.5)
+    assert not await worker.is_active_session("token")
+
+    await worker.close()
+
+
+def test_app_uses_in_memory_registry_by_default() -> None:
+    app = rio.App(build=rio.Spacer)
+
+    assert isinstance(app._session_registry, InMemorySessionRegistry)
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+import rio.maybes
+import rio.testing
+from rio.components.table import LAZY_CHUNK_SIZE
+
+
+@pytest.fixture(autouse=True)
+def initialize_maybes() -> None:
+    # Lazy tables require dataframes. Make sure Rio is aware of which dataframe
+    # libraries are available. This must not happen while the tests are being
+    # collected, or other test modules might not have imported their libraries
+    # yet.
+    rio.maybes.initialize(force=True)
+
+
+ROW_COUNT = 1_000
+
+
+def make_data_frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Number": range(ROW_COUNT),
+            "Text": [f"Row {index}" for index in range(ROW_COUNT)],
+        }
+    )
+
+
+def build_table() -> rio.Component:
+    return rio.Table(make_data_frame(), lazy=True)
+
+
+async def test_only_first_chunk_is_sent() -> None:
+    async with rio.testing.TestClient(build_table) as test_client:
+        table = test_client.get_component(rio.Table)
+        state = test_client._last_component_state_changes[table]
+
+        assert state["rowCount"] == ROW_COUNT
+        assert state["chunkStart"] == 0
+        assert state["headers"] == ["Number", "Text"]
+        assert state["columns"][0] == list(range(LAZY_CHUNK_SIZE))
+
+
+async def test_request_rows() -> None:
+    async with rio.testing.TestClient(build_table) as test_client:
+        table = test_client.get_component(rio.Table)
+
+        await table._on_message_({"type": "requestRows", "start": 400})
+
+        state = test_client._last_component_state_changes[table]
+        assert state["chunkStart"] == 400
+        assert state["columns"][0][0] == 400
+        assert len(state["columns"][0]) == LAZY_CHUNK_SIZE
+
+
+async def test_sort_and_filter() -> None:
+    async with rio.testing.TestClient(build_table) as test_client:
+        table = test_client.get_component(rio.Table)
+
+        await table._on_message_(
+            {"type": "sort", "column": "Number", "descending": True}
+        )
+
+        state = test_client._last_component_state_changes[table]
+        assert state["sortColumn"] == "Number"
+        assert state["columns"][0][:3] == [999, 998, 997]
+
+        await table._on_message_({"type": "filter", "text": "ROW 99"})
+
+        state = test_client._last_component_state_changes[table]
+        assert state["rowCount"] == 11
+        assert state["columns"][1][:2] == ["Row 999", "Row 998"]
+
+
+async def test_lazy_table_requires_data_frame() -> None:
+    def build() -> rio.Component:
+        with pytest.raises(ValueError):
+            rio.Table({"Number": [1, 2, 3]}, lazy=True)
+
+        return rio.Text("Done")
+
+    async with rio.testing.TestClient(build) as test_client:
+        assert test_client.get_component(rio.Text).text == "Done"
@@ -0,0 +1,53 @@
+import rio.testing
+from rio.components.virtual_list_view import _VirtualListViewport
+
+
+def build_list() -> rio.Component:
+    return rio.VirtualListView(
+        item_count=50_000,
+        build_item=lambda index: rio.Text(f"Item {index}"),
+        overscan=5,
+    )
+
+
+async def test_only_visible_items_are_built() -> None:
+    async with rio.testing.TestClient(build_list) as test_client:
+        texts = list(test_client.get_components(rio.Text))
+
+        # The initially visible items, plus the overscan below them
+        assert len(texts) == 35
+        assert texts[0].text == "Item 0"
+
+
+async def test_scrolling_builds_new_items() -> None:
+    async with rio.testing.TestClient(build_list) as test_client:
+        viewport = test_client.get_component(_VirtualListViewport)
+
+        await viewport._on_message_({"start": 1000, "end": 1020})
+
+        assert viewport.first_index == 995
+        assert len(viewport.children) == 30
+
+        texts = [text.text for text in test_client.get_components(rio.Text)]
+        assert texts[0] == "Item 995"
+        assert texts[-1] == "Item 1024"
+
+        # Scrolling by a single item must only send the newly visible item
+        await viewport._on_message_({"start": 1001, "end": 1021})
+
+        new_texts = [
+            component.text
+            for component in test_client._last_updated_components
+            if isinstance(component, rio.Text)
+        ]
+        assert new_texts == ["Item 1025"]
+
+
+async def test_visible_range_is_clamped() -> None:
+    async with rio.testing.TestClient(build_list) as test_client:
+        viewport = test_client.get_component(_VirtualListViewport)
+
+        await viewport._on_message_({"start": 49_990, "end": 60_000})
+
+        assert viewport.first_index == 49_985
+        assert len(viewport.children) == 15